@@ -0,0 +1,274 @@
+import re
+import json
+from datetime import datetime, timezone
+import tracing
+
+# Responses worth parsing: GraphQL queries, the private web API and the HTML
+# document itself (post pages embed their data in JSON script tags)
+API_URL_PATTERNS = ("/graphql", "/api/v1/", "/api/graphql")
+JSON_SCRIPT_RE = re.compile(r'<script type="application/json"[^>]*>(.*?)</script>', re.S)
+
+# Instagram media_type codes
+MEDIA_TYPES = {1: "Photo", 2: "Video", 8: "Carousel"}
+GRAPHQL_TYPES = {"GraphImage": "Photo", "GraphVideo": "Video", "GraphSidecar": "Carousel",
+                 "XDTGraphImage": "Photo", "XDTGraphVideo": "Video", "XDTGraphSidecar": "Carousel"}
+
+def enable_network_capture(options):
+    """
+    Enable Chrome performance logging so network responses can be read back
+
+    Args:
+        options: Chrome Options used to create the driver
+    """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+def drain_performance_log(driver):
+    """
+    Read and clear the performance log, keeping interesting network responses
+
+    Args:
+        driver: Selenium WebDriver created with network capture enabled
+
+    Returns:
+        list: (request_id, url, mime_type, resource_type) for each response
+    """
+    responses = []
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        print(f"Could not read performance log: {e}")
+        return responses
+
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method") != "Network.responseReceived":
+            continue
+
+        params = message.get("params", {})
+        response = params.get("response", {})
+        url = response.get("url", "")
+        resource_type = params.get("type", "")
+
+        if resource_type == "Document" or any(pattern in url for pattern in API_URL_PATTERNS):
+            responses.append((params.get("requestId"), url, response.get("mimeType", ""), resource_type))
+
+    return responses
+
+@tracing.traced("extract_api")
+def collect_json_payloads(driver, raw_responses=None):
+    """
+    Fetch the bodies of captured API/document responses and parse their JSON
+
+    Args:
+        driver: Selenium WebDriver created with network capture enabled
+        raw_responses: Optional list that receives {"url", "mime_type", "body"}
+            for every API response read (used to record pages for replay)
+
+    Returns:
+        list: Parsed JSON payloads, in the order they were received
+    """
+    payloads = []
+    for request_id, url, mime_type, resource_type in drain_performance_log(driver):
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception:
+            # Body already evicted, or a redirect without a body
+            continue
+
+        text = body.get("body", "")
+        if not text or body.get("base64Encoded"):
+            continue
+
+        if resource_type == "Document" or "html" in mime_type:
+            chunks = JSON_SCRIPT_RE.findall(text)
+        else:
+            if raw_responses is not None:
+                raw_responses.append({"url": url, "mime_type": mime_type, "body": text})
+            # GraphQL responses may be prefixed with an anti-hijacking guard
+            chunks = [text[text.find("{"):]] if "{" in text else []
+
+        for chunk in chunks:
+            try:
+                payloads.append(json.loads(chunk))
+            except ValueError:
+                continue
+
+    return payloads
+
+def find_media_item(payload, shortcode):
+    """
+    Search a JSON payload for the media object of the given post
+
+    Args:
+        payload: Parsed JSON (dicts and lists)
+        shortcode: Post shortcode, as in /p/<shortcode>/
+
+    Returns:
+        dict: The media object, or None if not present
+    """
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if (node.get("code") == shortcode or node.get("shortcode") == shortcode) and \
+                    ("owner" in node or "user" in node):
+                return node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+def shortcode_from_url(url):
+    """Extract the shortcode from a post URL"""
+    match = re.search(r"/(?:p|reel)/([A-Za-z0-9_-]+)", url or "")
+    return match.group(1) if match else None
+
+def _edge_count(node, *keys):
+    """Read the count of the first GraphQL edge container present"""
+    for key in keys:
+        edge = node.get(key)
+        if isinstance(edge, dict) and edge.get("count") is not None:
+            return edge["count"]
+    return None
+
+def _best_image(item):
+    """Largest image candidate of a media item"""
+    candidates = (item.get("image_versions2") or {}).get("candidates") or []
+    if candidates:
+        return candidates[0].get("url")
+    return item.get("display_url")
+
+def _best_video(item):
+    """Video URL of a media item"""
+    versions = item.get("video_versions") or []
+    if versions:
+        return versions[0].get("url")
+    return item.get("video_url")
+
+def media_item_to_post_data(item, post_data, extract_tags, max_comments=10):
+    """
+    Fill the post_data schema used by scrape_post_details from a media object
+
+    Handles both the web API shape (items from /api/v1/media/...) and the
+    older GraphQL shortcode_media shape.
+
+    Args:
+        item: Media object returned by find_media_item
+        post_data: Post dictionary to update in place
+        extract_tags: Function returning (hashtags, mentions) for a caption
+        max_comments: Maximum number of preview comments to keep (0 keeps none)
+
+    Returns:
+        dict: The updated post_data
+    """
+    owner = item.get("user") or item.get("owner") or {}
+    if owner.get("username"):
+        post_data["username"] = owner["username"]
+        post_data["profile_url"] = f"https://www.instagram.com/{owner['username']}/"
+        post_data["profile_data"]["username"] = owner["username"]
+    if owner.get("full_name"):
+        post_data["full_name"] = owner["full_name"]
+        post_data["profile_data"]["full_name"] = owner["full_name"]
+    if owner.get("profile_pic_url"):
+        post_data["profile_data"]["profile_pic_url"] = owner["profile_pic_url"]
+    if "is_verified" in owner:
+        post_data["profile_data"]["is_verified"] = bool(owner["is_verified"])
+    followers = _edge_count(owner, "edge_followed_by")
+    if followers is not None:
+        post_data["profile_data"]["followers_count"] = str(followers)
+        post_data["profile_data"]["followers_numeric"] = followers
+
+    # Caption
+    caption = None
+    if isinstance(item.get("caption"), dict):
+        caption = item["caption"].get("text")
+    else:
+        edges = (item.get("edge_media_to_caption") or {}).get("edges") or []
+        if edges:
+            caption = edges[0].get("node", {}).get("text")
+    if caption:
+        post_data["caption"] = caption
+        hashtags, mentions = extract_tags(caption)
+        post_data["hashtags"] = hashtags
+        post_data["mentions"] = mentions
+
+    # Engagement
+    likes = item.get("like_count")
+    if likes is None:
+        likes = _edge_count(item, "edge_media_preview_like", "edge_liked_by")
+    if likes is not None:
+        post_data["likes_count"] = str(likes)
+
+    comments = item.get("comment_count")
+    if comments is None:
+        comments = _edge_count(item, "edge_media_to_parent_comment", "edge_media_to_comment")
+    if comments is not None:
+        post_data["comments_count"] = str(comments)
+
+    # Date
+    taken_at = item.get("taken_at") or item.get("taken_at_timestamp")
+    if taken_at:
+        post_data["post_date"] = datetime.fromtimestamp(taken_at, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    # Location
+    location = item.get("location")
+    if isinstance(location, dict) and location.get("name"):
+        post_data["location"] = location["name"]
+        location_id = location.get("pk") or location.get("id")
+        if location_id:
+            post_data["location_url"] = f"https://www.instagram.com/explore/locations/{location_id}/"
+
+    # Tagged users
+    tagged_users = []
+    for tag in (item.get("usertags") or {}).get("in") or []:
+        username = (tag.get("user") or {}).get("username")
+        if username:
+            tagged_users.append(username)
+    for edge in (item.get("edge_media_to_tagged_user") or {}).get("edges") or []:
+        username = edge.get("node", {}).get("user", {}).get("username")
+        if username:
+            tagged_users.append(username)
+    if tagged_users:
+        post_data["tagged_users"] = [u for u in dict.fromkeys(tagged_users)
+                                     if "@" + u not in post_data["mentions"]]
+
+    # Post type and media
+    post_type = MEDIA_TYPES.get(item.get("media_type")) or GRAPHQL_TYPES.get(item.get("__typename"))
+    if post_type:
+        post_data["post_type"] = post_type
+
+    children = item.get("carousel_media") or \
+        [edge.get("node", {}) for edge in (item.get("edge_sidecar_to_children") or {}).get("edges") or []]
+    media_urls = []
+    for media in children or [item]:
+        video_url = _best_video(media)
+        image_url = _best_image(media)
+        if video_url:
+            media_urls.append({"type": "video", "url": video_url})
+            if image_url:
+                media_urls.append({"type": "poster", "url": image_url})
+        elif image_url:
+            media_urls.append({"type": "image", "url": image_url})
+    if media_urls:
+        post_data["media_urls"] = media_urls
+        post_data["image_url"] = media_urls[0]["url"]
+
+    # Comments preview (GraphQL shape only; the web API loads them separately)
+    comments_data = []
+    for edge in (item.get("edge_media_to_parent_comment") or {}).get("edges") or []:
+        node = edge.get("node", {})
+        comment_owner = node.get("owner") or {}
+        if node.get("text") and comment_owner.get("username"):
+            comments_data.append({
+                "username": comment_owner["username"],
+                "text": node["text"],
+                "is_verified": bool(comment_owner.get("is_verified")),
+                "likes": str(_edge_count(node, "edge_liked_by") or 0)
+            })
+    if comments_data and max_comments > 0:
+        post_data["comments"] = comments_data[:max_comments]
+
+    return post_data
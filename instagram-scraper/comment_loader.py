@@ -0,0 +1,167 @@
+import time
+from selector_lists import POST_SELECTORS
+from selector_stats import get_registry
+import tracing
+
+# Reads every comment not returned before in one pass, then clicks "load
+# more" and waits until the list grows. Comments are keyed by the id in
+# their permalink (/p/<shortcode>/c/<id>/), or by username and text when
+# there is none, and ids already returned are remembered in the page.
+#
+# arguments[0]: comment_container selectors
+# arguments[1]: load_more_comments followed by view_comments selectors
+# arguments[2]: options {reset, needed, wait_ms, load_more_count}
+LOAD_COMMENTS_PAGE_JS = """
+var done = arguments[arguments.length - 1];
+var containers = arguments[0], loadMore = arguments[1], options = arguments[2];
+if (options.reset || !window.__scrapedCommentIds) { window.__scrapedCommentIds = {}; }
+var seen = window.__scrapedCommentIds;
+var probes = [];
+
+function all(xpath, context) {
+    var nodes = [];
+    try {
+        var result = document.evaluate(xpath, context || document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+    } catch (e) {}
+    return nodes;
+}
+function text(node) { return node ? (node.innerText || node.textContent || "").trim() : ""; }
+function items() {
+    for (var i = 0; i < containers.length; i++) {
+        var since = performance.now();
+        var found = all(containers[i]);
+        probes.push({key: "comment_container", selector: containers[i], hit: found.length > 0,
+                     ms: performance.now() - since});
+        if (found.length) { return found; }
+    }
+    return [];
+}
+
+var comments = [];
+var current = items();
+current.forEach(function(item) {
+    var parts = text(item).split("\\n");
+    if (parts.length < 2) { return; }
+    var permalink = item.querySelector("a[href*='/c/']");
+    var match = permalink && permalink.getAttribute("href").match(/\\/c\\/(\\d+)/);
+    var id = match ? match[1] : parts[0] + "\\u0000" + parts[1];
+    if (seen[id]) { return; }
+    seen[id] = true;
+    var likeText = text(all(".//div[@role='button']/span", item)[0]);
+    comments.push({
+        id: match ? match[1] : null,
+        key: id,
+        username: parts[0],
+        text: parts[1],
+        is_verified: all(".//span[contains(@aria-label, 'Verified')]", item).length > 0,
+        likes: /^\\d+$/.test(likeText) ? likeText : "0"
+    });
+});
+
+var button = null;
+if (comments.length < options.needed && options.wait_ms > 0) {
+    for (var j = 0; j < loadMore.length && !button; j++) {
+        var since = performance.now();
+        button = all(loadMore[j])[0] || null;
+        probes.push({key: j < options.load_more_count ? "load_more_comments" : "view_comments",
+                     selector: loadMore[j], hit: !!button, ms: performance.now() - since});
+    }
+}
+if (!button) {
+    done({comments: comments, clicked: false, grew: false, probes: probes});
+} else {
+    var before = current.length;
+    button.click();
+    var started = Date.now();
+    var poll = setInterval(function() {
+        var grew = items().length > before;
+        if (grew || Date.now() - started >= options.wait_ms) {
+            clearInterval(poll);
+            done({comments: comments, clicked: true, grew: grew, probes: probes});
+        }
+    }, 100);
+}
+"""
+
+@tracing.traced("comment_expansion")
+def load_comments(driver, max_comments=10, time_budget=10, page_wait=2, idle_pages=2):
+    """
+    Page through a post's comments until a stop condition is reached
+
+    Each page is one script call that reads the new comments in bulk, clicks
+    "load more" and waits for the list to grow, so the cost is bounded by
+    the time budget however many comments the post has.
+
+    Args:
+        driver: Selenium WebDriver instance on a post page
+        max_comments: Stop once this many distinct comments are collected
+        time_budget: Stop loading more pages after this many seconds
+        page_wait: Seconds to wait for a page of comments to arrive
+        idle_pages: Stop after this many pages in a row brought no new comments
+
+    Returns:
+        tuple: (comments, stats) where stats holds pages, elapsed_ms and
+            stop_reason ("target", "time_budget", "no_new_comments" or
+            "no_more_comments")
+    """
+    registry = get_registry()
+    containers = registry.ordered("comment_container", POST_SELECTORS["comment_container"])
+    load_more = registry.ordered("load_more_comments", POST_SELECTORS["load_more_comments"])
+    load_more_selectors = load_more + registry.ordered("view_comments", POST_SELECTORS["view_comments"])
+
+    started = time.time()
+    deadline = started + time_budget
+    comments = []
+    seen_ids = set()
+    pages = 0
+    idle = 0
+    stop_reason = "no_more_comments"
+
+    while True:
+        wait_ms = int(min(page_wait, deadline - time.time()) * 1000)
+        try:
+            result = driver.execute_async_script(LOAD_COMMENTS_PAGE_JS, containers, load_more_selectors, {
+                "reset": pages == 0,
+                "needed": max_comments - len(comments),
+                "wait_ms": max(wait_ms, 0),
+                "load_more_count": len(load_more)
+            }) or {}
+        except Exception as e:
+            print(f"Error loading comments: {e}")
+            break
+        pages += 1
+        registry.record_bundle(result.get("probes"))
+
+        new_comments = 0
+        for comment in result.get("comments", []):
+            key = comment.pop("key")
+            if key in seen_ids:
+                continue
+            seen_ids.add(key)
+            comments.append(comment)
+            new_comments += 1
+            if len(comments) >= max_comments:
+                break
+
+        idle = 0 if new_comments else idle + 1
+        if len(comments) >= max_comments:
+            stop_reason = "target"
+            break
+        if pages > 1 and idle >= idle_pages:
+            stop_reason = "no_new_comments"
+            break
+        if wait_ms <= 0 or time.time() >= deadline:
+            stop_reason = "time_budget"
+            break
+        if not result.get("clicked"):
+            stop_reason = "no_more_comments"
+            break
+
+    stats = {
+        "pages": pages,
+        "elapsed_ms": int((time.time() - started) * 1000),
+        "stop_reason": stop_reason
+    }
+    return comments, stats
@@ -0,0 +1,138 @@
+import re
+import time
+import random
+from functools import lru_cache
+
+_np = None
+
+# Abbreviations Instagram uses for large counts in the locales we scrape
+# (English, Spanish/Portuguese, German, French)
+MULTIPLIERS = {
+    "thousand": 1_000, "tsd": 1_000, "mil": 1_000, "k": 1_000,
+    "million": 1_000_000, "mill": 1_000_000, "mio": 1_000_000, "mn": 1_000_000, "m": 1_000_000,
+    "billion": 1_000_000_000, "mrd": 1_000_000_000, "bn": 1_000_000_000, "b": 1_000_000_000
+}
+
+# A number not glued to a word (so "em3rging" is not a count), with optional
+# thousands groups, decimal part and abbreviation, e.g. "3,401", "1.234,5",
+# "1.2K likes", "12,5 mil", "1,2 Mio."
+COUNT_PATTERN = re.compile(
+    r"(?<![\w.,])"
+    r"(?P<integer>\d{1,3}(?:(?P<group>[,. \u00a0\u202f])\d{3})(?:(?P=group)\d{3})*|\d+)"
+    r"(?:[.,](?P<decimal>\d+))?"
+    r"(?:\s*(?P<suffix>" + "|".join(sorted(MULTIPLIERS, key=len, reverse=True)) + r")\.?)?"
+    r"(?![^\W\d_])",
+    re.IGNORECASE
+)
+
+@lru_cache(maxsize=65536)
+def _parse_text(text):
+    match = COUNT_PATTERN.search(text)
+    if not match:
+        return None
+
+    integer, group, decimal, suffix = match.group("integer", "group", "decimal", "suffix")
+    if group and not decimal and suffix and integer.count(group) == 1 and group in ",.":
+        # "1.234K" is a decimal number with an abbreviation, not 1,234 thousands
+        integer, decimal = integer.split(group)
+    digits = re.sub(r"\D", "", integer)
+    number = float(f"{digits}.{decimal}") if decimal else int(digits)
+    if suffix:
+        number *= MULTIPLIERS[suffix.lower()]
+    return int(round(number))
+
+def parse_count(value):
+    """
+    Parse an engagement count shown by Instagram into an integer
+
+    Handles thousands separators ("3,401", "3.401", "3 401"), decimal commas
+    and dots, K/M/B and localized abbreviations ("1.2K", "12,5 mil",
+    "1,2 Mio.") and surrounding words ("2,400 likes", "1.5M views").
+
+    Args:
+        value: Display string, or a number that is returned as is
+
+    Returns:
+        int: Parsed count, or None if the value contains no count
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    return _parse_text(str(value))
+
+def parse_counts(values):
+    """
+    Parse many counts at once, e.g. when re-reading historical JSON
+
+    With NumPy, the values are deduplicated first so each distinct display
+    string is parsed only once and the results are scattered back.
+
+    Args:
+        values: Iterable of display strings or numbers
+
+    Returns:
+        list: Parsed counts (None where nothing could be parsed)
+    """
+    values = list(values)
+    np = _numpy()
+    if np is None or not values:
+        return [parse_count(value) for value in values]
+
+    texts = np.array(["" if value is None else str(value) for value in values], dtype=object)
+    uniques, inverse = np.unique(texts, return_inverse=True)
+    parsed = np.array([parse_count(value) for value in uniques], dtype=object)
+    return parsed[inverse].tolist()
+
+def _numpy():
+    """numpy, imported on first use so importing this module stays cheap (None if not installed)"""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+def add_numeric_counts(post_data):
+    """Store likes_numeric and comments_numeric next to the display strings"""
+    post_data["likes_numeric"] = parse_count(post_data.get("likes_count"))
+    post_data["comments_numeric"] = parse_count(post_data.get("comments_count"))
+    return post_data
+
+def benchmark(size=1_000_000, distinct=5_000):
+    """Time the naive digit filter against parse_count and parse_counts"""
+    random.seed(0)
+    samples = []
+    for _ in range(distinct):
+        number = random.paretovariate(0.8)
+        samples.append(random.choice([
+            f"{int(number):,}",
+            f"{int(number):,} likes",
+            f"{number / 1000:.1f}K",
+            f"{number / 1_000_000:.1f}M views",
+            f"{int(number):,}".replace(",", "."),
+            f"{number / 1000:.1f} mil".replace(".", ","),
+            "Not available"
+        ]))
+    values = [random.choice(samples) for _ in range(size)]
+    print(f"Parsing {size:,} strings ({distinct:,} distinct)")
+
+    started = time.perf_counter()
+    [int(''.join(c for c in value if c.isdigit()) or 0) for value in values]
+    print(f"- digit filter (old):      {time.perf_counter() - started:.2f}s")
+
+    _parse_text.cache_clear()
+    started = time.perf_counter()
+    [parse_count(value) for value in values]
+    print(f"- parse_count (cached):    {time.perf_counter() - started:.2f}s")
+
+    _parse_text.cache_clear()
+    started = time.perf_counter()
+    parse_counts(values)
+    mode = "numpy" if _numpy() else "no numpy"
+    print(f"- parse_counts ({mode}): {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,304 @@
+import os
+import glob
+import json
+import math
+import time
+import heapq
+from post_sink import iter_posts
+
+DEFAULT_STATE_PATH = "data/crawl_frontier.json"
+
+# Page loads a target costs on top of its posts (home page, search page);
+# targets are only started when the remaining budget covers this much
+TARGET_OVERHEAD_PAGES = 3
+
+def target_key(kind, name):
+    """Frontier key of a profile or hashtag ("profile:natgeo", "hashtag:travel")"""
+    return f"{kind}:{name.lstrip('@#').strip().lower()}"
+
+def target_query(key):
+    """run_scraper search query of a frontier key"""
+    kind, name = key.split(":", 1)
+    return f"#{name}" if kind == "hashtag" else name
+
+class CrawlFrontier:
+    """
+    Deduplicated priority queue of profiles and hashtags to crawl.
+
+    Targets discovered in scraped posts (mentions, tagged users, authors and
+    co-occurring hashtags) gain a reference and the engagement of the post
+    that referenced them every time they are seen. Priority is
+
+        (log(1 + engagement) + 2 * log(1 + references)) * novelty
+
+    where novelty halves with every hop from the seeds and again for targets
+    crawled in an earlier run, so well-connected, high-engagement targets
+    that were not crawled yet come first. Targets crawled within
+    revisit_hours are not queued again. Priorities change as evidence
+    arrives, so the heap may hold stale entries, skipped when popped.
+    """
+
+    def __init__(self, path=None, max_depth=2, revisit_hours=24):
+        """
+        Initialize the frontier, loading the state of an earlier crawl
+
+        Args:
+            path: JSON file keeping the frontier between runs (None keeps it in memory)
+            max_depth: Hops from the seeds beyond which targets are not queued
+            revisit_hours: Hours before a crawled target may be queued again
+        """
+        self.path = path
+        self.max_depth = max_depth
+        self.revisit_seconds = revisit_hours * 3600
+        self.targets = {}  # key -> {"depth", "references", "engagement", "seed"}
+        self.visited = {}  # key -> {"visited_at", "posts", "page_loads"}
+        self._heap = []    # (-priority, key)
+        self.load()
+
+    def load(self):
+        """Load the queue and visit history of an earlier crawl"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except Exception as e:
+            print(f"Could not load crawl frontier: {e}")
+            return
+        self.visited = state.get("visited", {})
+        for key, target in state.get("targets", {}).items():
+            if not self._recently_visited(key):
+                self.targets[key] = target
+                self._push(key)
+
+    def save(self):
+        """Persist the queue and visit history (no-op without a path)"""
+        if not self.path:
+            return
+        state = {
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "targets": self.targets,
+            "visited": self.visited
+        }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as state_file:
+                json.dump(state, state_file, indent=4, ensure_ascii=False)
+        except Exception as e:
+            print(f"Could not save crawl frontier: {e}")
+
+    def __len__(self):
+        return len(self.targets)
+
+    def _recently_visited(self, key):
+        visit = self.visited.get(key)
+        return visit is not None and time.time() - visit["visited_at"] < self.revisit_seconds
+
+    def priority(self, key):
+        """Current priority of a queued target"""
+        target = self.targets[key]
+        if target.get("seed"):
+            return math.inf
+        novelty = 0.5 ** target["depth"]
+        if key in self.visited:
+            novelty *= 0.5
+        return (math.log1p(target["engagement"]) + 2 * math.log1p(target["references"])) * novelty
+
+    def _push(self, key):
+        heapq.heappush(self._heap, (-self.priority(key), key))
+
+    def add_seed(self, kind, name):
+        """Queue a target to crawl first, whenever it was last crawled"""
+        key = target_key(kind, name)
+        self.targets[key] = {"depth": 0, "references": 0, "engagement": 0, "seed": True}
+        self._push(key)
+        return key
+
+    def discover(self, kind, name, depth, engagement=0):
+        """
+        Record a reference to a target found in a scraped post
+
+        Args:
+            kind: "profile" or "hashtag"
+            name: Username or hashtag (with or without @/#)
+            depth: Hops from the seeds
+            engagement: Likes of the post that referenced it
+
+        Returns:
+            bool: True if the target is (still) queued
+        """
+        key = target_key(kind, name)
+        if key.endswith(":") or depth > self.max_depth or self._recently_visited(key):
+            return False
+        target = self.targets.get(key)
+        if target is None:
+            target = self.targets[key] = {"depth": depth, "references": 0, "engagement": 0, "seed": False}
+        target["depth"] = min(target["depth"], depth)
+        target["references"] += 1
+        target["engagement"] += engagement or 0
+        self._push(key)
+        return True
+
+    def pop(self):
+        """
+        Remove and return the highest-priority target
+
+        Returns:
+            tuple: (key, target, priority) or None when the frontier is empty
+        """
+        while self._heap:
+            negative_priority, key = heapq.heappop(self._heap)
+            if key in self.targets and -negative_priority == self.priority(key):
+                return key, self.targets.pop(key), -negative_priority
+        return None
+
+    def requeue(self, key, target):
+        """Put back a popped target that could not be crawled, keeping its evidence"""
+        self.targets[key] = target
+        self._push(key)
+
+    def mark_visited(self, key, posts=0, page_loads=0):
+        """Record that a target was crawled"""
+        self.visited[key] = {"visited_at": time.time(), "posts": posts, "page_loads": page_loads}
+
+    def discover_from_posts(self, posts, source_key, depth):
+        """
+        Queue everything the posts of a crawled target point to
+
+        Args:
+            posts: Raw scraped posts of the target
+            source_key: Key of the crawled target (not queued again)
+            depth: Depth of the discovered targets
+
+        Returns:
+            int: Number of references recorded
+        """
+        references = 0
+        for post in posts:
+            if "error" in post:
+                continue
+            engagement = post.get("likes_numeric") or 0
+            # Keys, so "@alice" mentioned and "alice" tagged count once per post
+            found = set()
+            for mention in post.get("mentions", []):
+                found.add(target_key("profile", mention))
+            for user in post.get("tagged_users", []):
+                found.add(target_key("profile", user))
+            if post.get("username") not in (None, "Not found"):
+                found.add(target_key("profile", post["username"]))
+            for hashtag in post.get("hashtags", []):
+                found.add(target_key("hashtag", hashtag))
+            found.discard(source_key)
+            for key in found:
+                kind, name = key.split(":", 1)
+                if self.discover(kind, name, depth, engagement):
+                    references += 1
+        return references
+
+def _scraped_posts(data_file_path):
+    """Raw posts of the session a run_scraper data file belongs to"""
+    session_folder = os.path.dirname(data_file_path)
+    for stream in sorted(glob.glob(os.path.join(session_folder, "*_posts_*.jsonl*"))):
+        yield from iter_posts(stream)
+
+def run_crawl(seeds, budget_pages=1000, max_posts=12, max_depth=2, revisit_hours=24,
+              state_path=DEFAULT_STATE_PATH, requests_per_hour=300, job_timeout=1800, **scrape_options):
+    """
+    Crawl from seed profiles and hashtags, always scraping the most valuable target next
+
+    Every page load of the crawl counts against budget_pages; targets are
+    scraped in priority order until the budget or the frontier runs out.
+    The remaining budget is enforced on every page load of a target (its
+    profile detours included), so a target that runs out of it is stopped
+    and queued again for the next crawl instead of overshooting the budget.
+    The frontier is saved after every target, so an interrupted crawl
+    resumes where it stopped.
+
+    Args:
+        seeds: Usernames and #hashtags to start from
+        budget_pages: Page loads the whole crawl may spend
+        max_posts: Posts scraped per target
+        max_depth: Hops from the seeds to follow
+        revisit_hours: Hours before a crawled target may be crawled again
+        state_path: JSON file keeping the frontier between crawls (None keeps it in memory)
+        requests_per_hour: Page loads per hour allowed for the logged-in account
+        job_timeout: Seconds one target may take
+        **scrape_options: Passed to run_scraper (headless, capture_network, ...)
+
+    Returns:
+        list: One {"target", "priority", "posts", "page_loads", "discovered", "data_file"} per target crawled
+    """
+    # Imported here so the frontier can be used without the browser stack
+    from main import run_scraper, start_logged_in_driver
+    from driver_pool import DriverPool, PageBudgetExhausted
+    from profile_orchestrator import JobLease, get_account_limiter
+
+    frontier = CrawlFrontier(state_path, max_depth=max_depth, revisit_hours=revisit_hours)
+    for seed in seeds:
+        frontier.add_seed("hashtag" if seed.startswith("#") else "profile", seed)
+
+    account = os.getenv("INSTAGRAM_USERNAME") or "default"
+    pool = DriverPool(
+        lambda: start_logged_in_driver(headless=scrape_options.get("headless", False),
+                                       capture_network=scrape_options.get("capture_network", False),
+                                       fast_mode=scrape_options.get("fast_mode", False)),
+        size=max(1, scrape_options.get("detail_workers", 1)),
+        rate_limiter=get_account_limiter(account, requests_per_hour)
+    )
+
+    spent = 0
+    crawled = []
+    print(f"Crawling from {len(seeds)} seeds with a budget of {budget_pages} page loads")
+    try:
+        while spent < budget_pages:
+            # Scrape fewer posts when the budget cannot cover a full target
+            posts_allowed = min(max_posts, budget_pages - spent - TARGET_OVERHEAD_PAGES)
+            if posts_allowed < 1:
+                break
+            next_target = frontier.pop()
+            if next_target is None:
+                print("Frontier is empty")
+                break
+            key, target, priority = next_target
+            priority = "seed" if target.get("seed") else f"{priority:.2f}"
+            print(f"\nCrawling {key} (priority {priority}, depth {target['depth']}, "
+                  f"{spent}/{budget_pages} page loads spent)")
+
+            lease = JobLease(pool, time.time() + job_timeout, max_page_loads=budget_pages - spent)
+            try:
+                data_file = run_scraper(search_query=target_query(key), driver_pool=lease,
+                                        max_posts=posts_allowed, max_details=posts_allowed,
+                                        raise_errors=True, **scrape_options)
+            except PageBudgetExhausted:
+                spent += lease.page_loads
+                print(f"Budget ran out while crawling {key}, queued again for the next crawl")
+                frontier.requeue(key, target)
+                break
+            except Exception as e:
+                print(f"Error crawling {key}: {e}")
+                data_file = None
+            spent += lease.page_loads
+
+            posts = list(_scraped_posts(data_file)) if data_file else []
+            discovered = 0
+            if target["depth"] < max_depth:
+                discovered = frontier.discover_from_posts(posts, key, target["depth"] + 1)
+            frontier.mark_visited(key, posts=len(posts), page_loads=lease.page_loads)
+            frontier.save()
+
+            crawled.append({"target": key, "priority": priority, "posts": len(posts),
+                            "page_loads": lease.page_loads, "discovered": discovered, "data_file": data_file})
+            print(f"{key}: {len(posts)} posts, {lease.page_loads} page loads, {discovered} references, "
+                  f"{len(frontier)} targets queued")
+    finally:
+        pool.close()
+        frontier.save()
+
+    print(f"\nCrawl finished: {len(crawled)} targets, {spent}/{budget_pages} page loads, "
+          f"{len(frontier)} targets left in the frontier")
+    for entry in crawled:
+        print(f"- {entry['target']:<30} priority {entry['priority']:>6}  {entry['posts']:>3} posts  "
+              f"{entry['discovered']:>4} references")
+    return crawled
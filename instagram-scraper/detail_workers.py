@@ -0,0 +1,325 @@
+import time
+import random
+import queue
+import threading
+from scraper import scrape_post_details
+from driver_pool import JobTimeout
+import tracing
+
+class RateLimiter:
+    """
+    Token bucket shared by all workers to cap requests per minute.
+
+    Each post page costs one token. Tokens refill continuously at
+    requests_per_minute / 60 per second, up to burst tokens.
+    """
+
+    def __init__(self, requests_per_minute, burst=1):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: Sustained request rate allowed (0 disables the cap)
+            burst: Number of requests that may be made back to back
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request is allowed
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            tracing.sleep(delay, "rate_limit")
+            waited += delay
+
+def scrape_post_with_retries(driver, url, retries=3, label="", max_comments=10, comment_budget=10,
+                             preloaded=False, before_extraction=None):
+    """
+    Scrape one post, retrying on errors
+
+    Args:
+        driver: Selenium WebDriver instance
+        url: URL of the post to scrape
+        retries: Number of attempts before giving up
+        label: Prefix for progress messages (e.g. "3/20")
+        max_comments: Maximum number of comments to collect per post
+        comment_budget: Seconds allowed for loading more comments per post
+        preloaded: The current tab already started loading url (retries navigate again)
+        before_extraction: Called once, before the first extraction of the post
+
+    Returns:
+        dict: Post details, or a placeholder with the URL and error after all retries fail
+    """
+    post_attempts = 0
+    hook = {"called": False}
+
+    def before_first_extraction():
+        if not hook["called"]:
+            hook["called"] = True
+            before_extraction()
+
+    while post_attempts < retries:
+        try:
+            print(f"Scraping post {label}: {url} (attempt {post_attempts+1})")
+            return scrape_post_details(driver, url, max_comments=max_comments, comment_budget=comment_budget,
+                                       preloaded=preloaded and post_attempts == 0,
+                                       before_extraction=before_first_extraction if before_extraction else None)
+        except JobTimeout:
+            raise  # Retrying cannot help once the job's time is up
+        except Exception as e:
+            post_attempts += 1
+            print(f"Error scraping post {url}: {e}")
+            if post_attempts >= retries:
+                print(f"Skipping post {url} after {retries} failed attempts")
+                # Add a minimal placeholder with just the URL to maintain consistency
+                return {"url": url, "error": str(e)}
+            tracing.sleep(random.uniform(3, 5))
+
+def preload_in_tab(driver, url, tab_names, tab_handles, current):
+    """
+    Start loading url in the other tab without waiting for it
+
+    window.open with the other tab's name navigates that tab while the
+    WebDriver session stays on the current one. The page load still goes
+    through the driver's pool gate (rate limit, job deadline, page count).
+
+    Args:
+        driver: Selenium WebDriver instance
+        url: URL to load
+        tab_names: Window names of the two tabs
+        tab_handles: Window handles of the two tabs (None until the second tab is opened)
+        current: Index of the tab the session is on
+
+    Returns:
+        bool: True if the other tab is loading url
+    """
+    other = 1 - current
+    try:
+        before_page_load = getattr(driver, "before_page_load", None)
+        if before_page_load:
+            before_page_load()
+        with tracing.span("preload"):
+            # Name this tab too, so the next post can be preloaded back into it
+            driver.execute_script("window.name = arguments[0]; window.open(arguments[1], arguments[2]);",
+                                  tab_names[current], url, tab_names[other])
+            if tab_handles[other] is None:
+                opened = [handle for handle in driver.window_handles if handle != tab_handles[current]]
+                if not opened:
+                    raise RuntimeError("the second tab did not open")
+                tab_handles[other] = opened[-1]
+        return True
+    except JobTimeout:
+        raise
+    except Exception as e:
+        print(f"Could not preload {url}: {e}")
+        return False
+
+def scrape_details_pipelined(driver, urls, retries=3, pacing=(1.5, 3), on_result=None, max_comments=10,
+                             comment_budget=10):
+    """
+    Scrape post details with one driver, loading each post while the previous one is extracted
+
+    Once a post has loaded, the pacing delay that sequential scraping sleeps
+    after extracting it is slept first, then the next post starts loading
+    in a second tab and the current post is extracted. The session then
+    switches to the second tab, which is usually ready by then, so page
+    load latency overlaps extraction instead of adding to it. The delays
+    between posts stay the same as in sequential scraping; only the
+    extraction moves behind the next navigation.
+
+    Args:
+        driver: Logged-in Selenium WebDriver instance
+        urls: Post URLs to scrape
+        retries: Attempts per post before giving up
+        pacing: (min, max) seconds waited between a post loading and the next post's navigation
+        on_result: Called with each post as soon as it is scraped; the posts
+            are then not kept in memory
+        max_comments: Maximum number of comments to collect per post
+        comment_budget: Seconds allowed for loading more comments per post
+
+    Returns:
+        list: Post details in the same order as urls, or an empty list when
+            on_result is given
+    """
+    results = []
+    total = len(urls)
+    tab_names = (f"scraper-tab-{id(driver)}-0", f"scraper-tab-{id(driver)}-1")
+    tab_handles = [driver.current_window_handle, None]
+    current = 0
+    preloaded = False
+
+    print(f"Scraping {total} posts, preloading each next post in a second tab")
+    try:
+        for index, url in enumerate(urls):
+            next_url = urls[index + 1] if index + 1 < total else None
+            preload = {"waited": False, "started": False}
+
+            def preload_next():
+                delay = random.uniform(*pacing)
+                print(f"Waiting {delay:.1f} seconds before loading the next post...")
+                tracing.sleep(delay, "pacing")
+                preload["waited"] = True
+                preload["started"] = preload_in_tab(driver, next_url, tab_names, tab_handles, current)
+
+            post = scrape_post_with_retries(
+                driver, url, retries=retries, label=f"{index+1}/{total}", max_comments=max_comments,
+                comment_budget=comment_budget, preloaded=preloaded,
+                before_extraction=preload_next if next_url else None)
+            if on_result:
+                on_result(post)
+            else:
+                results.append(post)
+
+            if next_url is None:
+                break
+            if preload["started"]:
+                current = 1 - current
+                driver.switch_to.window(tab_handles[current])
+                preloaded = True
+            else:
+                # The post never loaded (or the preload failed): load the next one in this tab
+                if not preload["waited"]:
+                    tracing.sleep(random.uniform(*pacing), "pacing")
+                preloaded = False
+    finally:
+        # Leave the driver on its original tab, as a pool expects it back
+        try:
+            if tab_handles[1] is not None:
+                driver.switch_to.window(tab_handles[1])
+                driver.close()
+            driver.switch_to.window(tab_handles[0])
+        except Exception as e:
+            print(f"Error closing the preload tab: {e}")
+    return results
+
+def scrape_details_parallel(main_driver, urls, driver_pool, workers=3, requests_per_minute=20,
+                            retries=3, pacing=(1.5, 3), on_result=None, max_comments=10, comment_budget=10):
+    """
+    Scrape post details with several drivers pulling URLs from a shared queue
+
+    The main driver is always used as the first worker; the other workers
+    lease logged-in drivers from the pool (workers the pool cannot serve are
+    simply not started). Every post waits for the shared rate limiter, and
+    each worker also sleeps its own random pacing delay between posts.
+
+    Args:
+        main_driver: Logged-in driver used by the first worker
+        urls: Post URLs to scrape
+        driver_pool: DriverPool providing drivers for the other workers
+        workers: Maximum number of drivers scraping at the same time
+        requests_per_minute: Global cap on post page loads across all workers
+        retries: Attempts per post before giving up
+        pacing: (min, max) seconds each worker waits between its own posts
+        on_result: Called with each post in the order of urls, as soon as it
+            and every post before it are scraped; only posts finished ahead
+            of an earlier one are held in memory
+        max_comments: Maximum number of comments to collect per post
+        comment_budget: Seconds allowed for loading more comments per post
+
+    Returns:
+        list: Post details in the same order as urls, or an empty list when
+            on_result is given
+    """
+    jobs = queue.Queue()
+    for index, url in enumerate(urls):
+        jobs.put((index, url))
+
+    results = [None] * len(urls)
+    result_lock = threading.Lock()
+    # Posts finished ahead of an earlier one wait here until it is done
+    pending = {}
+    next_index = 0
+    limiter = RateLimiter(requests_per_minute)
+    total = len(urls)
+    tracer = tracing.get_tracer()
+
+    def flush_in_order():
+        nonlocal next_index
+        while next_index in pending:
+            on_result(pending.pop(next_index))
+            next_index += 1
+
+    def work(driver, worker_number):
+        posts_done = 0
+        while True:
+            try:
+                index, url = jobs.get_nowait()
+            except queue.Empty:
+                break
+
+            if posts_done:
+                tracing.sleep(random.uniform(*pacing), "pacing")
+            limiter.acquire()
+
+            post = scrape_post_with_retries(
+                driver, url, retries=retries, label=f"{index+1}/{total} [worker {worker_number}]",
+                max_comments=max_comments, comment_budget=comment_budget)
+            if on_result:
+                with result_lock:
+                    results[index] = True
+                    pending[index] = post
+                    flush_in_order()
+            else:
+                results[index] = post
+            posts_done += 1
+        print(f"Worker {worker_number} finished after {posts_done} posts")
+
+    def pooled_work(worker_number):
+        # Start the extra browser in this thread so startups overlap with scraping
+        tracing.attach(tracer)
+        try:
+            with tracing.span("driver_acquire"):
+                driver = driver_pool.acquire(block=False)
+        except Exception as e:
+            print(f"Could not start worker {worker_number}: {e}")
+            return
+        if driver is None:
+            print(f"No driver available for worker {worker_number}")
+            return
+        try:
+            work(driver, worker_number)
+        finally:
+            driver_pool.release(driver)
+
+    threads = []
+    for worker_number in range(2, min(workers, total) + 1):
+        thread = threading.Thread(target=pooled_work, args=(worker_number,), daemon=True,
+                                  name=f"worker-{worker_number}")
+        thread.start()
+        threads.append(thread)
+
+    print(f"Scraping {total} posts with up to {len(threads) + 1} workers, "
+          f"capped at {requests_per_minute} requests/minute")
+    work(main_driver, 1)
+
+    for thread in threads:
+        thread.join()
+
+    # Posts a crashed worker never finished still get a placeholder
+    if on_result:
+        for index, result in enumerate(results):
+            if result is None:
+                pending[index] = {"url": urls[index], "error": "Not scraped"}
+        flush_in_order()
+        return []
+    return [result if result is not None else {"url": urls[index], "error": "Not scraped"}
+            for index, result in enumerate(results)]
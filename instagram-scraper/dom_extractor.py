@@ -0,0 +1,140 @@
+import os
+import time
+from selector_lists import POST_SELECTORS
+from selector_stats import get_registry
+import tracing
+
+# Must match EXTRACTOR_VERSION in extract_post.js
+BUNDLE_VERSION = 3
+BUNDLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extract_post.js")
+
+_bundle_source = None
+
+def load_bundle():
+    """Read the extraction bundle once and cache it for the rest of the run"""
+    global _bundle_source
+    if _bundle_source is None:
+        with open(BUNDLE_PATH, "r", encoding="utf-8") as bundle_file:
+            _bundle_source = bundle_file.read()
+    return _bundle_source
+
+@tracing.traced("extract_dom")
+def run_extraction_bundle(driver, selectors=None, max_comments=10, click_tagged=True, expand_comments=True):
+    """
+    Extract every post field in one execute_async_script call
+
+    Args:
+        driver: Selenium WebDriver instance on a post page
+        selectors: Selector lists keyed like POST_SELECTORS (defaults to
+            POST_SELECTORS in the order learned by the selector registry)
+        max_comments: Maximum number of comments to read
+        click_tagged: Open the tagged users dialog if there is one
+        expand_comments: Click "View all comments" before reading comments
+
+    Returns:
+        dict: Raw bundle result, or None if the bundle failed
+    """
+    options = {
+        "max_comments": max_comments,
+        "click_tagged": click_tagged,
+        "expand_comments": expand_comments
+    }
+
+    registry = get_registry()
+    if selectors is None:
+        selectors = {key: registry.ordered(key, values) for key, values in POST_SELECTORS.items()}
+
+    started = time.time()
+    try:
+        result = driver.execute_async_script(load_bundle(), selectors, options)
+    except Exception as e:
+        print(f"Extraction bundle failed: {e}")
+        return None
+
+    if not isinstance(result, dict) or result.get("version") != BUNDLE_VERSION:
+        print(f"Extraction bundle returned an unexpected result (version {BUNDLE_VERSION} expected)")
+        return None
+    if result.get("error"):
+        print(f"Extraction bundle error: {result['error']}")
+        return None
+
+    registry.record_bundle(result.get("selector_probes"))
+    result["round_trip_ms"] = int((time.time() - started) * 1000)
+    return result
+
+def normalize_bundle_result(result, post_data, extract_tags):
+    """
+    Copy a raw bundle result into the post_data schema used by scrape_post_details
+
+    Args:
+        result: Dictionary returned by run_extraction_bundle
+        post_data: Post dictionary to update in place
+        extract_tags: Function returning (hashtags, mentions) for a caption
+
+    Returns:
+        dict: The updated post_data
+    """
+    if result.get("username"):
+        post_data["username"] = result["username"]
+        post_data["profile_data"]["username"] = result["username"]
+        if result.get("profile_url"):
+            post_data["profile_url"] = result["profile_url"]
+
+    if result.get("caption"):
+        post_data["caption"] = result["caption"]
+        hashtags, mentions = extract_tags(result["caption"])
+        if hashtags:
+            post_data["hashtags"] = hashtags
+        if mentions:
+            post_data["mentions"] = mentions
+        if result.get("shares_count"):
+            post_data["shares_count"] = result["shares_count"]
+
+    if result.get("post_date"):
+        post_data["post_date"] = result["post_date"]
+
+    # Avoid duplicating users already in mentions
+    tagged_users = [user for user in result.get("tagged_users") or []
+                    if "@" + user not in post_data["mentions"]]
+    if tagged_users:
+        post_data["tagged_users"] = tagged_users
+
+    if result.get("location"):
+        post_data["location"] = result["location"]
+        if result.get("location_url"):
+            post_data["location_url"] = result["location_url"]
+
+    post_data["media_urls"] = result.get("media") or []
+    if result.get("is_video"):
+        post_data["post_type"] = "Video"
+    if result.get("is_carousel"):
+        post_data["post_type"] = "Carousel"
+    elif post_data["post_type"] == "Unknown" and any(m["type"] == "image" for m in post_data["media_urls"]):
+        post_data["post_type"] = "Photo"
+    # For backward compatibility
+    if post_data["media_urls"] and "image_url" not in post_data:
+        post_data["image_url"] = post_data["media_urls"][0]["url"]
+
+    if result.get("likes_count"):
+        post_data["likes_count"] = result["likes_count"]
+    if result.get("comments_count"):
+        post_data["comments_count"] = result["comments_count"]
+    if result.get("comments"):
+        post_data["comments"] = result["comments"]
+
+    return post_data
+
+def extract_from_html(driver, html_path, **options):
+    """
+    Run the bundle against a saved post page, for testing selector changes offline
+
+    Args:
+        driver: Selenium WebDriver instance
+        html_path: Path to an HTML snapshot of a post page
+        **options: Passed through to run_extraction_bundle
+
+    Returns:
+        dict: Raw bundle result, or None if the bundle failed
+    """
+    driver.get("file://" + os.path.abspath(html_path))
+    return run_extraction_bundle(driver, **options)
@@ -0,0 +1,290 @@
+import time
+import threading
+
+
+class JobTimeout(TimeoutError):
+    """Raised when a page load is refused because the leasing job ran past its deadline"""
+
+
+class PageBudgetExhausted(JobTimeout):
+    """Raised when a page load would exceed the page budget of the leasing job (stops it like a timeout)"""
+
+
+class DriverPool:
+    """
+    Keep logged-in Chrome drivers alive and reuse them across scraping jobs.
+
+    Starting Chrome and logging in to Instagram costs more than scraping a
+    small profile, so batch runs lease drivers from this pool instead of
+    creating a new one for every username. Drivers are health-checked between
+    jobs and recycled after too many page loads or when the page heap grows
+    past a memory threshold.
+    """
+
+    def __init__(self, driver_factory, size=1, max_pages=200, max_memory_mb=1024, rate_limiter=None):
+        """
+        Initialize the pool
+
+        Args:
+            driver_factory: Callable returning a new, already logged-in WebDriver
+            size (int): Maximum number of drivers alive at the same time
+            max_pages (int): Recycle a driver after this many page loads (0 disables)
+            max_memory_mb (int): Recycle a driver when its JS heap exceeds this many MB (0 disables)
+            rate_limiter (RateLimiter): Token bucket every page load of every
+                driver in the pool waits for (all drivers share one account)
+        """
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.rate_limiter = rate_limiter
+
+        self._idle = []
+        self._entries = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._started = 0
+
+        # Startup cost bookkeeping, used to report time saved by reuse
+        self.startup_times = []
+        self.jobs = 0
+        self.reused_jobs = 0
+        self.time_saved = 0.0
+
+    def acquire(self, block=True):
+        """
+        Lease a healthy, logged-in driver, creating one if needed
+
+        Args:
+            block (bool): Wait for a driver to be released when the pool is
+                at capacity; with False, return None instead
+
+        Returns:
+            WebDriver instance ready for scraping
+        """
+        while True:
+            with self._condition:
+                driver = None
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+
+                    if self._idle:
+                        # Leased as soon as it leaves the idle list; checked outside the lock
+                        driver = self._idle.pop()
+                        entry = self._entries[id(driver)]
+                        break
+
+                    if len(self._entries) < self.size:
+                        self._started += 1
+                        number = self._started
+                        # Reserve the slot before releasing the lock to start Chrome
+                        self._entries[("pending", number)] = None
+                        break
+
+                    if not block:
+                        return None
+                    self._condition.wait()
+
+            if driver is None:
+                break
+
+            # The health check talks to the browser, which may hang, so it
+            # runs without holding up other acquire and release calls
+            if self._needs_recycle(entry):
+                self._discard(driver)
+                continue
+
+            with self._condition:
+                if self._closed:
+                    # close() already quit it along with the other drivers
+                    raise RuntimeError("Driver pool is closed")
+                entry["jobs"] += 1
+                self.jobs += 1
+                self.reused_jobs += 1
+                saved = self.average_startup_time()
+                self.time_saved += saved
+            print(f"♻️ Reusing logged-in driver #{entry['number']} "
+                  f"(job {entry['jobs']}, saved ~{saved:.1f}s of startup/login)")
+            return driver
+
+        started = time.time()
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._condition:
+                del self._entries[("pending", number)]
+                self._condition.notify()
+            raise
+        startup_time = time.time() - started
+
+        self._count_page_loads(driver)
+        with self._condition:
+            del self._entries[("pending", number)]
+            closed = self._closed
+            if not closed:
+                self._entries[id(driver)] = {
+                    "number": number,
+                    "driver": driver,
+                    "jobs": 1,
+                    "created_at": started,
+                }
+                self.startup_times.append(startup_time)
+                self.jobs += 1
+            self._condition.notify()
+
+        if closed:
+            # close() ran while Chrome was starting, so nothing else will quit it
+            self._quit(driver)
+            raise RuntimeError("Driver pool is closed")
+
+        print(f"Started driver #{number} in {startup_time:.1f}s (setup + login)")
+        return driver
+
+    def release(self, driver, healthy=True):
+        """
+        Return a leased driver to the pool
+
+        Args:
+            driver: Driver previously returned by acquire()
+            healthy (bool): Pass False to force the driver to be discarded
+        """
+        with self._condition:
+            entry = self._entries.get(id(driver))
+            if entry is None:
+                return
+
+            discard = self._closed or not healthy
+            if discard:
+                self._forget(driver)
+            else:
+                self._idle.append(driver)
+            self._condition.notify()
+
+        if discard:
+            self._quit(driver)
+
+    def close(self):
+        """Quit every driver and print a summary of the time saved"""
+        with self._condition:
+            self._closed = True
+            drivers = [entry["driver"] for entry in self._entries.values() if entry is not None]
+            for driver in drivers:
+                self._forget(driver)
+            self._idle = []
+            self._condition.notify_all()
+
+        for driver in drivers:
+            self._quit(driver)
+
+        if self.jobs:
+            print(f"Driver pool: {self.jobs} jobs, {len(self.startup_times)} driver starts, "
+                  f"{self.reused_jobs} reused, ~{self.time_saved:.1f}s of startup/login saved")
+
+    def average_startup_time(self):
+        """Average seconds spent creating and logging in a driver"""
+        if not self.startup_times:
+            return 0.0
+        return sum(self.startup_times) / len(self.startup_times)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _count_page_loads(self, driver):
+        """
+        Wrap driver.get so the pool knows how many pages a driver has loaded
+
+        Page loads also wait for the pool's rate limiter and are refused once
+        the deadline of the job leasing the driver (driver.job_deadline) has
+        passed (JobTimeout), so a timed-out job stops loading pages. Scraping
+        code lets JobTimeout propagate instead of treating it as one more
+        page that failed to load, so the job's thread ends. Navigations started
+        without driver.get (e.g. preloading a tab) call driver.before_page_load
+        to be paced and counted the same way. The leasing job may also set
+        driver.page_load_gate, a callable run before every page load that
+        raises to refuse it (e.g. PageBudgetExhausted).
+        """
+        original_get = driver.get
+        driver.page_loads = 0
+        driver.job_deadline = None
+        driver.page_load_gate = None
+
+        def before_page_load():
+            # Check the deadline first so a timed-out job never takes a token
+            # the live jobs sharing the account bucket need
+            if driver.job_deadline and time.time() > driver.job_deadline:
+                raise JobTimeout("Job ran past its time limit")
+            if driver.page_load_gate:
+                driver.page_load_gate()
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            if driver.job_deadline and time.time() > driver.job_deadline:
+                raise JobTimeout("Job ran past its time limit")
+            driver.page_loads += 1
+
+        def counting_get(url):
+            before_page_load()
+            return original_get(url)
+
+        driver.before_page_load = before_page_load
+        driver.get = counting_get
+
+    def _needs_recycle(self, entry):
+        """Check health, page count and memory of an idle driver"""
+        driver = entry["driver"]
+
+        if self.max_pages and getattr(driver, "page_loads", 0) >= self.max_pages:
+            print(f"Recycling driver #{entry['number']} after {driver.page_loads} page loads")
+            return True
+
+        try:
+            driver.execute_script("return document.readyState")
+            if not driver.get_cookie("sessionid"):
+                print(f"Driver #{entry['number']} lost its Instagram session, recycling")
+                return True
+        except Exception as e:
+            print(f"Driver #{entry['number']} failed health check: {e}")
+            return True
+
+        if self.max_memory_mb:
+            heap_mb = self._heap_size_mb(driver)
+            if heap_mb > self.max_memory_mb:
+                print(f"Recycling driver #{entry['number']} using {heap_mb:.0f} MB of JS heap")
+                return True
+
+        return False
+
+    def _heap_size_mb(self, driver):
+        """Read the JS heap size of the current page through Chrome DevTools"""
+        try:
+            driver.execute_cdp_cmd("Performance.enable", {})
+            metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})
+            for metric in metrics.get("metrics", []):
+                if metric.get("name") == "JSHeapTotalSize":
+                    return metric.get("value", 0) / (1024 * 1024)
+        except Exception:
+            pass
+        return 0
+
+    def _discard(self, driver):
+        """Forget about a driver and quit it (caller does not hold the lock)"""
+        with self._condition:
+            self._forget(driver)
+            self._condition.notify()
+        self._quit(driver)
+
+    def _forget(self, driver):
+        """Remove a driver from the pool (caller holds the lock)"""
+        self._entries.pop(id(driver), None)
+        if driver in self._idle:
+            self._idle.remove(driver)
+
+    def _quit(self, driver):
+        """Quit a driver, which can take a while with a hung browser (caller does not hold the lock)"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,258 @@
+// Instagram post extraction bundle.
+//
+// Runs every selector list from selector_lists.py inside the page and returns
+// the raw post fields in a single execute_async_script round trip. It mirrors
+// the DOM probing in scraper.py (same selectors, same order, same acceptance
+// rules); dom_extractor.normalize_bundle_result turns the result into post_data.
+//
+// arguments[0]: selector lists keyed like POST_SELECTORS
+// arguments[1]: options {click_tagged, expand_comments, max_comments}
+// Bump EXTRACTOR_VERSION (here and in dom_extractor.py) on every change.
+var EXTRACTOR_VERSION = 3;
+var done = arguments[arguments.length - 1];
+var selectors = arguments[0];
+var options = arguments[1] || {};
+var started = performance.now();
+var hits = {};
+var probes = [];  // {key, selector, hit, ms} for every selector tried
+
+function recordProbe(key, selector, hit, since) {
+    probes.push({key: key, selector: selector, hit: hit, ms: performance.now() - since});
+}
+
+function first(xpath, context) {
+    try {
+        return document.evaluate(xpath, context || document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) {
+        return null;
+    }
+}
+
+function all(xpath, context) {
+    var nodes = [];
+    try {
+        var result = document.evaluate(xpath, context || document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+    } catch (e) {}
+    return nodes;
+}
+
+function text(node) {
+    return node ? (node.innerText || node.textContent || "").trim() : "";
+}
+
+function hasDigit(value) {
+    return /\d/.test(value || "");
+}
+
+// Return the first non-null value produced by accept() for the first node of
+// each selector in priority order, remembering which selector matched
+function firstMatch(key, accept) {
+    var list = selectors[key] || [];
+    for (var i = 0; i < list.length; i++) {
+        var since = performance.now();
+        var node = first(list[i]);
+        var value = node ? accept(node) : null;
+        var hit = value !== null && value !== undefined;
+        recordProbe(key, list[i], hit, since);
+        if (hit) {
+            hits[key] = list[i];
+            return value;
+        }
+    }
+    return null;
+}
+
+function sleep(ms) {
+    return new Promise(function(resolve) { setTimeout(resolve, ms); });
+}
+
+// Wait until check() is truthy or the timeout passes
+function waitFor(check, timeoutMs) {
+    var deadline = Date.now() + timeoutMs;
+    return new Promise(function(resolve) {
+        (function poll() {
+            if (check() || Date.now() >= deadline) { resolve(); return; }
+            setTimeout(poll, 100);
+        })();
+    });
+}
+
+async function extract() {
+    var result = {version: EXTRACTOR_VERSION};
+
+    var user = firstMatch("username", function(node) {
+        var name = text(node);
+        return name && name.indexOf("Like") !== 0 ? {username: name, profile_url: node.href || null} : null;
+    });
+    if (user) {
+        result.username = user.username;
+        result.profile_url = user.profile_url;
+    }
+
+    result.caption = firstMatch("caption", function(node) {
+        var caption = text(node);
+        return caption.length > 5 ? caption : null;
+    });
+    if (result.caption) {
+        result.shares_count = firstMatch("shares", function(node) {
+            var shares = text(node);
+            return hasDigit(shares) ? shares : null;
+        });
+    }
+
+    result.post_date = firstMatch("date", function(node) {
+        return node.getAttribute("datetime") || text(node) || null;
+    });
+
+    // Tagged users may sit behind a button that opens a dialog
+    var taggedClicked = false;
+    if (options.click_tagged !== false) {
+        taggedClicked = !!firstMatch("tagged_button", function(node) {
+            node.click();
+            return true;
+        });
+        if (taggedClicked) {
+            await sleep(1000);
+        }
+    }
+    var taggedList = selectors.tagged_users || [];
+    result.tagged_users = [];
+    for (var t = 0; t < taggedList.length; t++) {
+        var taggedSince = performance.now();
+        var names = all(taggedList[t]).map(text).filter(function(name) {
+            return name && name.indexOf("Back") !== 0 && name.indexOf("Close") !== 0;
+        });
+        recordProbe("tagged_users", taggedList[t], names.length > 0, taggedSince);
+        if (names.length) {
+            hits.tagged_users = taggedList[t];
+            result.tagged_users = names;
+            break;
+        }
+    }
+    if (taggedClicked) {
+        var close = first("//button[contains(@aria-label, 'Close')]");
+        if (close) {
+            close.click();
+            await sleep(500);
+        }
+    }
+
+    var location = firstMatch("location", function(node) {
+        var name = text(node);
+        return name && name !== result.username ? {name: name, url: node.href || null} : null;
+    });
+    if (location) {
+        result.location = location.name;
+        if (location.url && location.url.indexOf("locations") !== -1) {
+            result.location_url = location.url;
+        }
+    }
+
+    // Media: videos first, then carousel detection, then images
+    result.media = [];
+    result.is_video = false;
+    (selectors.video || []).forEach(function(xpath) {
+        all(xpath).forEach(function(video) {
+            var src = video.getAttribute("src") || video.src;
+            var poster = video.getAttribute("poster");
+            if (src && /scontent|instagram|cdninstagram/.test(src)) {
+                result.media.push({type: "video", url: src});
+                result.is_video = true;
+            }
+            if (poster && /scontent|instagram/.test(poster)) {
+                result.media.push({type: "poster", url: poster});
+            }
+        });
+    });
+    result.is_carousel = !!firstMatch("carousel", function() { return true; });
+    if (!result.is_video) {
+        (selectors.image || []).forEach(function(xpath) {
+            all(xpath).forEach(function(img) {
+                var src = img.src;
+                var known = result.media.some(function(media) { return media.url === src; });
+                if (src && /scontent|instagram/.test(src) && !known) {
+                    result.media.push({type: "image", url: src});
+                }
+            });
+        });
+    }
+
+    result.likes_count = firstMatch("likes", function(node) {
+        var likes = text(node);
+        if (hasDigit(likes)) { return likes; }
+        var aria = node.getAttribute("aria-label");
+        return aria && aria.toLowerCase().indexOf("like") !== -1 && hasDigit(aria) ? aria : null;
+    });
+
+    result.comments_count = firstMatch("comments_count", function(node) {
+        var comments = text(node);
+        if (hasDigit(comments)) { return comments; }
+        var aria = node.getAttribute("aria-label");
+        return aria && aria.toLowerCase().indexOf("comment") !== -1 && hasDigit(aria) ? aria : null;
+    });
+
+    // Comments: expand the list, then read up to max_comments entries
+    var containers = selectors.comment_container || [];
+    function countComments() {
+        for (var c = 0; c < containers.length; c++) {
+            var found = all(containers[c]).length;
+            if (found) { return found; }
+        }
+        return 0;
+    }
+    if (options.expand_comments !== false) {
+        var before = countComments();
+        var expanded = false;
+        (selectors.view_comments || []).some(function(xpath) {
+            var viewSince = performance.now();
+            var links = all(xpath);
+            recordProbe("view_comments", xpath, links.length > 0, viewSince);
+            if (links.length) {
+                links[0].click();
+                expanded = true;
+                hits.view_comments = xpath;
+            }
+            return expanded;
+        });
+        if (expanded) {
+            await waitFor(function() { return countComments() > before; }, 2000);
+        }
+    }
+
+    result.comments = [];
+    var maxComments = options.max_comments != null ? options.max_comments : 10;
+    for (var k = 0; k < containers.length && maxComments > 0; k++) {
+        var containerSince = performance.now();
+        var items = all(containers[k]);
+        recordProbe("comment_container", containers[k], items.length > 0, containerSince);
+        if (!items.length) { continue; }
+        hits.comment_container = containers[k];
+        items.slice(0, maxComments).forEach(function(item) {
+            var parts = text(item).split("\n");
+            if (parts.length < 2) { return; }
+            var likeSpan = first(".//div[@role='button']/span", item);
+            var likeText = text(likeSpan);
+            result.comments.push({
+                username: parts[0],
+                text: parts[1],
+                is_verified: !!first(".//span[contains(@aria-label, 'Verified')]", item),
+                likes: /^\d+$/.test(likeText) ? likeText : "0"
+            });
+        });
+        break;
+    }
+
+    result.selector_hits = hits;
+    result.selector_probes = probes;
+    result.elapsed_ms = Math.round(performance.now() - started);
+    return result;
+}
+
+extract().then(done, function(error) {
+    done({version: EXTRACTOR_VERSION, error: String(error)});
+});
@@ -0,0 +1,131 @@
+import time
+import json
+import argparse
+
+# Images, videos and fonts are never needed: post data comes from the DOM or
+# API responses, and media URLs are read from src attributes, which are set
+# even when the request itself is blocked. Instagram's own JS and CSS
+# (static.cdninstagram.com) are left alone so pages still render.
+BLOCKED_URL_PATTERNS = [
+    # Media served by Instagram's content CDN
+    "*://scontent*.cdninstagram.com/*",
+    "*://*.fbcdn.net/*",
+    # Heavy resource types on any host
+    "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.png", "*.png?*", "*.webp", "*.webp?*",
+    "*.gif", "*.gif?*", "*.mp4", "*.mp4?*", "*.m4s", "*.m4s?*", "*.webm", "*.webm?*",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # Third-party trackers
+    "*://connect.facebook.net/*",
+    "*://www.facebook.com/tr*",
+    "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*",
+    "*://*.doubleclick.net/*"
+]
+
+def enable_fast_mode(driver, extra_patterns=()):
+    """
+    Block heavy resources and third-party hosts through Chrome DevTools
+
+    Args:
+        driver: Chrome WebDriver instance
+        extra_patterns: Additional URL patterns to block ("*" wildcards)
+
+    Returns:
+        list: Patterns now blocked
+    """
+    patterns = BLOCKED_URL_PATTERNS + list(extra_patterns)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    driver.fast_mode = True
+    return patterns
+
+def disable_fast_mode(driver):
+    """Stop blocking resources (e.g. to look at a page normally while debugging)"""
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+    driver.fast_mode = False
+
+def measure_page(driver, url, ready_xpath="//article | //main", timeout=15):
+    """
+    Load a page and measure time until it is ready and bytes transferred
+
+    The driver must be created with network capture enabled (performance
+    logging), which is where transfer sizes are read from.
+
+    Returns:
+        dict: {"url", "ready_ms", "bytes", "requests", "blocked"}
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    driver.get_log("performance")  # Discard events of earlier pages
+    started = time.time()
+    driver.get(url)
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.XPATH, ready_xpath)))
+    except Exception:
+        print(f"Page not ready after {timeout}s: {url}")
+    ready_ms = int((time.time() - started) * 1000)
+
+    # Let late requests finish so their sizes are counted
+    time.sleep(2)
+    transferred = 0
+    requests = 0
+    blocked = 0
+    for entry in driver.get_log("performance"):
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method") == "Network.loadingFinished":
+            transferred += message["params"].get("encodedDataLength", 0)
+            requests += 1
+        elif message.get("method") == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            blocked += 1
+
+    return {"url": url, "ready_ms": ready_ms, "bytes": int(transferred), "requests": requests, "blocked": blocked}
+
+def benchmark(urls, headless=True):
+    """
+    Compare page-ready time and bytes per post with and without fast mode
+
+    Each mode uses its own logged-in browser (the saved session is reused),
+    and both load the same post URLs.
+
+    Returns:
+        dict: Per-mode averages and per-page measurements
+    """
+    # Imported here because main imports this module
+    from main import start_logged_in_driver
+
+    results = {}
+    for fast_mode in (False, True):
+        mode = "fast" if fast_mode else "normal"
+        print(f"\nBenchmarking {mode} mode on {len(urls)} pages...")
+        driver = start_logged_in_driver(headless=headless, capture_network=True, fast_mode=fast_mode)
+        try:
+            pages = [measure_page(driver, url) for url in urls]
+        finally:
+            driver.quit()
+        for page in pages:
+            print(f"- {page['ready_ms']} ms, {page['bytes'] / 1024:.0f} KB, "
+                  f"{page['requests']} requests, {page['blocked']} blocked: {page['url']}")
+        results[mode] = {
+            "avg_ready_ms": round(sum(page["ready_ms"] for page in pages) / len(pages)),
+            "avg_kb": round(sum(page["bytes"] for page in pages) / len(pages) / 1024),
+            "pages": pages
+        }
+
+    normal, fast = results["normal"], results["fast"]
+    print(f"\nNormal: {normal['avg_ready_ms']} ms, {normal['avg_kb']} KB per post")
+    print(f"Fast:   {fast['avg_ready_ms']} ms, {fast['avg_kb']} KB per post")
+    if normal["avg_kb"]:
+        print(f"Fast mode transfers {100 - 100 * fast['avg_kb'] / normal['avg_kb']:.0f}% fewer bytes")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fast mode resource blocking on post pages")
+    parser.add_argument("urls", nargs="+", help="Instagram post URLs to load")
+    parser.add_argument("--show-browser", action="store_true", help="Run Chrome with a visible window")
+    args = parser.parse_args()
+    benchmark(args.urls, headless=not args.show_browser)
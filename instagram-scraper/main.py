@@ -2,7 +2,6 @@ import json
 import time
 import os
 import random
-import csv
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -12,6 +11,19 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from scraper import scrape_instagram, scrape_post_details
 from utils import login_instagram, get_random_user_agent
+from api_capture import enable_network_capture, shortcode_from_url
+from selector_stats import get_registry
+from driver_pool import DriverPool, JobTimeout
+from detail_workers import scrape_details_parallel, scrape_details_pipelined, scrape_post_with_retries
+from post_index import PostIndex
+from media_downloader import download_post_media
+from count_parser import parse_count
+from post_sink import PostSink, iter_posts, write_json_streaming
+from post_export import simplify_post, export_to_csv, save_posts_to_csv
+from fast_load import enable_fast_mode
+from replay import start_recording, stop_recording
+from profile_cache import configure_profile_cache, DEFAULT_TTL_HOURS
+import tracing
 from collections import Counter
 
 # Helper functions for insights generation
@@ -32,29 +44,18 @@ def get_engagement_stats(posts):
     comments = []
     
     for post in posts:
-        try:
-            # Extract numeric values from likes_count
-            likes_str = post.get("likes_count", "0")
-            if isinstance(likes_str, str):
-                # Remove non-numeric characters
-                likes_val = int(''.join(c for c in likes_str if c.isdigit()) or 0)
-            else:
-                likes_val = int(likes_str)
+        # Prefer the counts parsed at scrape time, fall back to the display strings
+        likes_val = post.get("likes_numeric")
+        if likes_val is None:
+            likes_val = parse_count(post.get("likes_count"))
+        if likes_val is not None:
             likes.append(likes_val)
-        except:
-            pass
             
-        try:
-            # Extract numeric values from comments_count
-            comments_str = post.get("comments_count", "0")
-            if isinstance(comments_str, str):
-                # Remove non-numeric characters
-                comments_val = int(''.join(c for c in comments_str if c.isdigit()) or 0)
-            else:
-                comments_val = int(comments_str)
+        comments_val = post.get("comments_numeric")
+        if comments_val is None:
+            comments_val = parse_count(post.get("comments_count"))
+        if comments_val is not None:
             comments.append(comments_val)
-        except:
-            pass
     
     return {
         "avg_likes": sum(likes) / len(likes) if likes else 0,
@@ -65,116 +66,30 @@ def get_engagement_stats(posts):
         "total_comments": sum(comments)
     }
 
-# CSV export function
-def export_to_csv(data, file_path):
-    """
-    Export the scraped data to a CSV file
-    
-    Args:
-        data (list): The scraped data to export
-        file_path (str): The file path for the output CSV file
-    """
-    if not data or len(data) == 0:
-        print("No data available to export.")
-        return
-    
-    # Extract keys from the first dictionary as CSV header
-    header = data[0].keys()
-    
-    try:
-        with open(file_path, mode="w", newline="", encoding="utf-8") as csv_file:
-            writer = csv.DictWriter(csv_file, fieldnames=header)
-            
-            writer.writeheader()  # Write the header row
-            for row in data:
-                writer.writerow(row)  # Write each data row
-                
-        print(f"Data successfully exported to '{file_path}'")
-    except Exception as e:
-        print(f"Error exporting data to CSV: {e}")
-
-def save_posts_to_csv(posts, output_path):
-    """
-    Save posts data to a CSV file for better readability and analysis
+def get_extraction_latency(posts):
+    """Average per-post extraction time for each extraction method used"""
+    timings = {}
+    for post in posts:
+        if "extraction_ms" in post:
+            timings.setdefault(post.get("extraction_method", "dom"), []).append(post["extraction_ms"])
     
-    Args:
-        posts (list): List of post dictionaries with simplified data
-        output_path (str): Path to save the CSV file
-        
-    Returns:
-        str: Path to the created CSV file
-    """
-    try:
-        # Define CSV headers based on the structure of our simplified posts
-        headers = [
-            "Username", 
-            "Post URL", 
-            "Post Date",
-            "Post Type",
-            "Likes",
-            "Comments", 
-            "Location",
-            "Caption",
-            "Hashtags",
-            "Mentions",
-            "Followers Count",
-            "Posts Count",
-            "Verified"
-        ]
-        
-        # Open and write to CSV file
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write header row
-            writer.writerow(headers)
-            
-            # Write data for each post
-            for post in posts:
-                # Get profile data (if available)
-                profile = post.get("profile", {})
-                followers_count = profile.get("followers_count", "N/A")  
-                posts_count = profile.get("posts_count", "N/A")
-                verified = "Yes" if profile.get("is_verified", False) else "No"
-                
-                # Format lists (hashtags and mentions) as comma-separated strings
-                hashtags_str = ", ".join(post.get("hashtags", []))
-                mentions_str = ", ".join(post.get("mentions", []))
-                  # Clean caption - remove line breaks for CSV
-                caption = post.get("caption", "").replace("\n", " ").replace("\r", " ")
-                if len(caption) > 100:
-                    caption = caption[:97] + "..."
-                # Escape any CSV special characters
-                caption = caption.replace('"', '""')# Write the row
-                writer.writerow([
-                    post.get("username", ""),
-                    post.get("url", ""),
-                    post.get("post_date", ""),
-                    post.get("post_type", ""),
-                    post.get("likes_count", ""),
-                    post.get("comments_count", ""),
-                    post.get("location", ""),
-                    caption,
-                    hashtags_str,
-                    mentions_str,
-                    followers_count,
-                    posts_count,
-                    verified
-                ])
-                
-        print(f"CSV data successfully saved to {output_path}")
-        return output_path
-    except Exception as e:
-        print(f"Error saving CSV data: {e}")
-        return None
+    return {
+        method: {"posts": len(values), "avg_ms": round(sum(values) / len(values)), "max_ms": max(values)}
+        for method, values in timings.items()
+    }
 
 # Setup Selenium Chrome Driver
-def setup_driver(headless=False):
+@tracing.traced("driver_startup")
+def setup_driver(headless=False, capture_network=False, fast_mode=False):
     """
     Configure and setup the Chrome WebDriver with anti-detection measures
     
     Args:
         headless: Whether to run Chrome in headless mode (without UI)
+        capture_network: Record network responses through Chrome DevTools so
+            post details can be parsed from Instagram's own JSON responses
+        fast_mode: Block images, videos, fonts and trackers through Chrome
+            DevTools; media URLs are still read from the page
     
     Returns:
         WebDriver instance configured for Instagram
@@ -194,6 +109,9 @@ def setup_driver(headless=False):
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
     
+    if capture_network:
+        enable_network_capture(options)
+    
     # Try using webdriver-manager for automatic ChromeDriver management
     try:
         s = Service(ChromeDriverManager().install())
@@ -214,6 +132,14 @@ def setup_driver(headless=False):
     driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": user_agent})
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
+    if capture_network:
+        driver.execute_cdp_cmd("Network.enable", {})
+    driver.network_capture = capture_network
+    
+    driver.fast_mode = False
+    if fast_mode:
+        enable_fast_mode(driver)
+    
     # Set window size to appear like a standard screen
     driver.set_window_size(1366, 768)
     
@@ -229,7 +155,7 @@ def main():
         login_instagram(driver)
         
         # Add a random delay to look more like human behavior
-        time.sleep(random.uniform(1, 3))        # Step 3: Get the search query from the user
+        tracing.sleep(random.uniform(1, 3))        # Step 3: Get the search query from the user
         search_query = input("Enter what you want to search (username, hashtag, or topic): ").strip()
         
         # Ask if this is a profile search (to handle usernames better)
@@ -248,7 +174,7 @@ def main():
             driver.get(f"https://www.instagram.com/{username}/")
             
             # Check if profile exists or we got redirected
-            time.sleep(random.uniform(2, 3))
+            tracing.sleep(random.uniform(2, 3))
             not_found_detected = False
             
             # Check for "Page Not Found" indicators
@@ -281,7 +207,7 @@ def main():
             print(f"Performing general search for: {search_query}")
             # First navigate to search page
             driver.get("https://www.instagram.com/explore/")
-            time.sleep(2)
+            tracing.sleep(2)
             
             # Find the search box
             try:
@@ -289,9 +215,9 @@ def main():
                     EC.element_to_be_clickable((By.XPATH, "//input[@placeholder='Search']"))
                 )
                 search_box.click()
-                time.sleep(1)
+                tracing.sleep(1)
                 search_box.send_keys(search_query)
-                time.sleep(2)  # Wait for search results to appear
+                tracing.sleep(2)  # Wait for search results to appear
             except Exception as e:
                 print(f"Error using search box: {e}")
                 # Fallback to hashtag search
@@ -301,7 +227,7 @@ def main():
                 driver.get(f"https://www.instagram.com/explore/tags/{hashtag}/")
         
         # Wait for the page to load completely
-        time.sleep(random.uniform(3, 5))
+        tracing.sleep(random.uniform(3, 5))
 
     # Step 4: Extract URLs of the posts and save them to a JSON file
         urls = scrape_instagram(driver)
@@ -319,7 +245,7 @@ def main():
             if i < max_details - 1:  # No need to wait after the last post
                 delay = random.uniform(1.5, 3)
                 print(f"Waiting {delay:.1f} seconds before next post...")
-                time.sleep(delay)        # Step 6: Save the post details with only important information
+                tracing.sleep(delay)        # Step 6: Save the post details with only important information
         timestamp = time.strftime("%Y%m%d_%H%M%S")
           # Clean up the search query to use as a folder name (remove special characters)
         folder_name = ''.join(c if c.isalnum() or c in ['-', '_'] else '_' for c in search_query)
@@ -329,44 +255,7 @@ def main():
         os.makedirs(base_folder, exist_ok=True)  # Create folder structure
         
         # Clean up and simplify post data to keep only important information
-        simplified_posts = []
-        for post in post_details:
-            # Extract only the essential fields
-            essential_data = {
-                "url": post.get("url", ""),
-                "username": post.get("username", "Not found"),
-                "timestamp": post.get("timestamp", ""),
-                "post_date": post.get("post_date", "Unknown"),
-                "caption": post.get("caption", "No caption available"),
-                "likes_count": post.get("likes_count", "Not available"),
-                "comments_count": post.get("comments_count", "Not available"),
-                "post_type": post.get("post_type", "Unknown"),
-                "hashtags": post.get("hashtags", []),
-                "mentions": post.get("mentions", []),
-                "location": post.get("location", "Not specified")
-            }
-            
-            # Add media URLs (only keeping the URLs, not the type info)
-            media_urls = []
-            for media in post.get("media_urls", []):
-                if isinstance(media, dict) and "url" in media:
-                    media_urls.append(media["url"])
-                elif isinstance(media, str):
-                    media_urls.append(media)
-            
-            essential_data["media_urls"] = media_urls
-            
-            # Add profile data (only the most important fields)
-            if "profile_data" in post and isinstance(post["profile_data"], dict):
-                essential_data["profile"] = {
-                    "username": post["profile_data"].get("username", "Not found"),
-                    "full_name": post["profile_data"].get("full_name", "Not found"),
-                    "followers_count": post["profile_data"].get("followers_count", "Not available"),
-                    "posts_count": post["profile_data"].get("posts_count", "Not available"),
-                    "is_verified": post["profile_data"].get("is_verified", False)
-                }
-            
-            simplified_posts.append(essential_data)
+        simplified_posts = [simplify_post(post) for post in post_details]
         
         # Create a single comprehensive data file with all important information
         data_file_path = f"{base_folder}/{folder_name}_data_{timestamp}.json"
@@ -396,7 +285,71 @@ def main():
         input("Press Enter to close the browser and exit...")
         driver.quit()
 
-def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False, retries=3):
+@tracing.traced("login")
+def login_with_retries(driver, retries=3):
+    """
+    Login to Instagram, retrying the whole login flow on failure
+    
+    Args:
+        driver: Selenium WebDriver instance
+        retries (int): Number of login attempts before giving up
+    """
+    login_attempts = 0
+    
+    while True:
+        try:
+            login_instagram(driver)
+            return driver
+        except Exception as e:
+            login_attempts += 1
+            print(f"Login attempt {login_attempts} failed: {str(e)}")
+            if login_attempts >= retries:
+                raise Exception(f"Failed to login after {retries} attempts")
+            tracing.sleep(random.uniform(5, 10))  # Wait before retrying
+
+def start_logged_in_driver(headless=False, retries=3, capture_network=False, fast_mode=False):
+    """
+    Setup a new Chrome driver and login to Instagram
+    
+    Args:
+        headless (bool): Whether to run Chrome in headless mode
+        retries (int): Number of login attempts before giving up
+        capture_network (bool): Parse post details from captured API responses
+        fast_mode (bool): Block heavy resources to speed up page loads
+        
+    Returns:
+        WebDriver instance logged in to Instagram
+    """
+    driver = setup_driver(headless=headless, capture_network=capture_network, fast_mode=fast_mode)
+    try:
+        return login_with_retries(driver, retries=retries)
+    except Exception:
+        driver.quit()
+        raise
+
+def write_run_timing(tracer, prefix, timestamp):
+    """
+    Write a run's Chrome trace and timing summary table
+    
+    Args:
+        tracer (Tracer): Tracer that recorded the run
+        prefix (str): Path prefix shared with the run's data files
+        timestamp (str): Timestamp of the run
+    """
+    try:
+        trace_path = tracer.write_chrome_trace(f"{prefix}_trace_{timestamp}.json")
+        summary_path = tracer.write_summary(f"{prefix}_timing_{timestamp}.txt")
+        print("\n" + tracer.format_summary())
+        print(f"Timing summary saved to '{summary_path}' (trace for chrome://tracing: '{trace_path}')")
+    except Exception as trace_error:
+        print(f"Error saving timing trace: {trace_error}")
+
+def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False, retries=3,
+                driver_pool=None, capture_network=False, detail_workers=1, requests_per_minute=20,
+                seen_ttl_hours=None, download_media=False, media_workers=4,
+                compress_posts=False, fsync_every=10, fast_mode=False, record_to=None, trace=True,
+                profile_ttl_hours=DEFAULT_TTL_HOURS, persist_profiles=False, max_comments=10,
+                comment_budget=10, raise_errors=False, pipeline=False):
     """
     Run the Instagram scraper with customizable parameters
     
@@ -406,31 +359,64 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
         max_details (int): Maximum number of posts to extract details from
         headless (bool): Whether to run Chrome in headless mode
         retries (int): Number of retries for failed operations
+        driver_pool (DriverPool): Optional pool to lease an already logged-in
+            driver from; the driver is returned to the pool instead of quitting
+        capture_network (bool): Parse post details from Instagram's API responses
+            captured through Chrome DevTools, probing the DOM only as a fallback
+        detail_workers (int): Number of drivers scraping post details in
+            parallel; extra drivers come from driver_pool when it has room,
+            otherwise from a temporary pool closed at the end of the run
+        requests_per_minute (int): Global cap on post page loads when
+            detail_workers > 1 (0 disables the cap)
+        seen_ttl_hours (float): Skip posts recorded in the cross-session post
+            index within this many hours (None disables the index)
+        download_media (bool): Download every post's media into the session
+            folder and write a manifest mapping post URLs to local files
+        media_workers (int): Maximum number of concurrent media downloads
+        compress_posts (bool): Gzip the JSONL file each post is appended to
+            as soon as it is scraped
+        fsync_every (int): Posts between fsyncs of the JSONL file
+        fast_mode (bool): Block images, videos, fonts and trackers in the
+            browsers started by this run
+        record_to (str): Folder to save page snapshots to for offline replay
+            benchmarks (see replay_benchmark.py)
+        trace (bool): Time every stage of the run and write a Chrome trace
+            and a timing summary next to the data file
+        profile_ttl_hours (float): Reuse an author's profile data for this
+            many hours instead of visiting their profile page for every post
+            (0 visits it every time)
+        persist_profiles (bool): Keep the profile cache on disk so later
+            runs reuse it within the TTL
+        max_comments (int): Comments to collect per post (0 skips comments)
+        comment_budget (float): Seconds each post may spend loading more
+            comments
+        raise_errors (bool): Re-raise a failure instead of printing it and
+            returning None (used by the batch orchestrator to retry jobs)
+        pipeline (bool): With a single detail worker, load the next post in a
+            second tab while the current one is extracted (not combined with
+            capture_network, whose response log would mix both tabs)
         
     Returns:
         str: Path to the saved folder containing scraped data
     """
     driver = None
+    job_failed = False
+    job_started = time.time()
+    tracer = tracing.start_trace() if trace else None
+    trace_prefix = None
+    profile_cache = configure_profile_cache(ttl_hours=profile_ttl_hours, persist=persist_profiles)
     try:
-        # Setup driver
-        driver = setup_driver(headless=headless)
+        # Setup and login, or reuse a logged-in driver from the pool
+        if driver_pool:
+            with tracing.span("driver_acquire"):
+                driver = driver_pool.acquire()
+        else:
+            driver = start_logged_in_driver(headless=headless, retries=retries,
+                                            capture_network=capture_network, fast_mode=fast_mode)
         
+        if record_to:
+            start_recording(record_to)
         try:
-            # Login to Instagram with retry logic
-            login_success = False
-            login_attempts = 0
-            
-            while not login_success and login_attempts < retries:
-                try:
-                    login_instagram(driver)
-                    login_success = True
-                except Exception as e:
-                    login_attempts += 1
-                    print(f"Login attempt {login_attempts} failed: {str(e)}")
-                    if login_attempts >= retries:
-                        raise Exception(f"Failed to login after {retries} attempts")
-                    time.sleep(random.uniform(5, 10))  # Wait before retrying
-            
             # Use provided search query or ask for input
             if not search_query:
                 search_query = input("Enter what you want to search (hashtag, username, or topic): ").strip()
@@ -440,9 +426,12 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
                 print(f"Using default search term: {search_query}")
             
             # Ensure starting with a clean slate
+            search_span = tracing.begin("search_navigation")
             try:
                 driver.get("https://www.instagram.com/")
-                time.sleep(random.uniform(2, 3))
+                tracing.sleep(random.uniform(2, 3))
+            except JobTimeout:
+                raise
             except Exception as e:
                 print(f"Error navigating to home page: {e}")
                 print("Continuing with search...")
@@ -463,7 +452,7 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
                     else:
                         print(f"Performing general search for: {search_query}")
                         driver.get("https://www.instagram.com/explore/")
-                        time.sleep(random.uniform(2, 3))
+                        tracing.sleep(random.uniform(2, 3))
                         
                         # Find search box
                         try:
@@ -471,9 +460,9 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
                                 EC.element_to_be_clickable((By.XPATH, "//input[@placeholder='Search']"))
                             )
                             search_box.click()
-                            time.sleep(random.uniform(0.5, 1.5))
+                            tracing.sleep(random.uniform(0.5, 1.5))
                             search_box.send_keys(search_query)
-                            time.sleep(random.uniform(2, 3))
+                            tracing.sleep(random.uniform(2, 3))
                             
                             # Try to click on a search result
                             try:
@@ -490,7 +479,7 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
                                         )
                                         if results:
                                             results[0].click()
-                                            time.sleep(random.uniform(2, 3))
+                                            tracing.sleep(random.uniform(2, 3))
                                             break
                                     except:
                                         continue
@@ -519,17 +508,33 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
                         search_attempts += 1
                         if search_attempts >= retries:
                             raise Exception("Failed to load search results after multiple attempts")
-                        time.sleep(random.uniform(5, 10))
+                        tracing.sleep(random.uniform(5, 10))
                         
+                except JobTimeout:
+                    raise
                 except Exception as e:
                     search_attempts += 1
                     print(f"Search attempt {search_attempts} failed: {e}")
                     if search_attempts >= retries:
                         raise Exception(f"Failed to search after {retries} attempts")
-                    time.sleep(random.uniform(5, 10))
+                    tracing.sleep(random.uniform(5, 10))
             
             # Wait for page to fully load
-            time.sleep(random.uniform(3, 5))
+            tracing.sleep(random.uniform(3, 5))
+            tracing.end(search_span)
+            
+            # Skip posts already scraped in an earlier session within the TTL
+            post_index = None
+            skipped_posts = set()
+            post_filter = None
+            if seen_ttl_hours is not None:
+                post_index = PostIndex(ttl_hours=seen_ttl_hours)
+                
+                def post_filter(shortcode):
+                    if post_index.needs_scrape(shortcode):
+                        return True
+                    skipped_posts.add(shortcode)
+                    return False
             
             # Extract URLs with retry logic
             url_attempts = 0
@@ -537,129 +542,141 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
             
             while len(urls) == 0 and url_attempts < retries:
                 try:
-                    urls = scrape_instagram(driver, max_posts=max_posts)
+                    urls = scrape_instagram(driver, max_posts=max_posts, post_filter=post_filter)
+                    if len(urls) == 0 and skipped_posts:
+                        print(f"No new posts: all {len(skipped_posts)} posts found were scraped "
+                              f"in the last {seen_ttl_hours} hours")
+                        return None
                     if len(urls) == 0:
                         url_attempts += 1
                         print(f"No posts found, attempt {url_attempts}/{retries}")
                         if url_attempts >= retries:
                             raise Exception("No posts found after multiple attempts")
-                        time.sleep(random.uniform(3, 5))
+                        tracing.sleep(random.uniform(3, 5))
                 except Exception as e:
                     url_attempts += 1
                     print(f"URL scraping attempt {url_attempts} failed: {e}")
                     if url_attempts >= retries:
                         raise Exception(f"Failed to scrape post URLs after {retries} attempts")
-                    time.sleep(random.uniform(5, 10))
+                    tracing.sleep(random.uniform(5, 10))
             
             max_details = min(len(urls), max_details)
-            post_details = []
             
-            # Extract detailed post information with individual post retry logic
-            for i, url in enumerate(urls[:max_details]):
-                post_attempts = 0
-                success = False
-                
-                while not success and post_attempts < retries:
-                    try:
-                        print(f"Scraping post {i+1}/{max_details}: {url} (attempt {post_attempts+1})")
-                        post_data = scrape_post_details(driver, url)
-                        post_details.append(post_data)
-                        success = True
-                    except Exception as e:
-                        post_attempts += 1
-                        print(f"Error scraping post {url}: {e}")
-                        if post_attempts >= retries:
-                            print(f"Skipping post {url} after {retries} failed attempts")
-                            # Add a minimal placeholder with just the URL to maintain consistency
-                            post_details.append({"url": url, "error": str(e)})
-                        time.sleep(random.uniform(3, 5))
-                
-                # Add a random delay between posts to avoid rate limiting
-                if i < max_details - 1:
-                    delay = random.uniform(1.5, 3)
-                    print(f"Waiting {delay:.1f} seconds before next post...")
-                    time.sleep(delay)              # Save results with simplified data structure
+            # Create unique timestamp-based folder for each scrape session
             timestamp = time.strftime("%Y%m%d_%H%M%S")
-              # Clean up the search query to use as a folder name (remove special characters)
+            # Clean up the search query to use as a folder name (remove special characters)
             folder_name = ''.join(c if c.isalnum() or c in ['-', '_'] else '_' for c in search_query)
-            
-            # Create unique timestamp-based folder for each scrape session
             base_folder = f"data/{folder_name}/{timestamp}"
             os.makedirs(base_folder, exist_ok=True)  # Create folder structure
+            trace_prefix = f"{base_folder}/{folder_name}"
             
-            # Clean up and simplify post data to keep only important information
-            simplified_posts = []
-            for post in post_details:
-                # Extract only the essential fields
-                essential_data = {
-                    "url": post.get("url", ""),
-                    "username": post.get("username", "Not found"),
-                    "timestamp": post.get("timestamp", ""),
-                    "post_date": post.get("post_date", "Unknown"),
-                    "caption": post.get("caption", "No caption available"),
-                    "likes_count": post.get("likes_count", "Not available"),
-                    "comments_count": post.get("comments_count", "Not available"),
-                    "post_type": post.get("post_type", "Unknown"),
-                    "hashtags": post.get("hashtags", []),
-                    "mentions": post.get("mentions", []),
-                    "location": post.get("location", "Not specified")
-                }
-                
-                # Add media URLs (only keeping the URLs, not the type info)
-                media_urls = []
-                for media in post.get("media_urls", []):
-                    if isinstance(media, dict) and "url" in media:
-                        media_urls.append(media["url"])
-                    elif isinstance(media, str):
-                        media_urls.append(media)
-                
-                essential_data["media_urls"] = media_urls
-                
-                # Add profile data (only the most important fields)
-                if "profile_data" in post and isinstance(post["profile_data"], dict):
-                    essential_data["profile"] = {
-                        "username": post["profile_data"].get("username", "Not found"),
-                        "full_name": post["profile_data"].get("full_name", "Not found"),
-                        "followers_count": post["profile_data"].get("followers_count", "Not available"),
-                        "posts_count": post["profile_data"].get("posts_count", "Not available"),
-                        "is_verified": post["profile_data"].get("is_verified", False)
-                    }
-                
-                simplified_posts.append(essential_data)
+            # Every post goes to disk as soon as it is scraped, so a crash
+            # keeps everything scraped so far and memory stays flat
+            sink = PostSink(f"{base_folder}/{folder_name}_posts_{timestamp}.jsonl",
+                            compress=compress_posts, fsync_every=fsync_every)
+            print(f"Streaming scraped posts to '{sink.path}'")
+            
+            details_span = tracing.begin("post_details")
+            try:
+                if detail_workers > 1 and max_details > 1:
+                    # Several logged-in drivers pull post URLs from a shared queue
+                    worker_pool = driver_pool
+                    if worker_pool is None:
+                        worker_pool = DriverPool(
+                            lambda: start_logged_in_driver(headless=headless, retries=retries,
+                                                           capture_network=capture_network,
+                                                           fast_mode=fast_mode),
+                            size=detail_workers - 1
+                        )
+                    try:
+                        scrape_details_parallel(
+                            driver, urls[:max_details], worker_pool,
+                            workers=detail_workers,
+                            requests_per_minute=requests_per_minute,
+                            retries=retries,
+                            on_result=sink.write,
+                            max_comments=max_comments,
+                            comment_budget=comment_budget
+                        )
+                    finally:
+                        if worker_pool is not driver_pool:
+                            worker_pool.close()
+                elif pipeline and not getattr(driver, "network_capture", False) and max_details > 1:
+                    # The next post loads in a second tab while this one is extracted
+                    scrape_details_pipelined(
+                        driver, urls[:max_details],
+                        retries=retries,
+                        on_result=sink.write,
+                        max_comments=max_comments,
+                        comment_budget=comment_budget
+                    )
+                else:
+                    if pipeline and getattr(driver, "network_capture", False):
+                        print("Pipelining is not used with network capture, scraping posts one at a time")
+                    # Extract detailed post information with individual post retry logic
+                    for i, url in enumerate(urls[:max_details]):
+                        sink.write(scrape_post_with_retries(
+                            driver, url, retries=retries, label=f"{i+1}/{max_details}",
+                            max_comments=max_comments, comment_budget=comment_budget))
+                        
+                        # Add a random delay between posts to avoid rate limiting
+                        if i < max_details - 1:
+                            delay = random.uniform(1.5, 3)
+                            print(f"Waiting {delay:.1f} seconds before next post...")
+                            tracing.sleep(delay)
+            finally:
+                sink.close()
+                tracing.end(details_span)
+            
+            def simplified_posts():
+                # Stream the simplified posts back from the JSONL file
+                return (simplify_post(post) for post in iter_posts(sink.path))
             
             # Create a single comprehensive data file with all important information
+            save_span = tracing.begin("save_outputs")
             data_file_path = f"{base_folder}/{folder_name}_data_{timestamp}.json"
-            with open(data_file_path, "w", encoding="utf-8") as data_file:
-                json_output = {
-                    "scrape_timestamp": timestamp,
-                    "search_query": search_query,
-                    "total_posts_found": len(urls),
-                    "posts_extracted": len(simplified_posts),
-                    "posts": simplified_posts
-                }                
-                json.dump(json_output, data_file, indent=4, ensure_ascii=False)
-                print(f"Scraping completed! Important data saved to '{data_file_path}'")
-                
-                # Export data to CSV format for better readability
-                csv_path = f"{base_folder}/{folder_name}_data_{timestamp}.csv"
-                csv_result = save_posts_to_csv(simplified_posts, csv_path)
-                if csv_result:
-                    print(f"Data exported to CSV for better analysis: '{csv_path}'")
-                
-                # Generate a simple insights summary
+            write_json_streaming(data_file_path, {
+                "scrape_timestamp": timestamp,
+                "search_query": search_query,
+                "total_posts_found": len(urls),
+                "posts_extracted": sink.count,
+                "skipped_known_posts": len(skipped_posts)
+            }, "posts", simplified_posts())
+            print(f"Scraping completed! Important data saved to '{data_file_path}'")
+            
+            # Remember what was scraped so the next run can skip it
+            if post_index:
+                for post in iter_posts(sink.path):
+                    shortcode = shortcode_from_url(post.get("url"))
+                    # Only posts that were actually extracted, so failed loads are retried
+                    if shortcode and "error" not in post and post.get("extraction_method"):
+                        post_index.record(shortcode, simplify_post(post), search_query, data_file_path)
+                print(f"Post index now holds {post_index.count()} posts")
+            
+            # Export data to CSV format for better readability
+            csv_path = f"{base_folder}/{folder_name}_data_{timestamp}.csv"
+            csv_result = save_posts_to_csv(simplified_posts(), csv_path)
+            if csv_result:
+                print(f"Data exported to CSV for better analysis: '{csv_path}'")
+            tracing.end(save_span)
+            
+            # Generate a simple insights summary
+            insights_span = tracing.begin("insights")
             try:
                 print("\nGenerating insights summary...")
                 
-                # Create a simple insights summary directly from the data
+                # Each statistic is computed in its own streaming pass over the posts file
                 insights = {
                     "search_query": search_query,
                     "timestamp": timestamp,
                     "total_posts": len(urls),
-                    "analyzed_posts": len(simplified_posts),
-                    "top_hashtags": get_top_items([tag for post in simplified_posts for tag in post.get("hashtags", [])], 10),
-                    "top_mentions": get_top_items([mention for post in simplified_posts for mention in post.get("mentions", [])], 5),
-                    "post_types": get_post_type_distribution(simplified_posts),
-                    "engagement_stats": get_engagement_stats(simplified_posts)
+                    "analyzed_posts": sink.count,
+                    "skipped_known_posts": len(skipped_posts),
+                    "top_hashtags": get_top_items((tag for post in simplified_posts() for tag in post.get("hashtags", [])), 10),
+                    "top_mentions": get_top_items((mention for post in simplified_posts() for mention in post.get("mentions", [])), 5),
+                    "post_types": get_post_type_distribution(simplified_posts()),
+                    "engagement_stats": get_engagement_stats(simplified_posts()),
+                    "extraction_latency": get_extraction_latency(iter_posts(sink.path))
                 }
                 
                 # Save the insights
@@ -668,18 +685,57 @@ def run_scraper(search_query=None, max_posts=15, max_details=10, headless=False,
                     json.dump(insights, insights_file, indent=4, ensure_ascii=False)
                     
                 print(f"Insights summary saved to '{insights_path}'")
+                for method, latency in insights["extraction_latency"].items():
+                    print(f"- {method} extraction: {latency['avg_ms']} ms/post avg over {latency['posts']} posts")
             except Exception as insights_error:
                 print(f"Error generating insights: {insights_error}")
+            tracing.end(insights_span)
+            
+            if download_media:
+                try:
+                    with tracing.span("media_download"):
+                        download_post_media(simplified_posts(), base_folder, workers=media_workers)
+                except Exception as media_error:
+                    print(f"Error downloading media: {media_error}")
                 
             return data_file_path
             
+        except Exception:
+            job_failed = True
+            raise
         finally:
-            # Allow user to see the results before closing
-            input("Press Enter to close the browser...")
-            driver.quit()
+            if record_to:
+                stop_recording()
+            
+            if tracer:
+                tracing.stop_trace()
+                if trace_prefix:
+                    write_run_timing(tracer, trace_prefix, timestamp)
+            
+            profile_cache.save()
+            if profile_cache.hits:
+                print(f"Profile cache saved {profile_cache.hits} profile page visits")
+            
+            # Keep selector hit statistics so the next run tries winners first
+            selector_registry = get_registry()
+            selector_registry.save()
+            selector_registry.print_report(limit=5)
+            
+            if driver_pool:
+                # Keep the driver logged in for the next job; the pool
+                # health-checks it before handing it out again. A driver
+                # left in an unknown state by a failure is discarded
+                driver_pool.release(driver, healthy=not job_failed)
+                print(f"Job finished in {time.time() - job_started:.1f}s")
+            else:
+                # Allow user to see the results before closing
+                input("Press Enter to close the browser...")
+                driver.quit()
             
     except Exception as e:
         print(f"Error running scraper: {str(e)}")
+        if raise_errors:
+            raise
         return None
 
 if __name__ == "__main__":
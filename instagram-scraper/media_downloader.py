@@ -0,0 +1,237 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import mimetypes
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 64 * 1024
+MANIFEST_NAME = "media_manifest.json"
+
+# Media of every run is downloaded into one store, so a later run resumes
+# an earlier run's partial downloads and reuses its finished files
+DEFAULT_MEDIA_STORE = "data/media"
+STORE_INDEX_NAME = "store_index.json"
+
+_thread_state = threading.local()
+_index_lock = threading.Lock()
+_url_locks = {}
+
+def _session(workers):
+    """One requests session per worker thread, so connections are reused"""
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 " \
+                                        "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+        _thread_state.session = session
+    return session
+
+def _extension(url, content_type=None):
+    """File extension from the URL path, falling back to the content type"""
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    if extension and len(extension) <= 5:
+        return extension
+    if content_type:
+        guessed = mimetypes.guess_extension(content_type.split(";")[0].strip())
+        if guessed:
+            return guessed
+    return ".bin"
+
+def partial_path(url, store_folder):
+    """Where the partial download of a URL is kept in the store"""
+    return os.path.join(store_folder, ".partial", hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".part")
+
+def load_store_index(store_folder):
+    """URL -> {"file", "sha256", "bytes"} of every file already in the store"""
+    try:
+        with open(os.path.join(store_folder, STORE_INDEX_NAME), "r", encoding="utf-8") as index_file:
+            return json.load(index_file)
+    except (OSError, ValueError):
+        return {}
+
+def update_store_index(store_folder, results):
+    """Add finished downloads to the store index (merged with what other runs wrote meanwhile)"""
+    with _index_lock:
+        index = load_store_index(store_folder)
+        for result in results:
+            index[result["url"]] = {"file": result["file"], "sha256": result["sha256"], "bytes": result["bytes"]}
+        index_path = os.path.join(store_folder, STORE_INDEX_NAME)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file, ensure_ascii=False)
+        os.replace(index_path + ".tmp", index_path)
+
+def _lock_for(url):
+    """Lock serializing downloads of one URL, as concurrent jobs share the store"""
+    with _index_lock:
+        return _url_locks.setdefault(url, threading.Lock())
+
+def download_file(url, store_folder, workers=4, timeout=30):
+    """
+    Download one media file into the store, resuming a partial download if there is one
+
+    The file is streamed to <store_folder>/.partial/<url hash>.part. If that
+    file already exists (from this run or an earlier one), only the missing
+    bytes are requested with an HTTP Range header. The finished file is named
+    after its SHA-256, so identical media is stored once across all runs.
+
+    Args:
+        url: Media URL
+        store_folder: Shared media store
+        workers: Connection pool size of the shared session
+        timeout: Seconds to wait for the server
+
+    Returns:
+        dict: {"url", "file", "sha256", "bytes", "resumed", "duplicate"}
+    """
+    with _lock_for(url):
+        return _download_file(url, store_folder, workers, timeout)
+
+def _download_file(url, store_folder, workers, timeout):
+    part_path = partial_path(url, store_folder)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+
+    # Hash the bytes we already have, then continue where the last attempt stopped
+    digest = hashlib.sha256()
+    existing = 0
+    if os.path.exists(part_path):
+        with open(part_path, "rb") as part_file:
+            for chunk in iter(lambda: part_file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                existing += len(chunk)
+
+    headers = {"Range": f"bytes={existing}-"} if existing else {}
+    with _session(workers).get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # Nothing left to fetch: the partial file is already complete
+            resumed = True
+        else:
+            response.raise_for_status()
+            resumed = existing > 0 and response.status_code == 206
+            if existing and not resumed:
+                # Server ignored the Range header, start over
+                digest = hashlib.sha256()
+                existing = 0
+            with open(part_path, "ab" if resumed else "wb") as part_file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if chunk:
+                        part_file.write(chunk)
+                        digest.update(chunk)
+        content_type = response.headers.get("Content-Type")
+
+    sha256 = digest.hexdigest()
+    final_path = os.path.join(store_folder, sha256[:32] + _extension(url, content_type))
+    duplicate = os.path.exists(final_path)
+    if duplicate:
+        os.remove(part_path)
+    else:
+        os.replace(part_path, final_path)
+
+    return {
+        "url": url,
+        "file": os.path.basename(final_path),
+        "sha256": sha256,
+        "bytes": os.path.getsize(final_path),
+        "resumed": resumed,
+        "duplicate": duplicate
+    }
+
+def _link_into(store_path, media_folder):
+    """Hard-link a stored file into a session's media folder, copying where links are not supported"""
+    session_path = os.path.join(media_folder, os.path.basename(store_path))
+    if not os.path.exists(session_path):
+        try:
+            os.link(store_path, session_path)
+        except OSError:
+            shutil.copy2(store_path, session_path)
+
+def download_post_media(posts, output_folder, workers=4, retries=2, store_folder=DEFAULT_MEDIA_STORE):
+    """
+    Download the media of every post and write a manifest
+
+    Files are downloaded into the shared store and linked into the session,
+    so media finished or partly downloaded by an earlier run is not fetched
+    again.
+
+    Args:
+        posts: Iterable of post dictionaries with "url" and "media_urls"
+            (read once, so a generator streaming posts from disk works)
+        output_folder: Session folder; media is linked into <output_folder>/media
+        workers: Maximum number of concurrent downloads
+        retries: Extra attempts per file (each resumes the partial download)
+        store_folder: Media store shared by all runs
+
+    Returns:
+        str: Path of the manifest mapping post URL to local files
+    """
+    media_folder = os.path.join(output_folder, "media")
+    os.makedirs(media_folder, exist_ok=True)
+    os.makedirs(store_folder, exist_ok=True)
+    store_index = load_store_index(store_folder)
+
+    # Each media URL is downloaded once, even if several posts reference it
+    post_media = []
+    media_urls = {}
+    for post in posts:
+        urls = [media["url"] if isinstance(media, dict) else media for media in post.get("media_urls", [])]
+        post_media.append((post.get("url", ""), urls))
+        for media_url in urls:
+            if media_url:
+                media_urls[media_url] = None
+    media_urls = list(media_urls)
+
+    def fetch(media_url):
+        stored = store_index.get(media_url)
+        if stored and os.path.exists(os.path.join(store_folder, stored["file"])):
+            return dict(stored, url=media_url, resumed=False, duplicate=True, stored=True)
+        for attempt in range(retries + 1):
+            try:
+                return download_file(media_url, store_folder, workers=workers)
+            except Exception as e:
+                if attempt == retries:
+                    print(f"Failed to download {media_url}: {e}")
+                    return {"url": media_url, "error": str(e)}
+
+    print(f"Downloading {len(media_urls)} media files with {workers} workers...")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(zip(media_urls, executor.map(fetch, media_urls)))
+
+    downloaded = [result for result in results.values() if "error" not in result]
+    update_store_index(store_folder, [result for result in downloaded if not result.get("stored")])
+    for result in downloaded:
+        _link_into(os.path.join(store_folder, result["file"]), media_folder)
+
+    manifest = {
+        "media_folder": "media",
+        "store_folder": store_folder,
+        "posts": {}
+    }
+    for post_url, urls in post_media:
+        manifest["posts"][post_url] = [results[media_url] for media_url in urls if media_url in results]
+
+    manifest["summary"] = {
+        "files": len(media_urls),
+        "downloaded": len(downloaded),
+        "failed": len(media_urls) - len(downloaded),
+        "resumed": sum(1 for result in downloaded if result["resumed"]),
+        "duplicates": sum(1 for result in downloaded if result["duplicate"]),
+        "already_stored": sum(1 for result in downloaded if result.get("stored")),
+        "bytes": sum(result["bytes"] for result in downloaded if not result["duplicate"])
+    }
+
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4, ensure_ascii=False)
+
+    summary = manifest["summary"]
+    print(f"Downloaded {summary['downloaded']}/{summary['files']} media files "
+          f"({summary['duplicates']} duplicates, {summary['already_stored']} already stored, "
+          f"{summary['resumed']} resumed) to '{media_folder}'")
+    return manifest_path
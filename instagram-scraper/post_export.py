@@ -0,0 +1,146 @@
+import csv
+from count_parser import parse_count
+
+def simplify_post(post):
+    """Keep only the important fields of a scraped post, as saved in the data file"""
+    # Extract only the essential fields
+    essential_data = {
+        "url": post.get("url", ""),
+        "username": post.get("username", "Not found"),
+        "timestamp": post.get("timestamp", ""),
+        "post_date": post.get("post_date", "Unknown"),
+        "caption": post.get("caption", "No caption available"),
+        "likes_count": post.get("likes_count", "Not available"),
+        "comments_count": post.get("comments_count", "Not available"),
+        "likes_numeric": post.get("likes_numeric", parse_count(post.get("likes_count"))),
+        "comments_numeric": post.get("comments_numeric", parse_count(post.get("comments_count"))),
+        "post_type": post.get("post_type", "Unknown"),
+        "hashtags": post.get("hashtags", []),
+        "mentions": post.get("mentions", []),
+        "location": post.get("location", "Not specified")
+    }
+    
+    # Add media URLs (only keeping the URLs, not the type info)
+    media_urls = []
+    for media in post.get("media_urls", []):
+        if isinstance(media, dict) and "url" in media:
+            media_urls.append(media["url"])
+        elif isinstance(media, str):
+            media_urls.append(media)
+    
+    essential_data["media_urls"] = media_urls
+    
+    # Add profile data (only the most important fields)
+    if "profile_data" in post and isinstance(post["profile_data"], dict):
+        essential_data["profile"] = {
+            "username": post["profile_data"].get("username", "Not found"),
+            "full_name": post["profile_data"].get("full_name", "Not found"),
+            "followers_count": post["profile_data"].get("followers_count", "Not available"),
+            "posts_count": post["profile_data"].get("posts_count", "Not available"),
+            "is_verified": post["profile_data"].get("is_verified", False)
+        }
+    
+    return essential_data
+
+# CSV export function
+def export_to_csv(data, file_path):
+    """
+    Export the scraped data to a CSV file
+    
+    Args:
+        data (list): The scraped data to export
+        file_path (str): The file path for the output CSV file
+    """
+    if not data or len(data) == 0:
+        print("No data available to export.")
+        return
+    
+    # Extract keys from the first dictionary as CSV header
+    header = data[0].keys()
+    
+    try:
+        with open(file_path, mode="w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=header)
+            
+            writer.writeheader()  # Write the header row
+            for row in data:
+                writer.writerow(row)  # Write each data row
+                
+        print(f"Data successfully exported to '{file_path}'")
+    except Exception as e:
+        print(f"Error exporting data to CSV: {e}")
+
+def save_posts_to_csv(posts, output_path):
+    """
+    Save posts data to a CSV file for better readability and analysis
+    
+    Args:
+        posts (list): List of post dictionaries with simplified data
+        output_path (str): Path to save the CSV file
+        
+    Returns:
+        str: Path to the created CSV file
+    """
+    try:
+        # Define CSV headers based on the structure of our simplified posts
+        headers = [
+            "Username", 
+            "Post URL", 
+            "Post Date",
+            "Post Type",
+            "Likes",
+            "Comments", 
+            "Location",
+            "Caption",
+            "Hashtags",
+            "Mentions",
+            "Followers Count",
+            "Posts Count",
+            "Verified"
+        ]
+        
+        # Open and write to CSV file
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            
+            # Write header row
+            writer.writerow(headers)
+            
+            # Write data for each post
+            for post in posts:
+                # Get profile data (if available)
+                profile = post.get("profile", {})
+                followers_count = profile.get("followers_count", "N/A")  
+                posts_count = profile.get("posts_count", "N/A")
+                verified = "Yes" if profile.get("is_verified", False) else "No"
+                
+                # Format lists (hashtags and mentions) as comma-separated strings
+                hashtags_str = ", ".join(post.get("hashtags", []))
+                mentions_str = ", ".join(post.get("mentions", []))
+                  # Clean caption - remove line breaks for CSV
+                caption = post.get("caption", "").replace("\n", " ").replace("\r", " ")
+                if len(caption) > 100:
+                    caption = caption[:97] + "..."
+                # Escape any CSV special characters
+                caption = caption.replace('"', '""')# Write the row
+                writer.writerow([
+                    post.get("username", ""),
+                    post.get("url", ""),
+                    post.get("post_date", ""),
+                    post.get("post_type", ""),
+                    post.get("likes_count", ""),
+                    post.get("comments_count", ""),
+                    post.get("location", ""),
+                    caption,
+                    hashtags_str,
+                    mentions_str,
+                    followers_count,
+                    posts_count,
+                    verified
+                ])
+                
+        print(f"CSV data successfully saved to {output_path}")
+        return output_path
+    except Exception as e:
+        print(f"Error saving CSV data: {e}")
+        return None
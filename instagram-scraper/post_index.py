@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+DEFAULT_INDEX_PATH = "data/post_index.db"
+
+class PostIndex:
+    """
+    Single-file SQLite index of every post scraped across sessions.
+
+    Keyed by post shortcode, it records when each post was first seen and
+    last scraped, which session file it was stored in and its last known
+    engagement. run_scraper uses it to skip posts scraped within a TTL so
+    daily re-runs of the same handles only scrape new or stale posts.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, ttl_hours=24):
+        """
+        Open (or create) the index
+
+        Args:
+            path: SQLite database file
+            ttl_hours: Posts scraped less than this many hours ago are skipped;
+                0 refreshes every post but still records it
+        """
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                shortcode TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                search_query TEXT,
+                first_seen REAL NOT NULL,
+                last_scraped REAL NOT NULL,
+                scrape_count INTEGER NOT NULL DEFAULT 1,
+                data_file TEXT,
+                likes_count TEXT,
+                comments_count TEXT,
+                post_json TEXT
+            )
+        """)
+        self._conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def last_scraped(self, shortcode):
+        """
+        When a post was last scraped
+
+        Returns:
+            float: Unix timestamp, or None if the post was never scraped
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_scraped FROM posts WHERE shortcode = ?", (shortcode,)).fetchone()
+        return row[0] if row else None
+
+    def needs_scrape(self, shortcode):
+        """
+        Apply the TTL policy to one post
+
+        Returns:
+            bool: True if the post is new or its last scrape is older than the TTL
+        """
+        last = self.last_scraped(shortcode)
+        return last is None or time.time() - last >= self.ttl_seconds
+
+    def record(self, shortcode, post, search_query=None, data_file=None):
+        """
+        Record a scraped post
+
+        Args:
+            shortcode: Post shortcode
+            post: Post dictionary as saved in the session data file
+            search_query: Query the post was found through
+            data_file: Session data file the post was written to
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO posts (shortcode, url, search_query, first_seen, last_scraped,
+                                   scrape_count, data_file, likes_count, comments_count, post_json)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT(shortcode) DO UPDATE SET
+                    url = excluded.url,
+                    search_query = excluded.search_query,
+                    last_scraped = excluded.last_scraped,
+                    scrape_count = posts.scrape_count + 1,
+                    data_file = excluded.data_file,
+                    likes_count = excluded.likes_count,
+                    comments_count = excluded.comments_count,
+                    post_json = excluded.post_json
+            """, (
+                shortcode, post.get("url", ""), search_query, now, now, data_file,
+                str(post.get("likes_count", "")), str(post.get("comments_count", "")),
+                json.dumps(post, ensure_ascii=False)
+            ))
+            self._conn.commit()
+
+    def get(self, shortcode):
+        """
+        Stored record of a post
+
+        Returns:
+            dict: Index row with the stored post under "post", or None
+        """
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM posts WHERE shortcode = ?", (shortcode,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        if not row:
+            return None
+        record = dict(zip(columns, row))
+        record["post"] = json.loads(record.pop("post_json") or "{}")
+        return record
+
+    def count(self):
+        """Number of posts in the index"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
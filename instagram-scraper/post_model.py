@@ -0,0 +1,259 @@
+import sys
+import json
+import time
+import random
+import tracemalloc
+from enum import Enum
+from count_parser import parse_count
+
+class PostType(str, Enum):
+    """Post types; each is a single shared object however many posts use it"""
+    PHOTO = "Photo"
+    VIDEO = "Video"
+    CAROUSEL = "Carousel"
+
+# Placeholders written by the scraper for values it could not find, stored as
+# None in the records and written back by to_dict
+POST_PLACEHOLDERS = {
+    "url": "",
+    "username": "Not found",
+    "timestamp": "",
+    "post_date": "Unknown",
+    "caption": "No caption available",
+    "likes_count": "Not available",
+    "comments_count": "Not available",
+    "post_type": "Unknown",
+    "location": "Not specified"
+}
+PROFILE_PLACEHOLDERS = {
+    "username": "Not found",
+    "full_name": "Not found",
+    "followers_count": "Not available",
+    "posts_count": "Not available"
+}
+
+def _text(value, placeholder):
+    """None for a missing value or placeholder, otherwise the interned string"""
+    if value is None or value == placeholder:
+        return None
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _post_type(value):
+    if value is None or value == POST_PLACEHOLDERS["post_type"]:
+        return None
+    try:
+        return PostType(value)
+    except ValueError:
+        return sys.intern(value)
+
+class Profile:
+    """Author fields kept with each post in the data file"""
+    __slots__ = ("username", "full_name", "followers_count", "posts_count", "is_verified")
+
+    def __init__(self, username=None, full_name=None, followers_count=None, posts_count=None,
+                 is_verified=False):
+        self.username = username
+        self.full_name = full_name
+        self.followers_count = followers_count
+        self.posts_count = posts_count
+        self.is_verified = is_verified
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a profile from a scraped profile_data or a data file profile"""
+        return cls(
+            _text(data.get("username", "Not found"), PROFILE_PLACEHOLDERS["username"]),
+            _text(data.get("full_name", "Not found"), PROFILE_PLACEHOLDERS["full_name"]),
+            _text(data.get("followers_count", "Not available"), PROFILE_PLACEHOLDERS["followers_count"]),
+            _text(data.get("posts_count", "Not available"), PROFILE_PLACEHOLDERS["posts_count"]),
+            data.get("is_verified", False)
+        )
+
+    def key(self):
+        return (self.username, self.full_name, self.followers_count, self.posts_count, self.is_verified)
+
+    def to_dict(self):
+        return {
+            "username": PROFILE_PLACEHOLDERS["username"] if self.username is None else self.username,
+            "full_name": PROFILE_PLACEHOLDERS["full_name"] if self.full_name is None else self.full_name,
+            "followers_count": (PROFILE_PLACEHOLDERS["followers_count"] if self.followers_count is None
+                                else self.followers_count),
+            "posts_count": PROFILE_PLACEHOLDERS["posts_count"] if self.posts_count is None else self.posts_count,
+            "is_verified": self.is_verified
+        }
+
+class Post:
+    """
+    Compact record of one post as saved in the data file.
+
+    Missing values are None instead of placeholder strings, lists are
+    tuples, strings are interned and the post type is a PostType member, so
+    repeated usernames, tags and types are stored once. Posts by the same
+    author share one Profile when built with a shared profiles dict.
+    to_dict gives back exactly the dictionary simplify_post produces.
+    """
+    __slots__ = ("url", "username", "timestamp", "post_date", "caption", "likes_count", "comments_count",
+                 "likes_numeric", "comments_numeric", "post_type", "hashtags", "mentions", "location",
+                 "media_urls", "profile")
+
+    def __init__(self, url=None, username=None, timestamp=None, post_date=None, caption=None,
+                 likes_count=None, comments_count=None, likes_numeric=None, comments_numeric=None,
+                 post_type=None, hashtags=(), mentions=(), location=None, media_urls=(), profile=None):
+        self.url = url
+        self.username = username
+        self.timestamp = timestamp
+        self.post_date = post_date
+        self.caption = caption
+        self.likes_count = likes_count
+        self.comments_count = comments_count
+        self.likes_numeric = likes_numeric
+        self.comments_numeric = comments_numeric
+        self.post_type = post_type
+        self.hashtags = hashtags
+        self.mentions = mentions
+        self.location = location
+        self.media_urls = media_urls
+        self.profile = profile
+
+    @classmethod
+    def from_dict(cls, data, profiles=None):
+        """
+        Build a record from a scraped post_data or a data file post
+
+        Args:
+            data: Post dictionary (raw with profile_data, or simplified with profile)
+            profiles: Dict shared across calls so identical profiles are stored once
+
+        Returns:
+            Post: The compact record
+        """
+        likes_count = data.get("likes_count", "Not available")
+        comments_count = data.get("comments_count", "Not available")
+        media_urls = tuple(sys.intern(media["url"]) if isinstance(media, dict) else sys.intern(media)
+                           for media in data.get("media_urls", [])
+                           if isinstance(media, str) or (isinstance(media, dict) and "url" in media))
+
+        profile = None
+        profile_data = data.get("profile_data", data.get("profile"))
+        if isinstance(profile_data, dict):
+            profile = Profile.from_dict(profile_data)
+            if profiles is not None:
+                profile = profiles.setdefault(profile.key(), profile)
+
+        return cls(
+            url=_text(data.get("url", ""), POST_PLACEHOLDERS["url"]),
+            username=_text(data.get("username", "Not found"), POST_PLACEHOLDERS["username"]),
+            timestamp=_text(data.get("timestamp", ""), POST_PLACEHOLDERS["timestamp"]),
+            post_date=_text(data.get("post_date", "Unknown"), POST_PLACEHOLDERS["post_date"]),
+            caption=_text(data.get("caption", "No caption available"), POST_PLACEHOLDERS["caption"]),
+            likes_count=_text(likes_count, POST_PLACEHOLDERS["likes_count"]),
+            comments_count=_text(comments_count, POST_PLACEHOLDERS["comments_count"]),
+            likes_numeric=data.get("likes_numeric", parse_count(likes_count)),
+            comments_numeric=data.get("comments_numeric", parse_count(comments_count)),
+            post_type=_post_type(data.get("post_type", "Unknown")),
+            hashtags=tuple(sys.intern(tag) for tag in data.get("hashtags", [])),
+            mentions=tuple(sys.intern(mention) for mention in data.get("mentions", [])),
+            location=_text(data.get("location", "Not specified"), POST_PLACEHOLDERS["location"]),
+            media_urls=media_urls,
+            profile=profile
+        )
+
+    def to_dict(self):
+        """The post in the data file layout (same keys, order and placeholders as simplify_post)"""
+        data = {}
+        for field in ("url", "username", "timestamp", "post_date", "caption", "likes_count", "comments_count"):
+            value = getattr(self, field)
+            data[field] = POST_PLACEHOLDERS[field] if value is None else value
+        data["likes_numeric"] = self.likes_numeric
+        data["comments_numeric"] = self.comments_numeric
+        data["post_type"] = (POST_PLACEHOLDERS["post_type"] if self.post_type is None
+                             else getattr(self.post_type, "value", self.post_type))
+        data["hashtags"] = list(self.hashtags)
+        data["mentions"] = list(self.mentions)
+        data["location"] = POST_PLACEHOLDERS["location"] if self.location is None else self.location
+        data["media_urls"] = list(self.media_urls)
+        if self.profile is not None:
+            data["profile"] = self.profile.to_dict()
+        return data
+
+def load_posts(posts):
+    """
+    Convert post dictionaries to compact records
+
+    Args:
+        posts: Iterable of post dictionaries (e.g. post_sink.iter_posts(path))
+
+    Returns:
+        list: Post records, sharing identical profiles
+    """
+    profiles = {}
+    return [Post.from_dict(post, profiles) for post in posts]
+
+def _sample_posts(count):
+    """Synthetic raw posts shaped like a profile search (one author, recurring tags)"""
+    random.seed(0)
+    tags = [f"#tag{i}" for i in range(500)]
+    posts = []
+    for i in range(count):
+        posts.append({
+            "url": f"https://www.instagram.com/p/C{i:09d}/",
+            "timestamp": "2025-06-11 14:52:04",
+            "username": "natgeo",
+            "full_name": "Not found",
+            "caption": f"Photo number {i} " + " ".join(random.sample(tags, 3)),
+            "likes_count": f"{random.randint(1, 999)},{random.randint(100, 999)} likes",
+            "comments_count": "Not available",
+            "shares_count": "Not available",
+            "post_date": "Unknown",
+            "hashtags": random.sample(tags, 3),
+            "mentions": [],
+            "tagged_users": [],
+            "location": "Not specified",
+            "post_type": random.choice(["Photo", "Video", "Carousel"]),
+            "media_urls": [{"url": f"https://scontent.cdninstagram.com/v/{i}.jpg", "type": "image"}],
+            "comments": [],
+            "profile_data": {
+                "username": "natgeo", "full_name": "Not found", "profile_pic_url": "Not available",
+                "bio": "Not available", "followers_count": "283M", "following_count": "Not available",
+                "posts_count": "30,123", "website_url": "Not available", "is_verified": True
+            }
+        })
+    return posts
+
+def benchmark(count=100_000):
+    """Compare memory and speed of simplified post dicts and Post records"""
+    # Imported here to keep this module free of the scraper's dependencies
+    from post_export import simplify_post
+
+    # Posts are parsed from JSON as they are when loaded from disk, so no
+    # strings are shared between posts up front
+    lines = [json.dumps(post) for post in _sample_posts(count)]
+    print(f"Holding {count:,} posts in memory")
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    dicts = [simplify_post(json.loads(line)) for line in lines]
+    seconds = time.perf_counter() - started
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"- simplified dicts: {dict_bytes / 2**20:7.1f} MB ({dict_bytes / count:.0f} bytes/post), "
+          f"built in {seconds:.2f}s")
+    del dicts
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = load_posts(json.loads(line) for line in lines)
+    seconds = time.perf_counter() - started
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"- Post records:     {record_bytes / 2**20:7.1f} MB ({record_bytes / count:.0f} bytes/post), "
+          f"built in {seconds:.2f}s")
+    print(f"Records use {100 - 100 * record_bytes / dict_bytes:.0f}% less memory")
+
+    started = time.perf_counter()
+    for record in records:
+        record.to_dict()
+    print(f"to_dict: {(time.perf_counter() - started) / count * 1e6:.1f} µs/post")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,126 @@
+import os
+import gzip
+import json
+import zlib
+import threading
+
+class PostSink:
+    """
+    Append-only JSONL file that receives each post as soon as it is scraped.
+
+    Every post is written and flushed immediately; the file is fsynced to
+    disk every fsync_every posts, so a crash loses at most that many posts
+    even on power loss. With compress=True the file is gzip-compressed and
+    each flush ends a deflate block, so the posts written so far remain
+    readable after a crash.
+    """
+
+    def __init__(self, path, compress=False, fsync_every=10):
+        """
+        Open the sink
+
+        Args:
+            path: JSONL file to append to (".gz" is added when compressing)
+            compress: Write a gzip-compressed file
+            fsync_every: Posts between fsyncs (0 only flushes to the OS)
+        """
+        if compress and not path.endswith(".gz"):
+            path += ".gz"
+        self.path = path
+        self.compress = compress
+        self.fsync_every = fsync_every
+        self.count = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._raw = open(path, "ab")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="ab") if compress else self._raw
+
+    def write(self, post):
+        """Append one post (thread-safe)"""
+        line = (json.dumps(post, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+            if self.compress:
+                self._file.flush(zlib.Z_SYNC_FLUSH)
+            self._raw.flush()
+            if self.fsync_every and self.count % self.fsync_every == 0:
+                os.fsync(self._raw.fileno())
+
+    def close(self):
+        """Flush, fsync and close the file"""
+        with self._lock:
+            if self._raw.closed:
+                return
+            if self.compress:
+                self._file.close()
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def iter_posts(path):
+    """
+    Stream the posts of a JSONL file written by PostSink
+
+    A line cut short by a crash (or a gzip stream that was never closed) ends
+    the iteration instead of raising, so everything written before the crash
+    can still be read.
+
+    Args:
+        path: JSONL file, gzip-compressed if it ends with ".gz"
+
+    Yields:
+        dict: One post per line
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as posts_file:
+        try:
+            for line in posts_file:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"Stopped at a truncated line in {path}")
+                    return
+        except (EOFError, zlib.error):
+            # Compressed stream ends without a gzip trailer after a crash
+            return
+
+def write_json_streaming(path, header, list_key, items):
+    """
+    Write {**header, list_key: [items...]} without holding the items in memory
+
+    The output is laid out exactly like json.dump(..., indent=4).
+
+    Args:
+        path: JSON file to write
+        header: Fields written before the list
+        list_key: Key of the list, written last
+        items: Iterable of JSON-serializable items
+
+    Returns:
+        int: Number of items written
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as json_file:
+        json_file.write("{\n")
+        for key, value in header.items():
+            value_json = json.dumps(value, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+            json_file.write(f"    {json.dumps(key)}: {value_json},\n")
+        json_file.write(f"    {json.dumps(list_key)}: [")
+        for item in items:
+            item_json = json.dumps(item, indent=4, ensure_ascii=False).replace("\n", "\n        ")
+            json_file.write(("," if count else "") + "\n        " + item_json)
+            count += 1
+        json_file.write("\n    ]\n}" if count else "]\n}")
+    return count
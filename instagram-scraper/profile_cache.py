@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_CACHE_PATH = "data/profile_cache.json"
+DEFAULT_TTL_HOURS = 6
+
+# Fields filled in by a visit to the profile page
+PROFILE_FIELDS = ("profile_pic_url", "bio", "posts_count", "followers_count", "followers_numeric",
+                  "following_count", "website_url", "is_verified")
+
+def username_from_url(profile_url):
+    """Username of a profile URL ("https://www.instagram.com/natgeo/" -> "natgeo")"""
+    if not profile_url:
+        return None
+    path = urlparse(profile_url).path.strip("/")
+    return path.split("/")[0].lower() if path else None
+
+class ProfileCache:
+    """
+    Profile metadata keyed by username, so each author's profile page is
+    visited at most once per TTL.
+
+    A profile search scrapes many posts by the same author, and every post
+    used to detour through the author's profile page (two page loads and
+    3-5 seconds of sleeps). Lookups and visits for one username are
+    serialized, so parallel detail workers wait for the visit in progress
+    instead of repeating it. With a path the cache is saved to disk and
+    reused by later runs.
+    """
+
+    def __init__(self, ttl_hours=DEFAULT_TTL_HOURS, path=None):
+        """
+        Initialize the cache, loading saved profiles if a path is given
+
+        Args:
+            ttl_hours: Hours a profile stays fresh (0 disables caching)
+            path: JSON file used to persist profiles (None keeps them in memory)
+        """
+        self.ttl_hours = ttl_hours
+        self.ttl_seconds = ttl_hours * 3600
+        self.path = path
+        self.profiles = {}  # username -> {"fetched_at": timestamp, "data": {...}}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._user_locks = {}
+        self.load()
+
+    def load(self):
+        """Load profiles saved by a previous run"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                self.profiles = json.load(cache_file).get("profiles", {})
+        except Exception as e:
+            print(f"Could not load profile cache: {e}")
+
+    def save(self):
+        """Persist fresh profiles for the next run (no-op without a path)"""
+        if not self.path:
+            return
+        with self._lock:
+            now = time.time()
+            profiles = {username: entry for username, entry in self.profiles.items()
+                        if now - entry["fetched_at"] < self.ttl_seconds}
+            data = {"updated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "profiles": profiles}
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as cache_file:
+                    json.dump(data, cache_file, indent=4, ensure_ascii=False)
+            except Exception as e:
+                print(f"Could not save profile cache: {e}")
+
+    def lock_for(self, username):
+        """Lock serializing the lookup and visit of one username"""
+        with self._lock:
+            return self._user_locks.setdefault(username, threading.Lock())
+
+    def fill(self, username, profile_data):
+        """
+        Copy a fresh cached profile into profile_data
+
+        Returns:
+            bool: True on a cache hit, False if the profile must be visited
+        """
+        with self._lock:
+            entry = self.profiles.get(username)
+            if entry and time.time() - entry["fetched_at"] < self.ttl_seconds:
+                profile_data.update(entry["data"])
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def put(self, username, profile_data):
+        """Cache the profile fields of profile_data (skipped if the visit found no counts)"""
+        if not self.ttl_seconds or profile_data.get("followers_count", "Not available") == "Not available":
+            return
+        with self._lock:
+            self.profiles[username] = {
+                "fetched_at": time.time(),
+                "data": {field: profile_data[field] for field in PROFILE_FIELDS if field in profile_data}
+            }
+
+_cache = None
+
+def get_profile_cache():
+    """Shared cache for the whole process, created in memory on first use"""
+    global _cache
+    if _cache is None:
+        _cache = ProfileCache()
+    return _cache
+
+def configure_profile_cache(ttl_hours=DEFAULT_TTL_HOURS, persist=False, path=DEFAULT_CACHE_PATH):
+    """
+    Set the TTL and persistence of the shared cache
+
+    The current cache is kept (with what it holds) when the settings are
+    unchanged, so runs in the same process share it.
+
+    Returns:
+        ProfileCache: The shared cache
+    """
+    global _cache
+    path = path if persist else None
+    if _cache is None or _cache.ttl_hours != ttl_hours or _cache.path != path:
+        _cache = ProfileCache(ttl_hours=ttl_hours, path=path)
+    return _cache
@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import random
+import threading
+from main import run_scraper, start_logged_in_driver
+from driver_pool import DriverPool, JobTimeout, PageBudgetExhausted
+from detail_workers import RateLimiter
+
+_account_limiters = {}
+_account_lock = threading.Lock()
+
+def get_account_limiter(account, requests_per_hour, burst=5):
+    """
+    Token bucket shared by everything logged in as one account
+
+    Args:
+        account: Instagram username the drivers are logged in as
+        requests_per_hour: Page loads per hour allowed for the account
+        burst: Page loads that may be made back to back
+
+    Returns:
+        RateLimiter: The same limiter for every call with the same account
+    """
+    with _account_lock:
+        limiter = _account_limiters.get(account)
+        if limiter is None or limiter.rate != requests_per_hour / 3600.0:
+            limiter = RateLimiter(requests_per_hour / 60.0, burst=burst)
+            _account_limiters[account] = limiter
+        return limiter
+
+class ProfileJob:
+    """One username of a batch, with its attempts and outcome"""
+
+    def __init__(self, username):
+        self.username = username
+        self.attempts = 0
+        self.next_try = 0.0
+        self.status = "pending"  # pending, running, done or failed
+        self.data_file = None
+        self.error = None
+        self.seconds = 0.0
+        self.page_loads = 0
+        self.thread = None  # Thread of the latest attempt
+
+    def to_dict(self):
+        return {
+            "username": self.username,
+            "status": self.status,
+            "attempts": self.attempts,
+            "seconds": round(self.seconds, 1),
+            "page_loads": self.page_loads,
+            "data_file": self.data_file,
+            "error": self.error
+        }
+
+class JobLease:
+    """
+    View of the shared driver pool for one job attempt.
+
+    Drivers leased through it carry the attempt's deadline, which the pool
+    checks on every page load, and their page loads are counted for the job.
+    With fresh=True every driver is quit when the job returns it. With
+    max_page_loads, a page load that would go past that many page loads of
+    the job raises PageBudgetExhausted instead of loading. Once the
+    attempt is revoked (timed out) no more drivers are leased through it, and
+    drivers its thread still holds are discarded when returned, as their
+    state is unknown.
+    """
+
+    def __init__(self, pool, deadline, fresh=False, max_page_loads=None):
+        self.pool = pool
+        self.deadline = deadline
+        self.fresh = fresh
+        self.max_page_loads = max_page_loads
+        self.revoked = False
+        self.page_loads = 0
+        self._budget_used = 0
+        self._started_at = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, block=True):
+        if self.revoked:
+            raise JobTimeout("Job ran past its time limit")
+        driver = self.pool.acquire(block=block)
+        if driver is not None:
+            driver.job_deadline = self.deadline
+            if self.max_page_loads is not None:
+                driver.page_load_gate = self._take_page_load
+            with self._lock:
+                self._started_at[id(driver)] = getattr(driver, "page_loads", 0)
+        return driver
+
+    def release(self, driver, healthy=True):
+        with self._lock:
+            self.page_loads += getattr(driver, "page_loads", 0) - self._started_at.pop(id(driver), 0)
+        driver.job_deadline = None
+        driver.page_load_gate = None
+        self.pool.release(driver, healthy=healthy and not self.fresh and not self.revoked)
+
+    def _take_page_load(self):
+        # Shared by every driver of the job, so the cap holds across detail workers
+        with self._lock:
+            if self._budget_used >= self.max_page_loads:
+                raise PageBudgetExhausted(f"Job used its budget of {self.max_page_loads} page loads")
+            self._budget_used += 1
+
+    def revoke(self):
+        """Give up on the attempt while its thread may still be using drivers"""
+        self.revoked = True
+
+    def close(self):
+        pass
+
+def run_profile_batch(usernames, concurrency=2, requests_per_hour=300, job_timeout=1800, max_attempts=3,
+                      retry_backoff=120, fresh_driver=False, recycle_pages=200, recycle_memory_mb=1024,
+                      report_path=None, **scrape_options):
+    """
+    Scrape several profiles at the same time under one account's request budget
+
+    Up to concurrency profiles run at once on drivers from a shared pool,
+    and every page load of every driver waits for the account's token
+    bucket, so the request budget holds however many jobs are running.
+    Each attempt gets job_timeout seconds; a failed or timed-out profile is
+    retried after an exponentially growing backoff while the other profiles
+    carry on, and is only given up after max_attempts. A timed-out attempt
+    keeps running until its drivers refuse the next page load with
+    JobTimeout, which ends its thread; the retry waits until then, its
+    drivers are discarded and the page loads it made in the meantime still
+    count for the job.
+
+    Page recording (record_to) uses one recorder for the whole process, so
+    it is refused when more than one profile runs at a time.
+
+    Args:
+        usernames: Usernames to scrape
+        concurrency: Profiles scraped at the same time
+        requests_per_hour: Page loads per hour allowed for the account
+        job_timeout: Seconds one attempt at a profile may take
+        max_attempts: Attempts per profile before giving up
+        retry_backoff: Seconds before the first retry, doubled for each later one
+        fresh_driver: Quit each browser after the job that used it
+        recycle_pages: Restart a pooled browser after this many page loads
+        recycle_memory_mb: Restart a pooled browser when its JS heap exceeds this size
+        report_path: JSON file for the batch report (default: data/batch_<timestamp>.json)
+        **scrape_options: Passed to run_scraper (max_posts, headless, detail_workers, ...)
+
+    Returns:
+        dict: Batch report with per-profile outcomes and profiles/hour
+    """
+    if scrape_options.get("record_to") and concurrency > 1:
+        raise ValueError("Recording pages (record_to) needs concurrency 1, as all jobs share one recorder")
+
+    jobs = [ProfileJob(username) for username in usernames]
+    account = os.getenv("INSTAGRAM_USERNAME") or "default"
+    limiter = get_account_limiter(account, requests_per_hour)
+    detail_workers = max(1, scrape_options.get("detail_workers", 1))
+    headless = scrape_options.get("headless", False)
+    capture_network = scrape_options.get("capture_network", False)
+    fast_mode = scrape_options.get("fast_mode", False)
+
+    pool = DriverPool(
+        lambda: start_logged_in_driver(headless=headless, capture_network=capture_network,
+                                       fast_mode=fast_mode),
+        size=concurrency * detail_workers,
+        max_pages=recycle_pages,
+        max_memory_mb=recycle_memory_mb,
+        rate_limiter=limiter
+    )
+
+    print(f"Scraping {len(jobs)} profiles, {concurrency} at a time, "
+          f"within {requests_per_hour} page loads/hour for account {account}")
+    started = time.time()
+    running = {}  # job -> (thread, lease, outcome)
+    winding_down = {}  # timed-out job -> (thread, lease, page loads already counted)
+
+    def attempt(job, lease, outcome):
+        attempt_started = time.time()
+        try:
+            outcome["data_file"] = run_scraper(search_query=job.username, driver_pool=lease,
+                                               raise_errors=True, **scrape_options)
+        except Exception as e:
+            outcome["error"] = str(e) or type(e).__name__
+        outcome["seconds"] = time.time() - attempt_started
+
+    def finish(job, lease, outcome):
+        job.attempts += 1
+        job.seconds = outcome.get("seconds", job_timeout)
+        job.page_loads += lease.page_loads
+        if "error" not in outcome:
+            job.status = "done"
+            job.data_file = outcome.get("data_file")
+            job.error = None
+            print(f"✅ {job.username} done in {job.seconds:.0f}s ({lease.page_loads} page loads)")
+            return
+        job.error = outcome["error"]
+        if job.attempts >= max_attempts:
+            job.status = "failed"
+            print(f"❌ {job.username} failed after {job.attempts} attempts: {job.error}")
+            return
+        delay = retry_backoff * 2 ** (job.attempts - 1) * random.uniform(0.8, 1.2)
+        job.status = "pending"
+        job.next_try = time.time() + delay
+        print(f"⚠️ {job.username} attempt {job.attempts} failed ({job.error}), retrying in {delay:.0f}s")
+
+    def count_late_page_loads(job):
+        # Page loads a timed-out attempt made after finish() counted it
+        thread, lease, counted = winding_down.pop(job)
+        job.page_loads += lease.page_loads - counted
+
+    try:
+        while any(job.status in ("pending", "running") for job in jobs):
+            now = time.time()
+
+            for job, (thread, lease, counted) in list(winding_down.items()):
+                if not thread.is_alive():
+                    count_late_page_loads(job)
+
+            # Collect finished and timed-out attempts
+            for job, (thread, lease, outcome) in list(running.items()):
+                if not thread.is_alive():
+                    del running[job]
+                    finish(job, lease, outcome)
+                elif now > lease.deadline:
+                    # The thread cannot be killed, but its drivers now refuse
+                    # page loads, so it winds down on its own; they are
+                    # discarded instead of being leased again
+                    del running[job]
+                    lease.revoke()
+                    outcome["error"] = f"Timed out after {job_timeout}s"
+                    finish(job, lease, dict(outcome))
+                    winding_down[job] = (thread, lease, lease.page_loads)
+
+            # Start due jobs while there is room
+            for job in jobs:
+                if len(running) >= concurrency:
+                    break
+                # Never retry while a timed-out attempt is still running
+                if job.status == "pending" and job.next_try <= now and \
+                        not (job.thread and job.thread.is_alive()):
+                    job.status = "running"
+                    lease = JobLease(pool, now + job_timeout, fresh=fresh_driver)
+                    outcome = {}
+                    thread = threading.Thread(target=attempt, args=(job, lease, outcome), daemon=True,
+                                              name=f"profile-{job.username}")
+                    job.thread = thread
+                    running[job] = (thread, lease, outcome)
+                    print(f"\nStarting {job.username} (attempt {job.attempts + 1}/{max_attempts})")
+                    thread.start()
+
+            time.sleep(0.5)
+    finally:
+        pool.close()
+        for job in list(winding_down):
+            count_late_page_loads(job)
+
+    elapsed = time.time() - started
+    done = [job for job in jobs if job.status == "done"]
+    page_loads = sum(job.page_loads for job in jobs)
+    pages_per_profile = sum(job.page_loads for job in done) / len(done) if done else 0
+    report = {
+        "account": account,
+        "concurrency": concurrency,
+        "requests_per_hour": requests_per_hour,
+        "elapsed_seconds": round(elapsed),
+        "profiles_done": len(done),
+        "profiles_failed": len(jobs) - len(done),
+        "profiles_per_hour": round(len(done) * 3600 / elapsed, 1) if elapsed else 0,
+        "page_loads": page_loads,
+        "page_loads_per_profile": round(pages_per_profile, 1),
+        # Ceiling set by the request budget alone, at the observed pages per profile
+        "budget_profiles_per_hour": round(requests_per_hour / pages_per_profile, 1) if pages_per_profile else None,
+        "jobs": [job.to_dict() for job in jobs]
+    }
+
+    print(f"\nBatch finished in {elapsed / 60:.1f} min: {report['profiles_done']} done, "
+          f"{report['profiles_failed']} failed, {report['profiles_per_hour']} profiles/hour "
+          f"({report['page_loads_per_profile']} page loads per profile)")
+    if report["budget_profiles_per_hour"]:
+        print(f"The budget of {requests_per_hour} page loads/hour allows up to "
+              f"{report['budget_profiles_per_hour']} profiles/hour")
+
+    report_path = report_path or f"data/batch_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=4)
+    print(f"Batch report saved to '{report_path}'")
+    return report
@@ -1,9 +1,10 @@
 import argparse
 import sys
 from main import run_scraper
+from profile_orchestrator import run_profile_batch
 
-def parse_arguments():
-    """Parse command line arguments for profile search"""
+def parse_arguments(argv=None):
+    """Parse command line arguments for profile search (sys.argv when argv is None)"""
     parser = argparse.ArgumentParser(description="Instagram Profile Scraper")
     
     parser.add_argument(
@@ -32,10 +33,163 @@ def parse_arguments():
         help="File with usernames, one per line"
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        "-w", "--workers", 
+        type=int, 
+        default=1, 
+        help="Number of browsers scraping post details in parallel (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--rpm", 
+        type=int, 
+        default=20, 
+        help="Maximum post page loads per minute across all workers (default: 20)"
+    )
+    
+    parser.add_argument(
+        "--ttl-hours", 
+        type=float, 
+        default=None, 
+        help="Skip posts already scraped within this many hours (uses data/post_index.db)"
+    )
+    
+    parser.add_argument(
+        "--capture-network", 
+        action="store_true", 
+        help="Parse post details from Instagram's API responses instead of the page DOM"
+    )
+    
+    parser.add_argument(
+        "--fresh-driver", 
+        action="store_true", 
+        help="Start a new browser and login for every username in batch mode"
+    )
+    
+    parser.add_argument(
+        "-k", "--concurrency", 
+        type=int, 
+        default=2, 
+        help="Profiles scraped at the same time in batch mode (default: 2)"
+    )
+    
+    parser.add_argument(
+        "--requests-per-hour", 
+        type=int, 
+        default=300, 
+        help="Page loads per hour allowed for the logged-in account in batch mode (default: 300)"
+    )
+    
+    parser.add_argument(
+        "--job-timeout", 
+        type=float, 
+        default=30, 
+        help="Minutes one attempt at a profile may take in batch mode (default: 30)"
+    )
+    
+    parser.add_argument(
+        "--max-attempts", 
+        type=int, 
+        default=3, 
+        help="Attempts per profile before giving up in batch mode (default: 3)"
+    )
+    
+    parser.add_argument(
+        "--retry-backoff", 
+        type=float, 
+        default=120, 
+        help="Seconds before retrying a failed profile, doubled on each retry (default: 120)"
+    )
+    
+    parser.add_argument(
+        "--recycle-pages", 
+        type=int, 
+        default=200, 
+        help="Restart the pooled browser after this many page loads (default: 200)"
+    )
+    
+    parser.add_argument(
+        "--recycle-memory-mb", 
+        type=int, 
+        default=1024, 
+        help="Restart the pooled browser when its JS heap exceeds this size (default: 1024)"
+    )
+    
+    parser.add_argument(
+        "--download-media", 
+        action="store_true", 
+        help="Download post images and videos into the session folder"
+    )
+    
+    parser.add_argument(
+        "--media-workers", 
+        type=int, 
+        default=4, 
+        help="Maximum number of concurrent media downloads (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--fast", 
+        action="store_true", 
+        help="Block images, videos, fonts and trackers to load pages faster"
+    )
+    
+    parser.add_argument(
+        "--pipeline", 
+        action="store_true", 
+        help="Load the next post in a second tab while the current one is extracted"
+    )
+    
+    parser.add_argument(
+        "--record", 
+        metavar="DIR", 
+        help="Save page snapshots to DIR for offline replay benchmarks"
+    )
+    
+    parser.add_argument(
+        "--gzip-posts", 
+        action="store_true", 
+        help="Gzip the JSONL file posts are streamed to while scraping"
+    )
+    
+    parser.add_argument(
+        "--no-trace", 
+        action="store_true", 
+        help="Do not write the per-run timing trace and summary"
+    )
+    
+    parser.add_argument(
+        "--profile-ttl-hours", 
+        type=float, 
+        default=6, 
+        help="Reuse an author's profile data for this many hours instead of revisiting their profile page (default: 6, 0 disables)"
+    )
+    
+    parser.add_argument(
+        "--persist-profiles", 
+        action="store_true", 
+        help="Save the profile cache to data/profile_cache.json and reuse it in later runs"
+    )
+    
+    parser.add_argument(
+        "--max-comments", 
+        type=int, 
+        default=10, 
+        help="Comments to collect per post (default: 10, 0 skips comments)"
+    )
+    
+    parser.add_argument(
+        "--comment-budget", 
+        type=float, 
+        default=10, 
+        help="Seconds each post may spend loading more comments (default: 10)"
+    )
+    
+    return parser.parse_args(argv)
 
-if __name__ == "__main__":
-    args = parse_arguments()
+def main(argv=None):
+    """Scrape the profiles given on the command line"""
+    args = parse_arguments(argv)
     
     # Process usernames
     if args.batch:
@@ -45,22 +199,36 @@ if __name__ == "__main__":
                 
             print(f"Loaded {len(usernames)} usernames")
             
-            for i, username in enumerate(usernames):
-                # Clean username format
-                clean_username = username.replace("@", "").strip()
-                print(f"\nProcessing {i+1}/{len(usernames)}: {clean_username}")
-                
-                run_scraper(
-                    search_query=clean_username,
-                    max_posts=args.num_posts,
-                    max_details=args.num_posts,  # Use same value for simplicity
-                    headless=args.headless
-                )
-                
-                if i < len(usernames) - 1:
-                    print("Waiting 60 seconds before next profile...")
-                    import time
-                    time.sleep(60)
+            # Several profiles at once, paced by one token bucket for the account
+            run_profile_batch(
+                [username.replace("@", "").strip() for username in usernames],
+                concurrency=args.concurrency,
+                requests_per_hour=args.requests_per_hour,
+                job_timeout=args.job_timeout * 60,
+                max_attempts=args.max_attempts,
+                retry_backoff=args.retry_backoff,
+                fresh_driver=args.fresh_driver,
+                recycle_pages=args.recycle_pages,
+                recycle_memory_mb=args.recycle_memory_mb,
+                max_posts=args.num_posts,
+                max_details=args.num_posts,  # Use same value for simplicity
+                headless=args.headless,
+                capture_network=args.capture_network,
+                detail_workers=args.workers,
+                requests_per_minute=args.rpm,
+                seen_ttl_hours=args.ttl_hours,
+                download_media=args.download_media,
+                media_workers=args.media_workers,
+                compress_posts=args.gzip_posts,
+                fast_mode=args.fast,
+                record_to=args.record,
+                trace=not args.no_trace,
+                profile_ttl_hours=args.profile_ttl_hours,
+                persist_profiles=args.persist_profiles,
+                max_comments=args.max_comments,
+                comment_budget=args.comment_budget,
+                pipeline=args.pipeline
+            )
         except Exception as e:
             print(f"Error processing batch: {e}")
             sys.exit(1)
@@ -71,7 +239,22 @@ if __name__ == "__main__":
             search_query=clean_username,
             max_posts=args.num_posts,
             max_details=args.num_posts,  # Use same value for simplicity
-            headless=args.headless
+            headless=args.headless,
+            capture_network=args.capture_network,
+            detail_workers=args.workers,
+            requests_per_minute=args.rpm,
+            seen_ttl_hours=args.ttl_hours,
+            download_media=args.download_media,
+            media_workers=args.media_workers,
+            compress_posts=args.gzip_posts,
+            fast_mode=args.fast,
+            record_to=args.record,
+            trace=not args.no_trace,
+            profile_ttl_hours=args.profile_ttl_hours,
+            persist_profiles=args.persist_profiles,
+            max_comments=args.max_comments,
+            comment_budget=args.comment_budget,
+            pipeline=args.pipeline
         )
     
     else:
@@ -79,3 +262,6 @@ if __name__ == "__main__":
         parser = argparse.ArgumentParser(description="Instagram Profile Scraper")
         parser.print_help()
         sys.exit(1)
+
+if __name__ == "__main__":
+    main()
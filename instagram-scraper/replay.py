@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote
+
+REPLAY_FOLDER = "data/replay"
+PAGE_TYPES = ("profile", "hashtag", "post", "carousel", "video")
+
+# Fields compared against the live extraction to score a replayed post
+EXPECTED_POST_FIELDS = ("username", "post_date", "caption", "likes_count", "comments_count",
+                        "post_type", "location")
+
+# Live page scripts are dropped on replay; JSON data scripts are kept
+# because the API extraction path reads them from the document
+LIVE_SCRIPT_RE = re.compile(r'<script\b(?![^>]*type="application/json")[^>]*>.*?</script>', re.S | re.I)
+INSTAGRAM_ORIGIN_RE = re.compile(r"https?://(?:www\.)?instagram\.com/")
+
+_recorder = None
+
+def _grid_type(url):
+    """Page type of a grid page (profile or hashtag) from its URL"""
+    return "hashtag" if "/explore/tags/" in url else "profile"
+
+def _post_type(post_type):
+    """Page type of a post page from the extracted post type"""
+    return {"Carousel": "carousel", "Video": "video"}.get(post_type, "post")
+
+class SnapshotRecorder:
+    """
+    Saves page snapshots during a real run so they can be replayed offline.
+
+    Each snapshot is a folder <folder>/<page type>/<slug>/ holding the page
+    HTML as loaded, the JSON API responses captured on that page (only with
+    network capture) and what the live run extracted from it, which the
+    replay benchmark uses as the expected result.
+    """
+
+    def __init__(self, folder=REPLAY_FOLDER):
+        self.folder = folder
+        self.saved = 0
+
+    def begin(self, driver, url):
+        """
+        Capture a page right after it loaded, before extraction changes the DOM
+
+        Returns:
+            dict: Snapshot to complete with save_post or save
+        """
+        try:
+            html = driver.page_source
+        except Exception as e:
+            print(f"Could not record page {url}: {e}")
+            html = ""
+        return {"url": url, "html": html, "responses": [], "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+    def save(self, snapshot, page_type, expected):
+        """
+        Write a snapshot to disk
+
+        Args:
+            snapshot: Dictionary returned by begin
+            page_type: One of PAGE_TYPES
+            expected: What the live run extracted from the page
+
+        Returns:
+            str: Snapshot folder
+        """
+        if not snapshot["html"]:
+            return None
+        path = urlparse(snapshot["url"]).path or "/"
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", path.strip("/")) or "home"
+        snapshot_path = os.path.join(self.folder, page_type, slug)
+        os.makedirs(snapshot_path, exist_ok=True)
+
+        with open(os.path.join(snapshot_path, "page.html"), "w", encoding="utf-8") as html_file:
+            html_file.write(snapshot["html"])
+        with open(os.path.join(snapshot_path, "responses.json"), "w", encoding="utf-8") as responses_file:
+            json.dump(snapshot["responses"], responses_file, ensure_ascii=False)
+        with open(os.path.join(snapshot_path, "meta.json"), "w", encoding="utf-8") as meta_file:
+            json.dump({
+                "url": snapshot["url"],
+                "path": path,
+                "page_type": page_type,
+                "recorded_at": snapshot["recorded_at"],
+                "expected": expected
+            }, meta_file, indent=4, ensure_ascii=False)
+
+        self.saved += 1
+        print(f"Recorded {page_type} page for replay: {snapshot_path}")
+        return snapshot_path
+
+    def save_post(self, snapshot, post_data):
+        """Save a post page snapshot with the fields extracted from it"""
+        expected = {field: post_data.get(field) for field in EXPECTED_POST_FIELDS}
+        expected["media_urls"] = [media["url"] if isinstance(media, dict) else media
+                                  for media in post_data.get("media_urls", [])]
+        return self.save(snapshot, _post_type(post_data.get("post_type")), expected)
+
+    def record_grid(self, driver, urls):
+        """Save the profile or hashtag grid the driver is on with the post URLs harvested"""
+        snapshot = self.begin(driver, driver.current_url)
+        return self.save(snapshot, _grid_type(snapshot["url"]), {"post_urls": urls})
+
+def start_recording(folder=REPLAY_FOLDER):
+    """Record every page scraped from now on"""
+    global _recorder
+    _recorder = SnapshotRecorder(folder)
+    print(f"Recording pages for offline replay to '{folder}'")
+    return _recorder
+
+def stop_recording():
+    """Stop recording pages"""
+    global _recorder
+    if _recorder:
+        print(f"Recorded {_recorder.saved} pages for offline replay")
+    _recorder = None
+
+def get_recorder():
+    """Active recorder, or None when not recording"""
+    return _recorder
+
+def load_snapshots(folder=REPLAY_FOLDER, page_types=PAGE_TYPES):
+    """
+    Read the metadata of every recorded snapshot
+
+    Returns:
+        list: meta.json contents, each with its "folder" and an "id"
+    """
+    snapshots = []
+    for page_type in page_types:
+        type_folder = os.path.join(folder, page_type)
+        if not os.path.isdir(type_folder):
+            continue
+        for slug in sorted(os.listdir(type_folder)):
+            meta_path = os.path.join(type_folder, slug, "meta.json")
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            meta["folder"] = os.path.join(type_folder, slug)
+            meta["id"] = f"{page_type}/{slug}"
+            snapshots.append(meta)
+    return snapshots
+
+class ReplayServer:
+    """
+    Serves recorded snapshots on localhost to a headless driver.
+
+    Pages are served at their original path with live scripts removed and
+    Instagram links made relative, so navigation stays on the replay server.
+    A small injected script re-requests each recorded API response from the
+    server, so the responses show up in the driver's performance log exactly
+    like on the live site.
+    """
+
+    def __init__(self, folder=REPLAY_FOLDER, port=0):
+        self.folder = folder
+        self.snapshots = load_snapshots(folder)
+        self._by_path = {meta["path"].rstrip("/"): meta for meta in self.snapshots}
+        self._by_id = {meta["id"]: meta for meta in self.snapshots}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def url(self, path):
+        """Replay URL of a recorded path"""
+        return self.base_url + path
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"Replaying {len(self.snapshots)} snapshots from '{self.folder}' at {self.base_url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _read(self, meta, name):
+        with open(os.path.join(meta["folder"], name), "r", encoding="utf-8") as snapshot_file:
+            return snapshot_file.read()
+
+    def _page_html(self, meta):
+        html = LIVE_SCRIPT_RE.sub("", self._read(meta, "page.html"))
+        html = INSTAGRAM_ORIGIN_RE.sub("/", html)
+
+        responses = json.loads(self._read(meta, "responses.json"))
+        if responses:
+            fetches = []
+            for index, response in enumerate(responses):
+                parsed = urlparse(response["url"])
+                replay_url = f"{parsed.path}?__replay={quote(meta['id'])}&i={index}"
+                fetches.append(f"fetch({json.dumps(replay_url)});")
+            html = html.replace("</body>", "<script>" + "".join(fetches) + "</script></body>", 1)
+        return html
+
+    def _handle(self, request):
+        parsed = urlparse(request.path)
+        query = parse_qs(parsed.query)
+
+        if "__replay" in query:
+            meta = self._by_id.get(query["__replay"][0])
+            if meta:
+                responses = json.loads(self._read(meta, "responses.json"))
+                index = int(query.get("i", ["0"])[0])
+                if index < len(responses):
+                    response = responses[index]
+                    return self._send(request, 200, response["body"],
+                                      response.get("mime_type") or "application/json")
+            return self._send(request, 404, "{}", "application/json")
+
+        meta = self._by_path.get(parsed.path.rstrip("/"))
+        if meta:
+            return self._send(request, 200, self._page_html(meta), "text/html; charset=utf-8")
+        return self._send(request, 404, "<html><body><h2>Sorry, this page isn't available.</h2></body></html>",
+                          "text/html; charset=utf-8")
+
+    def _send(self, request, status, body, content_type):
+        data = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
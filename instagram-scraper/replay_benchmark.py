@@ -0,0 +1,156 @@
+import sys
+import time
+import json
+import argparse
+from fast_load import enable_fast_mode, disable_fast_mode
+from scraper import scrape_instagram, scrape_post_details
+from replay import ReplayServer, REPLAY_FOLDER, PAGE_TYPES, EXPECTED_POST_FIELDS
+
+# Nothing may reach the live site during a replay
+LIVE_HOST_PATTERNS = [
+    "*://instagram.com/*",
+    "*://*.instagram.com/*",
+    "*://*.cdninstagram.com/*",
+    "*://*.facebook.com/*",
+    "*://*.fbcdn.net/*"
+]
+
+def count_webdriver_calls(driver):
+    """
+    Count every command the driver sends to the browser from now on
+
+    Returns:
+        dict: {"calls": n}, updated as commands are sent
+    """
+    counter = {"calls": 0}
+    execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter["calls"] += 1
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return counter
+
+def score_post(post_data, expected):
+    """Fraction of recorded fields the replayed extraction reproduced"""
+    media_urls = [media["url"] if isinstance(media, dict) else media
+                  for media in post_data.get("media_urls", [])]
+    matches = sum(1 for field in EXPECTED_POST_FIELDS if post_data.get(field) == expected.get(field))
+    matches += media_urls == expected.get("media_urls", [])
+    return matches / (len(EXPECTED_POST_FIELDS) + 1)
+
+def score_grid(urls, expected):
+    """Fraction of recorded post URLs the replayed harvest found"""
+    expected_urls = expected.get("post_urls", [])
+    if not expected_urls:
+        return 1.0 if not urls else 0.0
+    return len(set(urls) & set(expected_urls)) / len(expected_urls)
+
+def run_benchmark(folder=REPLAY_FOLDER, page_types=PAGE_TYPES, headless=True, capture_network=True, driver=None):
+    """
+    Replay recorded snapshots through the scraper and measure it
+
+    Args:
+        folder: Snapshot folder written by a recording run
+        page_types: Page types to replay
+        headless: Run Chrome without a window
+        capture_network: Exercise the API extraction path as well
+        driver: Chrome WebDriver to replay with instead of starting one (it
+            is left running; headless and capture_network are then ignored)
+
+    Returns:
+        dict: Per page type: pages, posts, seconds, posts_per_sec,
+            webdriver_calls_per_post, success_rate and avg_extraction_ms
+    """
+    results = {}
+    with ReplayServer(folder) as server:
+        snapshots = [meta for meta in server.snapshots if meta["page_type"] in page_types]
+        if not snapshots:
+            print(f"No recorded snapshots in '{folder}'. Record some with: "
+                  f"python profile_search.py <username> --capture-network --record {folder}")
+            return results
+
+        own_driver = driver is None
+        if own_driver:
+            # Imported here so a caller's driver can be used without the login stack
+            from main import setup_driver
+            driver = setup_driver(headless=headless, capture_network=capture_network)
+        enable_fast_mode(driver, extra_patterns=LIVE_HOST_PATTERNS)
+        counter = count_webdriver_calls(driver)
+        try:
+            for page_type in page_types:
+                pages = [meta for meta in snapshots if meta["page_type"] == page_type]
+                if not pages:
+                    continue
+
+                print(f"\nReplaying {len(pages)} {page_type} pages...")
+                calls_before = counter["calls"]
+                started = time.time()
+                posts = 0
+                scores = []
+                extraction_ms = []
+
+                for meta in pages:
+                    expected = meta["expected"]
+                    if page_type in ("profile", "hashtag"):
+                        driver.get(server.url(meta["path"]))
+                        urls = scrape_instagram(driver, max_posts=len(expected.get("post_urls", [])) or 15,
+                                                max_stalls=1, max_wait=1, pacing=None)
+                        posts += len(urls)
+                        scores.append(score_grid(urls, expected))
+                    else:
+                        post_data = scrape_post_details(driver, server.url(meta["path"]))
+                        posts += 1
+                        scores.append(score_post(post_data, expected))
+                        if "extraction_ms" in post_data:
+                            extraction_ms.append(post_data["extraction_ms"])
+
+                seconds = time.time() - started
+                results[page_type] = {
+                    "pages": len(pages),
+                    "posts": posts,
+                    "seconds": round(seconds, 2),
+                    "posts_per_sec": round(posts / seconds, 3) if seconds else 0,
+                    "webdriver_calls_per_post": round((counter["calls"] - calls_before) / max(posts, 1), 1),
+                    "success_rate": round(sum(scores) / len(scores), 3),
+                    "avg_extraction_ms": round(sum(extraction_ms) / len(extraction_ms)) if extraction_ms else None
+                }
+        finally:
+            if own_driver:
+                driver.quit()
+            else:
+                del driver.execute  # Drop the counting wrapper
+                disable_fast_mode(driver)
+
+    print(f"\n{'Page type':<10} {'Pages':>6} {'Posts/s':>8} {'Calls/post':>11} {'Success':>8} {'Extract ms':>11}")
+    for page_type, result in results.items():
+        extraction = result["avg_extraction_ms"] if result["avg_extraction_ms"] is not None else "-"
+        print(f"{page_type:<10} {result['pages']:>6} {result['posts_per_sec']:>8} "
+              f"{result['webdriver_calls_per_post']:>11} {result['success_rate']:>8.1%} {extraction:>11}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded Instagram pages and benchmark the scraper offline")
+    parser.add_argument("--folder", default=REPLAY_FOLDER, help=f"Snapshot folder (default: {REPLAY_FOLDER})")
+    parser.add_argument("--types", default=",".join(PAGE_TYPES),
+                        help="Comma-separated page types to replay (default: all)")
+    parser.add_argument("--dom-only", action="store_true", help="Skip the API extraction path")
+    parser.add_argument("--show-browser", action="store_true", help="Run Chrome with a visible window")
+    parser.add_argument("--min-success", type=float, default=0,
+                        help="Exit with an error if any page type scores below this rate (e.g. 0.9)")
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.folder, [t.strip() for t in args.types.split(",") if t.strip()],
+                            headless=not args.show_browser, capture_network=not args.dom_only)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=4)
+        print(f"Benchmark results saved to '{args.output}'")
+
+    failing = [page_type for page_type, result in results.items() if result["success_rate"] < args.min_success]
+    if failing:
+        print(f"Success rate below {args.min_success:.0%} for: {', '.join(failing)}")
+        sys.exit(1)
@@ -3,14 +3,189 @@ import json
 import time
 import statistics
 from datetime import datetime
+from html import escape
+from string import Template
 from collections import Counter
+from topk_sketch import SpaceSaving
+from count_parser import parse_count
 
-def generate_search_report(folder_path):
+SESSION_CACHE_NAME = ".report_cache.json"
+SESSION_CACHE_VERSION = 4
+RANKED_KEYS = ("users", "hashtags", "mentions")
+
+def _session_fingerprint(session_path):
+    """Name, size and mtime of every file the session aggregate is built from"""
+    fingerprint = []
+    for file_name in sorted(os.listdir(session_path)):
+        if file_name in ("summary.json", "all_posts.json") or \
+                (file_name.startswith("post_") and file_name.endswith(".json")):
+            stat = os.stat(os.path.join(session_path, file_name))
+            fingerprint.append([file_name, stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+def _session_folders(folder_path):
+    """
+    Session folders of a search query folder, sorted
+
+    The <report name>_posts/ folders holding the HTML report's table pages
+    sit next to the sessions and are skipped.
+    """
+    folders = []
+    for name in sorted(os.listdir(folder_path)):
+        path = os.path.join(folder_path, name)
+        if not os.path.isdir(path):
+            continue
+        if name.endswith("_posts") and all(f.startswith("page_") and f.endswith(".js") for f in os.listdir(path)):
+            continue
+        folders.append(name)
+    return folders
+
+def iter_session_posts(session_path):
+    """
+    Yield every post of a session folder once
+
+    Posts come from all_posts.json first, then from individual post_*.json
+    files that are not already in all_posts.json.
+    """
+    seen_urls = set()
+    all_posts_path = os.path.join(session_path, "all_posts.json")
+    if os.path.exists(all_posts_path):
+        with open(all_posts_path, "r", encoding="utf-8") as posts_file:
+            for post in json.load(posts_file).get("post_data", []):
+                seen_urls.add(post.get("url"))
+                yield post
+
+    post_files = [f for f in os.listdir(session_path) if f.startswith("post_") and f.endswith(".json")]
+    for post_file in post_files:
+        try:
+            with open(os.path.join(session_path, post_file), "r", encoding="utf-8") as file:
+                post = json.load(file)
+        except Exception as e:
+            print(f"Error processing post file {post_file}: {e}")
+            continue
+        if post.get("url") not in seen_urls:
+            seen_urls.add(post.get("url"))
+            yield post
+
+def aggregate_session(session_path, session_folder, sketch_capacity=None):
+    """
+    Build the partial aggregate of one scrape session
+
+    Args:
+        session_path: Path to the session folder
+        session_folder: Name of the session folder
+        sketch_capacity: Count users, hashtags and mentions with bounded
+            SpaceSaving sketches of this size instead of exact Counters
+
+    Returns:
+        dict: Session info plus counters and engagement sums, or None if the
+            folder has no summary.json
+    """
+    summary_path = os.path.join(session_path, "summary.json")
+    if not os.path.exists(summary_path):
+        return None
+
+    with open(summary_path, "r", encoding="utf-8") as summary_file:
+        summary_data = json.load(summary_file)
+
+    make_counter = (lambda: SpaceSaving(sketch_capacity)) if sketch_capacity else Counter
+    partial = {
+        "session_info": {
+            "timestamp": summary_data.get("scrape_timestamp", session_folder),
+            "posts_found": summary_data.get("total_posts_found", 0),
+            "posts_extracted": summary_data.get("posts_extracted", 0)
+        },
+        "users": make_counter(),
+        "hashtags": make_counter(),
+        "mentions": make_counter(),
+        "post_types": Counter(),
+        "likes_sum": 0,
+        "likes_n": 0,
+        "comments_sum": 0,
+        "comments_n": 0
+    }
+
+    def add_post(post):
+        username = post.get("username")
+        if username and username != "Not found":
+            partial["users"].update([username])
+        partial["hashtags"].update(post.get("hashtags", []))
+        partial["mentions"].update(post.get("mentions", []))
+        partial["post_types"][post.get("post_type", "Unknown")] += 1
+
+        likes = post.get("likes_numeric")
+        if likes is None:
+            likes = parse_count(post.get("likes_count", "0"))
+        if likes is not None:
+            partial["likes_sum"] += likes
+            partial["likes_n"] += 1
+        comments = post.get("comments_numeric")
+        if comments is None:
+            comments = parse_count(post.get("comments_count", "0"))
+        if comments is not None:
+            partial["comments_sum"] += comments
+            partial["comments_n"] += 1
+
+    for post in iter_session_posts(session_path):
+        add_post(post)
+
+    return partial
+
+def load_session_aggregate(session_path, session_folder, sketch_capacity=None):
+    """
+    Session aggregate from the cache next to the session, rebuilt if any of
+    its source files changed since it was cached (or the sketch size differs)
+
+    Returns:
+        dict: Partial aggregate (see aggregate_session), or None
+    """
+    cache_path = os.path.join(session_path, SESSION_CACHE_NAME)
+    fingerprint = _session_fingerprint(session_path)
+
+    try:
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            cached = json.load(cache_file)
+        if cached.get("version") == SESSION_CACHE_VERSION and cached.get("fingerprint") == fingerprint \
+                and cached.get("sketch_capacity") == sketch_capacity:
+            partial = cached["partial"]
+            if partial is not None:
+                for key in RANKED_KEYS:
+                    partial[key] = SpaceSaving.from_dict(partial[key]) if sketch_capacity else Counter(partial[key])
+                partial["post_types"] = Counter(partial["post_types"])
+            return partial
+    except (OSError, ValueError, KeyError):
+        pass
+
+    partial = aggregate_session(session_path, session_folder, sketch_capacity)
+    cached_partial = partial
+    if partial is not None and sketch_capacity:
+        cached_partial = dict(partial, **{key: partial[key].to_dict() for key in RANKED_KEYS})
+    try:
+        with open(cache_path, "w", encoding="utf-8") as cache_file:
+            json.dump({
+                "version": SESSION_CACHE_VERSION,
+                "fingerprint": fingerprint,
+                "sketch_capacity": sketch_capacity,
+                "partial": cached_partial
+            }, cache_file, ensure_ascii=False)
+    except OSError as e:
+        print(f"Could not cache aggregate for session {session_folder}: {e}")
+    return partial
+
+def generate_search_report(folder_path, sketch_capacity=None):
     """
     Generate a detailed summary report for a search query folder
     
+    Each session is aggregated once and cached in .report_cache.json inside
+    the session folder; later reports only re-parse sessions whose files
+    changed and merge the cached partials.
+    
     Args:
         folder_path: Path to the search query folder
+        sketch_capacity: Rank users, hashtags and mentions with SpaceSaving
+            sketches keeping at most this many counters each, so memory stays
+            bounded; counts may then be overestimated by the error reported
+            in summary["sketch"]. None counts exactly.
         
     Returns:
         dict: Report data
@@ -33,156 +208,71 @@ def generate_search_report(folder_path):
         }
     }
     
-    # Track all hashtags and mentions across all sessions
-    all_hashtags = []
-    all_mentions = []
-    all_users = []
-    all_post_types = []
-    like_counts = []
-    comment_counts = []
+    # Merged counters and engagement sums across all sessions
+    make_counter = (lambda: SpaceSaving(sketch_capacity)) if sketch_capacity else Counter
+    user_counter = make_counter()
+    hashtag_counter = make_counter()
+    mention_counter = make_counter()
+    post_type_counter = Counter()
+    likes_sum = likes_n = comments_sum = comments_n = 0
     
     # Process each session folder
-    session_folders = [f for f in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, f))]
-    
-    for session_folder in session_folders:
-        session_path = os.path.join(folder_path, session_folder)
-        
-        # Check for summary file
-        summary_path = os.path.join(session_path, "summary.json")
-        if not os.path.exists(summary_path):
+    for session_folder in _session_folders(folder_path):
+        partial = load_session_aggregate(os.path.join(folder_path, session_folder), session_folder,
+                                         sketch_capacity)
+        if not partial:
             continue
-            
-        # Load summary data
-        with open(summary_path, "r", encoding="utf-8") as summary_file:
-            summary_data = json.load(summary_file)
-            
-        session_info = {
-            "timestamp": summary_data.get("scrape_timestamp", session_folder),
-            "posts_found": summary_data.get("total_posts_found", 0),
-            "posts_extracted": summary_data.get("posts_extracted", 0)
-        }
         
-        report["scrape_sessions"].append(session_info)
-        report["total_posts_found"] += session_info["posts_found"]
+        report["scrape_sessions"].append(partial["session_info"])
+        report["total_posts_found"] += partial["session_info"]["posts_found"]
         
-        # Get all posts file
-        all_posts_path = os.path.join(session_path, "all_posts.json")
-        if os.path.exists(all_posts_path):
-            with open(all_posts_path, "r", encoding="utf-8") as posts_file:
-                posts_data = json.load(posts_file)
-                post_data = posts_data.get("post_data", [])
-                
-                # Process each post
-                for post in post_data:
-                    # Collect user
-                    username = post.get("username")
-                    if username and username != "Not found":
-                        all_users.append(username)
-                        
-                    # Collect hashtags
-                    hashtags = post.get("hashtags", [])
-                    all_hashtags.extend(hashtags)
-                    
-                    # Collect mentions
-                    mentions = post.get("mentions", [])
-                    all_mentions.extend(mentions)
-                    
-                    # Collect post type
-                    post_type = post.get("post_type", "Unknown")
-                    all_post_types.append(post_type)
-                    
-                    # Collect engagement metrics
-                    try:
-                        likes_text = post.get("likes_count", "0")
-                        # Clean up the text and convert to integer
-                        if likes_text != "Not available":
-                            likes = int(''.join(c for c in str(likes_text) if c.isdigit()))
-                            like_counts.append(likes)
-                    except:
-                        pass
-                        
-                    try:
-                        comments_text = post.get("comments_count", "0")
-                        # Clean up the text and convert to integer
-                        if comments_text != "Not available":
-                            comments = int(''.join(c for c in str(comments_text) if c.isdigit()))
-                            comment_counts.append(comments)
-                    except:
-                        pass
-                        
-        # Process individual post files as well to ensure we get all data
-        post_files = [f for f in os.listdir(session_path) if f.startswith("post_") and f.endswith(".json")]
-        
-        for post_file in post_files:
-            post_path = os.path.join(session_path, post_file)
-            try:
-                with open(post_path, "r", encoding="utf-8") as file:
-                    post = json.load(file)
-                    
-                    # Collect data only if not already processed from all_posts.json
-                    if post.get("url") not in [p.get("url") for p in post_data]:
-                        # Collect user
-                        username = post.get("username")
-                        if username and username != "Not found":
-                            all_users.append(username)
-                            
-                        # Collect hashtags
-                        hashtags = post.get("hashtags", [])
-                        all_hashtags.extend(hashtags)
-                        
-                        # Collect mentions
-                        mentions = post.get("mentions", [])
-                        all_mentions.extend(mentions)
-                        
-                        # Collect post type
-                        post_type = post.get("post_type", "Unknown")
-                        all_post_types.append(post_type)
-                        
-                        # Collect engagement metrics (same as above)
-                        try:
-                            likes_text = post.get("likes_count", "0")
-                            if likes_text != "Not available":
-                                likes = int(''.join(c for c in str(likes_text) if c.isdigit()))
-                                like_counts.append(likes)
-                        except:
-                            pass
-                            
-                        try:
-                            comments_text = post.get("comments_count", "0")
-                            if comments_text != "Not available":
-                                comments = int(''.join(c for c in str(comments_text) if c.isdigit()))
-                                comment_counts.append(comments)
-                        except:
-                            pass
-            except Exception as e:
-                print(f"Error processing post file {post_file}: {e}")
+        if sketch_capacity:
+            user_counter.merge(partial["users"])
+            hashtag_counter.merge(partial["hashtags"])
+            mention_counter.merge(partial["mentions"])
+        else:
+            user_counter.update(partial["users"])
+            hashtag_counter.update(partial["hashtags"])
+            mention_counter.update(partial["mentions"])
+        post_type_counter.update(partial["post_types"])
+        likes_sum += partial["likes_sum"]
+        likes_n += partial["likes_n"]
+        comments_sum += partial["comments_sum"]
+        comments_n += partial["comments_n"]
     
     # Compute summary statistics
     # Top users
-    user_counter = Counter(all_users)
     report["summary"]["top_users"] = [{"username": user, "posts": count} 
                                      for user, count in user_counter.most_common(10)]
                                      
     # Top hashtags
-    hashtag_counter = Counter(all_hashtags)
     report["summary"]["top_hashtags"] = [{"hashtag": tag, "occurrences": count} 
                                         for tag, count in hashtag_counter.most_common(20)]
                                         
     # Top mentions
-    mention_counter = Counter(all_mentions)
     report["summary"]["top_mentions"] = [{"mention": mention, "occurrences": count} 
                                         for mention, count in mention_counter.most_common(10)]
                                         
+    # Error bounds of the approximate rankings
+    if sketch_capacity:
+        report["summary"]["sketch"] = {
+            "capacity": sketch_capacity,
+            "max_overcount": {
+                "users": user_counter.error_bound(),
+                "hashtags": hashtag_counter.error_bound(),
+                "mentions": mention_counter.error_bound()
+            }
+        }
+        
     # Post types distribution
-    post_type_counter = Counter(all_post_types)
     report["summary"]["post_types"] = {post_type: count for post_type, count in post_type_counter.items()}
     
     # Average engagement
-    if like_counts:
-        report["summary"]["avg_likes"] = sum(like_counts) / len(like_counts)
+    if likes_n:
+        report["summary"]["avg_likes"] = likes_sum / likes_n
         
-    if comment_counts:
-        report["summary"]["avg_comments"] = sum(comment_counts) / len(comment_counts)
+    if comments_n:
+        report["summary"]["avg_comments"] = comments_sum / comments_n
         
     # Generate report file
     report_path = os.path.join(folder_path, f"report_{int(time.time())}.json")
@@ -192,18 +282,297 @@ def generate_search_report(folder_path):
     print(f"Generated report at {report_path}")
     return report
 
-def generate_html_report(report_data, output_path=None):
+
+# Report templates, compiled once at import time
+PAGE_HEADER_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Instagram Scraper Report: $search_query</title>
+    <style>
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+            background-color: #f9f9f9;
+        }
+        h1, h2, h3 {
+            color: #2a5885;
+        }
+        .report-header {
+            background-color: #2a5885;
+            color: white;
+            padding: 15px 20px;
+            border-radius: 8px;
+            margin-bottom: 30px;
+        }
+        .report-section {
+            background-color: white;
+            border-radius: 8px;
+            padding: 20px;
+            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+            margin-bottom: 30px;
+        }
+        .stats-container {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 20px;
+            justify-content: space-between;
+        }
+        .stat-card {
+            background-color: #f0f7ff;
+            border-left: 5px solid #2a5885;
+            padding: 15px;
+            border-radius: 5px;
+            flex: 1;
+            min-width: 200px;
+        }
+        .stat-value {
+            font-size: 1.8rem;
+            font-weight: bold;
+            color: #2a5885;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin-bottom: 20px;
+        }
+        th, td {
+            padding: 12px 15px;
+            text-align: left;
+            border-bottom: 1px solid #ddd;
+        }
+        th {
+            background-color: #f2f7fc;
+            font-weight: bold;
+        }
+        tr:hover {
+            background-color: #f5f5f5;
+        }
+        .pager button {
+            padding: 6px 12px;
+            margin-right: 10px;
+        }
+    </style>
+</head>
+<body>
+    <div class="report-header">
+        <h1>Instagram Scraper Report</h1>
+        <p>Search Query: <strong>$search_query</strong></p>
+        <p>Report Generated: $generated_at</p>
+    </div>
+    
+    <div class="report-section">
+        <h2>Overview</h2>
+        <div class="stats-container">
+            <div class="stat-card">
+                <h3>Total Posts</h3>
+                <div class="stat-value">$total_posts</div>
+            </div>
+            <div class="stat-card">
+                <h3>Avg. Likes</h3>
+                <div class="stat-value">$avg_likes</div>
+            </div>
+            <div class="stat-card">
+                <h3>Avg. Comments</h3>
+                <div class="stat-value">$avg_comments</div>
+            </div>
+            <div class="stat-card">
+                <h3>Total Sessions</h3>
+                <div class="stat-value">$total_sessions</div>
+            </div>
+        </div>
+    </div>
+""")
+
+TABLE_START_TEMPLATE = Template("""
+    <div class="report-section">
+        <h2>$title</h2>
+        <table>
+            <thead>
+                <tr>$headers</tr>
+            </thead>
+            <tbody$body_id>
+""")
+
+TABLE_END = """            </tbody>
+        </table>
+"""
+
+SECTION_END = """    </div>
+"""
+
+# Later pages of the posts table are JS files, so they also load from file://
+PAGER_TEMPLATE = Template("""        <div class="pager">
+            <button id="posts-prev" onclick="showPostsPage(currentPage - 1)">Previous</button>
+            <button id="posts-next" onclick="showPostsPage(currentPage + 1)">Next</button>
+            <span id="posts-page">Page 1 of $page_count</span>
+        </div>
+        <script>
+            var pageCount = $page_count, currentPage = 1, loadedPages = {};
+            var columns = ["username", "post_date", "post_type", "likes", "comments", "caption", "url"];
+            function renderRows(rows) {
+                var body = document.getElementById("posts-body");
+                body.innerHTML = "";
+                rows.forEach(function (row) {
+                    var tr = document.createElement("tr");
+                    columns.forEach(function (column) {
+                        var td = document.createElement("td");
+                        if (column === "url") {
+                            var link = document.createElement("a");
+                            link.href = row.url;
+                            link.textContent = "Open";
+                            td.appendChild(link);
+                        } else {
+                            td.textContent = row[column];
+                        }
+                        tr.appendChild(td);
+                    });
+                    body.appendChild(tr);
+                });
+            }
+            function reportPostsPage(page, rows) {
+                loadedPages[page] = rows;
+                if (page === currentPage) renderRows(rows);
+            }
+            function showPostsPage(page) {
+                if (page < 1 || page > pageCount) return;
+                if (!loadedPages[1]) loadedPages[1] = firstPageRows();
+                currentPage = page;
+                document.getElementById("posts-page").textContent = "Page " + page + " of " + pageCount;
+                if (loadedPages[page]) {
+                    renderRows(loadedPages[page]);
+                } else {
+                    var script = document.createElement("script");
+                    script.src = "$chunk_folder/page_" + page + ".js";
+                    document.body.appendChild(script);
+                }
+            }
+            function firstPageRows() {
+                return Array.prototype.map.call(document.querySelectorAll("#posts-body tr"), function (tr) {
+                    var cells = tr.children, row = {};
+                    columns.forEach(function (column, i) {
+                        row[column] = column === "url" ? cells[i].querySelector("a").href : cells[i].textContent;
+                    });
+                    return row;
+                });
+            }
+        </script>
+""")
+
+PAGE_FOOTER = """    
+    <footer>
+        <p>Generated by Instagram Scraper</p>
+    </footer>
+</body>
+</html>
+"""
+
+POST_COLUMNS = ["Username", "Date", "Type", "Likes", "Comments", "Caption", "Link"]
+
+def _write_table(html_file, title, headers, rows):
+    """Stream a table section, escaping every cell"""
+    html_file.write(TABLE_START_TEMPLATE.substitute(
+        title=escape(title),
+        headers="".join(f"<th>{escape(header)}</th>" for header in headers),
+        body_id=""
+    ))
+    for row in rows:
+        html_file.write("                <tr>" + "".join(f"<td>{escape(str(cell))}</td>" for cell in row) + "</tr>\n")
+    html_file.write(TABLE_END + SECTION_END)
+
+def _post_row(post):
+    """Fields shown for one post in the posts table"""
+    caption = str(post.get("caption", ""))
+    likes = post.get("likes_numeric")
+    comments = post.get("comments_numeric")
+    return {
+        "username": str(post.get("username", "")),
+        "post_date": str(post.get("post_date", "")),
+        "post_type": str(post.get("post_type", "")),
+        "likes": str(likes if likes is not None else post.get("likes_count", "")),
+        "comments": str(comments if comments is not None else post.get("comments_count", "")),
+        "caption": caption[:120] + "..." if len(caption) > 120 else caption,
+        "url": str(post.get("url", ""))
+    }
+
+def _write_posts_table(html_file, folder_path, output_path, page_size):
+    """
+    Stream the posts table: the first page inline, later pages as JS chunks
+
+    Returns:
+        int: Number of posts written
+    """
+    chunk_folder = os.path.splitext(os.path.basename(output_path))[0] + "_posts"
+    chunk_path = os.path.join(os.path.dirname(output_path), chunk_folder)
+
+    html_file.write(TABLE_START_TEMPLATE.substitute(
+        title="Posts",
+        headers="".join(f"<th>{header}</th>" for header in POST_COLUMNS),
+        body_id=' id="posts-body"'
+    ))
+
+    total = 0
+    page = []
+    page_number = 1
+
+    def flush_page(rows, number):
+        os.makedirs(chunk_path, exist_ok=True)
+        with open(os.path.join(chunk_path, f"page_{number}.js"), "w", encoding="utf-8") as chunk_file:
+            chunk_file.write(f"reportPostsPage({number}, {json.dumps(rows, ensure_ascii=False)});\n")
+
+    for session_folder in _session_folders(folder_path):
+        for post in iter_session_posts(os.path.join(folder_path, session_folder)):
+            row = _post_row(post)
+            total += 1
+            if page_number == 1:
+                html_file.write(
+                    "                <tr>" +
+                    "".join(f"<td>{escape(row[key])}</td>" for key in
+                            ("username", "post_date", "post_type", "likes", "comments", "caption")) +
+                    f'<td><a href="{escape(row["url"])}">Open</a></td></tr>\n'
+                )
+            else:
+                page.append(row)
+            if total % page_size == 0:
+                if page:
+                    flush_page(page, page_number)
+                page = []
+                page_number += 1
+    if page:
+        flush_page(page, page_number)
+
+    html_file.write(TABLE_END)
+    page_count = max(1, (total + page_size - 1) // page_size)
+    if page_count > 1:
+        html_file.write(PAGER_TEMPLATE.substitute(page_count=page_count, chunk_folder=chunk_folder))
+    html_file.write(SECTION_END)
+    return total
+
+def generate_html_report(report_data, output_path=None, folder_path=None, page_size=500):
     """
     Generate an HTML report from the report data
     
+    The page is rendered from precompiled templates and streamed to the file
+    row by row. With folder_path, every post is listed in a paginated table:
+    the first page_size posts are written inline and later pages go to
+    <report name>_posts/page_N.js files that the page loads on demand.
+    
     Args:
         report_data: Dictionary containing report data
         output_path: Path to save HTML report (optional)
+        folder_path: Search query folder to list posts from (optional)
+        page_size: Posts per page of the posts table
         
     Returns:
-        str: HTML content
+        str: Path of the HTML report
     """
     search_query = report_data["search_query"]
+    summary = report_data["summary"]
     
     if not output_path:
         # Generate default output path
@@ -212,250 +581,32 @@ def generate_html_report(report_data, output_path=None):
         
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    # Create HTML content
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Instagram Scraper Report: {search_query}</title>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 1200px;
-                margin: 0 auto;
-                padding: 20px;
-                background-color: #f9f9f9;
-            }}
-            h1, h2, h3 {{
-                color: #2a5885;
-            }}
-            .report-header {{
-                background-color: #2a5885;
-                color: white;
-                padding: 15px 20px;
-                border-radius: 8px;
-                margin-bottom: 30px;
-            }}
-            .report-section {{
-                background-color: white;
-                border-radius: 8px;
-                padding: 20px;
-                box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-                margin-bottom: 30px;
-            }}
-            .stats-container {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 20px;
-                justify-content: space-between;
-            }}
-            .stat-card {{
-                background-color: #f0f7ff;
-                border-left: 5px solid #2a5885;
-                padding: 15px;
-                border-radius: 5px;
-                flex: 1;
-                min-width: 200px;
-            }}
-            .stat-value {{
-                font-size: 1.8rem;
-                font-weight: bold;
-                color: #2a5885;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-bottom: 20px;
-            }}
-            th, td {{
-                padding: 12px 15px;
-                text-align: left;
-                border-bottom: 1px solid #ddd;
-            }}
-            th {{
-                background-color: #f2f7fc;
-                font-weight: bold;
-            }}
-            tr:hover {{
-                background-color: #f5f5f5;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="report-header">
-            <h1>Instagram Scraper Report</h1>
-            <p>Search Query: <strong>{search_query}</strong></p>
-            <p>Report Generated: {report_data["report_generated_at"]}</p>
-        </div>
-        
-        <div class="report-section">
-            <h2>Overview</h2>
-            <div class="stats-container">
-                <div class="stat-card">
-                    <h3>Total Posts</h3>
-                    <div class="stat-value">{report_data["total_posts_found"]}</div>
-                </div>
-                <div class="stat-card">
-                    <h3>Avg. Likes</h3>
-                    <div class="stat-value">{int(report_data["summary"]["avg_likes"])}</div>
-                </div>
-                <div class="stat-card">
-                    <h3>Avg. Comments</h3>
-                    <div class="stat-value">{int(report_data["summary"]["avg_comments"])}</div>
-                </div>
-                <div class="stat-card">
-                    <h3>Total Sessions</h3>
-                    <div class="stat-value">{len(report_data["scrape_sessions"])}</div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="report-section">
-            <h2>Top Users</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Username</th>
-                        <th>Posts</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
-    
-    # Add top users
-    for user in report_data["summary"]["top_users"]:
-        html_content += f"""
-                    <tr>
-                        <td>{user["username"]}</td>
-                        <td>{user["posts"]}</td>
-                    </tr>
-        """
-    
-    html_content += """
-                </tbody>
-            </table>
-        </div>
-        
-        <div class="report-section">
-            <h2>Top Hashtags</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Hashtag</th>
-                        <th>Occurrences</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
-    
-    # Add top hashtags
-    for tag in report_data["summary"]["top_hashtags"]:
-        html_content += f"""
-                    <tr>
-                        <td>{tag["hashtag"]}</td>
-                        <td>{tag["occurrences"]}</td>
-                    </tr>
-        """
-    
-    html_content += """
-                </tbody>
-            </table>
-        </div>
-        
-        <div class="report-section">
-            <h2>Post Types Distribution</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Type</th>
-                        <th>Count</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
-    
-    # Add post types
-    for post_type, count in report_data["summary"]["post_types"].items():
-        html_content += f"""
-                    <tr>
-                        <td>{post_type}</td>
-                        <td>{count}</td>
-                    </tr>
-        """
-    
-    html_content += """
-                </tbody>
-            </table>
-        </div>
+    with open(output_path, "w", encoding="utf-8") as html_file:
+        html_file.write(PAGE_HEADER_TEMPLATE.substitute(
+            search_query=escape(search_query),
+            generated_at=escape(report_data["report_generated_at"]),
+            total_posts=report_data["total_posts_found"],
+            avg_likes=int(summary["avg_likes"]),
+            avg_comments=int(summary["avg_comments"]),
+            total_sessions=len(report_data["scrape_sessions"])
+        ))
         
-        <div class="report-section">
-            <h2>Scrape Sessions</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Timestamp</th>
-                        <th>Posts Found</th>
-                        <th>Posts Extracted</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
-    
-    # Add scrape sessions
-    for session in report_data["scrape_sessions"]:
-        html_content += f"""
-                    <tr>
-                        <td>{session["timestamp"]}</td>
-                        <td>{session["posts_found"]}</td>
-                        <td>{session["posts_extracted"]}</td>
-                    </tr>
-        """
-    
-    html_content += """
-                </tbody>
-            </table>
-        </div>
+        _write_table(html_file, "Top Users", ["Username", "Posts"],
+                     ((user["username"], user["posts"]) for user in summary["top_users"]))
+        _write_table(html_file, "Top Hashtags", ["Hashtag", "Occurrences"],
+                     ((tag["hashtag"], tag["occurrences"]) for tag in summary["top_hashtags"]))
+        _write_table(html_file, "Post Types Distribution", ["Type", "Count"],
+                     summary["post_types"].items())
+        _write_table(html_file, "Scrape Sessions", ["Timestamp", "Posts Found", "Posts Extracted"],
+                     ((session["timestamp"], session["posts_found"], session["posts_extracted"])
+                      for session in report_data["scrape_sessions"]))
+        _write_table(html_file, "Top Mentions", ["Mention", "Occurrences"],
+                     ((mention["mention"], mention["occurrences"]) for mention in summary["top_mentions"]))
         
-        <div class="report-section">
-            <h2>Top Mentions</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Mention</th>
-                        <th>Occurrences</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
-    
-    # Add top mentions
-    for mention in report_data["summary"]["top_mentions"]:
-        html_content += f"""
-                    <tr>
-                        <td>{mention["mention"]}</td>
-                        <td>{mention["occurrences"]}</td>
-                    </tr>
-        """
-    
-    html_content += """
-                </tbody>
-            </table>
-        </div>
+        if folder_path:
+            _write_posts_table(html_file, folder_path, output_path, page_size)
         
-        <footer>
-            <p>Generated by Instagram Scraper</p>
-        </footer>
-    </body>
-    </html>
-    """
-    
-    # Write HTML to file
-    with open(output_path, "w", encoding="utf-8") as html_file:
-        html_file.write(html_content)
+        html_file.write(PAGE_FOOTER)
         
     print(f"HTML report saved to {output_path}")
-    return html_content
+    return output_path
@@ -0,0 +1,224 @@
+"""
+Instagram scraper command line
+
+    python run.py scrape natgeo -n 20          Scrape profiles (options of profile_search.py)
+    python run.py crawl natgeo "#travel"       Crawl related profiles and hashtags within a budget
+    python run.py report data/travel --html    Rebuild the reports of a search query folder
+    python run.py export data/travel/20250611_134523 -o posts.csv
+    python run.py startup-check                Fail if offline commands import the browser stack
+
+Each command imports the modules it needs when it runs, so the offline
+commands (report, export) start without loading Selenium and the scraper.
+"""
+import os
+import sys
+import argparse
+
+# Modules only scraping needs; offline commands must not import them
+HEAVY_MODULES = ("selenium", "webdriver_manager", "dotenv", "requests", "numpy", "main", "scraper", "utils")
+
+# What each offline command imports when it runs, checked by startup-check
+COMMAND_MODULES = {
+    "report": ("report_generator",),
+    "export": ("post_export", "post_sink", "report_generator")
+}
+
+def scrape(args, extra):
+    """Scrape profiles with profile_search.py's options"""
+    from profile_search import main as profile_search_main
+    profile_search_main(extra)
+
+def crawl(args):
+    """Crawl from seed profiles and hashtags within a page load budget"""
+    from crawl_frontier import run_crawl
+
+    run_crawl(args.seeds, budget_pages=args.budget, max_posts=args.num_posts, max_depth=args.max_depth,
+              revisit_hours=args.revisit_hours, state_path=args.state, requests_per_hour=args.requests_per_hour,
+              headless=args.headless, capture_network=args.capture_network, fast_mode=args.fast,
+              seen_ttl_hours=args.ttl_hours)
+    return 0
+
+def report(args):
+    """Rebuild the JSON report (and optionally the HTML report) of a search query folder"""
+    from report_generator import generate_search_report, generate_html_report
+
+    if not os.path.isdir(args.folder):
+        print(f"No such folder: {args.folder}")
+        return 1
+    report_data = generate_search_report(args.folder, sketch_capacity=args.sketch_capacity)
+    if args.html:
+        generate_html_report(report_data, output_path=args.output, folder_path=args.folder,
+                             page_size=args.page_size)
+    return 0
+
+def _iter_export_posts(path):
+    """Posts of a session folder, data JSON file or posts JSONL file"""
+    from post_sink import iter_posts
+
+    if os.path.isdir(path):
+        # Posts streamed while scraping, else the data files, else the older session layout
+        names = sorted(os.listdir(path))
+        streams = [name for name in names if "_posts_" in name and
+                   (name.endswith(".jsonl") or name.endswith(".jsonl.gz"))]
+        data_files = [name for name in names if "_data_" in name and name.endswith(".json")]
+        if streams:
+            for name in streams:
+                yield from iter_posts(os.path.join(path, name))
+        elif data_files:
+            for name in data_files:
+                yield from _iter_export_posts(os.path.join(path, name))
+        else:
+            from report_generator import iter_session_posts
+            yield from iter_session_posts(path)
+    elif path.endswith(".jsonl") or path.endswith(".jsonl.gz"):
+        yield from iter_posts(path)
+    else:
+        import json
+        with open(path, "r", encoding="utf-8") as data_file:
+            data = json.load(data_file)
+        yield from data.get("posts", []) if isinstance(data, dict) else data
+
+def export(args):
+    """Export scraped posts to CSV or JSONL"""
+    import json
+    from post_export import simplify_post, save_posts_to_csv
+
+    if not os.path.exists(args.source):
+        print(f"No such file or folder: {args.source}")
+        return 1
+
+    # Raw posts carry profile_data; posts from data files are already simplified
+    posts = (simplify_post(post) if "profile_data" in post else post
+             for post in _iter_export_posts(args.source))
+
+    output = args.output
+    if not output:
+        base = args.source.rstrip("/\\")
+        if os.path.isdir(base):
+            base = os.path.join(base, os.path.basename(base) + "_export")
+        else:
+            base = base[:-len(".gz")] if base.endswith(".gz") else base
+            base = os.path.splitext(base)[0]
+        output = f"{base}.{args.format}"
+
+    if args.format == "csv":
+        return 0 if save_posts_to_csv(posts, output) else 1
+
+    count = 0
+    with open(output, "w", encoding="utf-8") as output_file:
+        for post in posts:
+            output_file.write(json.dumps(post, ensure_ascii=False) + "\n")
+            count += 1
+    print(f"Exported {count} posts to {output}")
+    return 0
+
+def _import_times(modules):
+    """
+    Import modules in a fresh interpreter under python -X importtime
+
+    Returns:
+        tuple: (cumulative microseconds per module, names of all modules imported)
+    """
+    import subprocess
+
+    code = "import " + ", ".join(modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True,
+                            text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    cumulative = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if not fields[0].strip().isdigit():
+            continue  # Header line
+        name = fields[2].strip()
+        imported.add(name)
+        if fields[2] == " " + name:  # Top-level import (not indented)
+            cumulative[name] = int(fields[1])
+    return cumulative, imported
+
+def startup_check(args):
+    """Check that offline commands import no heavy module and start within the budget"""
+    failed = False
+    for command, modules in COMMAND_MODULES.items():
+        cumulative, imported = _import_times(("run",) + modules)
+        total_ms = sum(cumulative.get(module, 0) for module in ("run",) + modules) / 1000
+        heavy = sorted(name for name in imported if name.split(".")[0] in HEAVY_MODULES)
+        slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:3]
+
+        status = "OK"
+        if heavy or total_ms > args.budget_ms:
+            status = "FAIL"
+            failed = True
+        print(f"{command:<8} {total_ms:>7.1f} ms  {status}  (slowest: "
+              + ", ".join(f"{name} {micros / 1000:.1f} ms" for name, micros in slowest) + ")")
+        if heavy:
+            print(f"         imports scraping modules: {', '.join(heavy)}")
+
+    if failed:
+        print(f"Startup check failed (budget {args.budget_ms:.0f} ms per command)")
+        return 1
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Instagram scraper")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("scrape", add_help=False,
+                        help="Scrape profiles (run 'scrape --help' for the options)")
+
+    crawl_parser = commands.add_parser("crawl", help="Crawl related profiles and hashtags from seeds")
+    crawl_parser.add_argument("seeds", nargs="+", help="Usernames and #hashtags to start from")
+    crawl_parser.add_argument("--budget", type=int, default=1000,
+                              help="Page loads the whole crawl may spend (default: 1000)")
+    crawl_parser.add_argument("-n", "--num-posts", type=int, default=12, help="Posts per target (default: 12)")
+    crawl_parser.add_argument("--max-depth", type=int, default=2, help="Hops from the seeds to follow (default: 2)")
+    crawl_parser.add_argument("--revisit-hours", type=float, default=24,
+                              help="Hours before a crawled target may be crawled again (default: 24)")
+    crawl_parser.add_argument("--state", default="data/crawl_frontier.json",
+                              help="Frontier file kept between crawls (default: data/crawl_frontier.json)")
+    crawl_parser.add_argument("--requests-per-hour", type=int, default=300,
+                              help="Page loads per hour allowed for the account (default: 300)")
+    crawl_parser.add_argument("--ttl-hours", type=float, default=None,
+                              help="Skip posts already scraped within this many hours")
+    crawl_parser.add_argument("--headless", action="store_true", help="Run Chrome in headless mode")
+    crawl_parser.add_argument("--capture-network", action="store_true",
+                              help="Parse post details from Instagram's API responses")
+    crawl_parser.add_argument("--fast", action="store_true", help="Block images, videos, fonts and trackers")
+
+    report_parser = commands.add_parser("report", help="Rebuild the reports of a search query folder")
+    report_parser.add_argument("folder", help="Search query folder, e.g. data/travel")
+    report_parser.add_argument("--html", action="store_true", help="Also write the HTML report")
+    report_parser.add_argument("-o", "--output", help="HTML report path (default: data/<query>/report_<time>.html)")
+    report_parser.add_argument("--page-size", type=int, default=500, help="Posts per HTML table page (default: 500)")
+    report_parser.add_argument("--sketch-capacity", type=int, default=None,
+                               help="Rank users and tags with bounded-memory sketches of this size")
+
+    export_parser = commands.add_parser("export", help="Export scraped posts to CSV or JSONL")
+    export_parser.add_argument("source", help="Session folder, data JSON file or posts JSONL file")
+    export_parser.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv",
+                               help="Output format (default: csv)")
+    export_parser.add_argument("-o", "--output", help="Output file (default: next to the source)")
+
+    check_parser = commands.add_parser("startup-check",
+                                       help="Measure import time of the offline commands with python -X importtime")
+    check_parser.add_argument("--budget-ms", type=float, default=150,
+                              help="Maximum import time per command in milliseconds (default: 150)")
+    return parser
+
+def main(argv=None):
+    args, extra = build_parser().parse_known_args(argv)
+    if args.command == "scrape":
+        return scrape(args, extra)
+    if extra:
+        print(f"Unrecognized arguments: {' '.join(extra)}")
+        return 2
+    handlers = {"crawl": crawl, "report": report, "export": export, "startup-check": startup_check}
+    return handlers[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,21 +6,125 @@ import time
 import json
 import random
 import os
+from api_capture import collect_json_payloads, drain_performance_log, find_media_item, \
+    media_item_to_post_data, shortcode_from_url
+from selector_lists import GRID_SELECTORS, POST_SELECTORS
+from selector_stats import get_registry
+from dom_extractor import run_extraction_bundle, normalize_bundle_result
+from count_parser import parse_count, add_numeric_counts
+from replay import get_recorder
+from profile_cache import get_profile_cache, username_from_url
+from comment_loader import load_comments
+from driver_pool import JobTimeout
+import tracing
 
-def scrape_instagram(driver, max_posts=15):
+# Collects every post link on the page in one round trip, deduplicated by
+# shortcode in document order, together with the current scroll height
+HARVEST_POST_LINKS_JS = """
+var seen = {};
+var links = [];
+var anchors = document.querySelectorAll('a[href*="/p/"]');
+for (var i = 0; i < anchors.length; i++) {
+    var match = anchors[i].href.match(/\\/p\\/([A-Za-z0-9_-]+)/);
+    if (match && !seen[match[1]]) {
+        seen[match[1]] = true;
+        links.push(match[1]);
+    }
+}
+return {height: document.body.scrollHeight, shortcodes: links};
+"""
+
+# Scrolls to the bottom and resolves as soon as the grid grows (new post links
+# or a taller document), or with false after the ceiling passed as arguments[0]
+SCROLL_AND_WAIT_JS = """
+var done = arguments[arguments.length - 1];
+var timeoutMs = arguments[0];
+var started = Date.now();
+function lastPostLink() {
+    var anchors = document.querySelectorAll('a[href*="/p/"]');
+    return anchors.length ? anchors[anchors.length - 1].href : null;
+}
+var startHeight = document.body.scrollHeight;
+var startLast = lastPostLink();
+var finished = false;
+function grown() {
+    return document.body.scrollHeight > startHeight || lastPostLink() !== startLast;
+}
+function finish(grew) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearInterval(poll);
+    clearTimeout(timer);
+    done({grew: grew, waited_ms: Date.now() - started});
+}
+var observer = new MutationObserver(function() { if (grown()) { finish(true); } });
+observer.observe(document.body, {childList: true, subtree: true});
+// scrollHeight polling catches growth that does not trigger a mutation
+var poll = setInterval(function() { if (grown()) { finish(true); } }, 100);
+var timer = setTimeout(function() { finish(false); }, timeoutMs);
+window.scrollTo(0, document.body.scrollHeight);
+"""
+
+def scroll_and_wait_for_growth(driver, max_wait=6):
+    """
+    Scroll to the bottom and wait until new posts arrive, up to max_wait seconds
+    
+    Args:
+        driver: Selenium WebDriver instance
+        max_wait: Ceiling in seconds before the scroll counts as a stall
+        
+    Returns:
+        bool: True if the grid grew before the ceiling
+    """
+    result = driver.execute_async_script(SCROLL_AND_WAIT_JS, int(max_wait * 1000)) or {}
+    return bool(result.get("grew"))
+
+def harvest_post_links(driver, seen_posts):
+    """
+    Add the post links currently in the page to an ordered set of posts
+    
+    Args:
+        driver: Selenium WebDriver instance
+        seen_posts: Dict used as an ordered set, mapping shortcode to post URL
+        
+    Returns:
+        int: Current document scroll height
+    """
+    result = driver.execute_script(HARVEST_POST_LINKS_JS) or {}
+    for shortcode in result.get("shortcodes", []):
+        if shortcode not in seen_posts:
+            seen_posts[shortcode] = f"https://www.instagram.com/p/{shortcode}/"
+    return result.get("height", 0)
+
+@tracing.traced("scroll_harvest")
+def scrape_instagram(driver, max_posts=15, fast_harvest=True, wait_strategy="event",
+                     max_stalls=5, max_wait=6, pacing=(0.3, 1.0), post_filter=None):
     """
     Scrape Instagram posts from search results (hashtag, profile, or general search)
     
     Args:
         driver: Selenium WebDriver instance
         max_posts: Maximum number of posts to scrape (limit for faster results)
+        fast_harvest: Collect post links with one script call per scroll instead
+            of XPath queries plus one get_attribute call per link
+        wait_strategy: "event" returns as soon as the grid grows after a scroll,
+            "sleep" waits a fixed random 1.5-3.5 seconds per scroll
+        max_stalls: Stop after this many scrolls in a row load nothing new
+        max_wait: Ceiling in seconds for one event-driven scroll wait
+        pacing: Optional (min, max) seconds of random jitter added after each
+            event-driven scroll, or None to scroll as fast as content arrives
+        post_filter: Optional function taking a post shortcode and returning
+            False for posts that should be skipped (e.g. scraped recently).
+            Only wanted posts count towards max_posts, and scrolling stops
+            once more than max_posts skipped posts have been seen
         
     Returns:
         list: List of Instagram post URLs
     """
     # Wait for posts to load
     print("Waiting for posts to load...")
-    time.sleep(random.uniform(2, 4))
+    tracing.sleep(random.uniform(2, 4))
 
     # Check if we're on a profile page, hashtag page, or search results
     current_url = driver.current_url
@@ -71,85 +175,142 @@ def scrape_instagram(driver, max_posts=15):
     
     # Scroll down to load more posts (lazy loading)
     print(f"Scrolling to load up to {max_posts} posts...")
+    harvest_started = time.time()
+    webdriver_calls = 0
+    seen_posts = {}  # Ordered set of shortcode -> URL, kept across scrolls
+    post_decisions = {}  # shortcode -> result of post_filter
     posts_count = 0
+    known_count = 0
     last_height = driver.execute_script("return document.body.scrollHeight")
+    webdriver_calls += 1
+    
+    if wait_strategy == "event":
+        driver.set_script_timeout(max(30, max_wait + 5))
+        webdriver_calls += 1
     
     # Try to load at least max_posts
     scroll_attempts = 0
-    max_scroll_attempts = 5  # Increased for better results with profiles
     
-    while posts_count < max_posts and scroll_attempts < max_scroll_attempts:
-        # Scroll down
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        
-        # Wait for new posts to load
-        time.sleep(random.uniform(1.5, 3.5))
-        
-        # Calculate new scroll height and compare with last scroll height
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        
-        # Get current post count using multiple selectors to ensure we find posts
-        posts = []
-        post_selectors = [
-            '//a[contains(@href, "/p/")]',
-            '//article//a[contains(@href, "/p/")]',
-            '//div[contains(@role, "presentation")]//a[contains(@href, "/p/")]',
-            '//article//div//a[contains(@href, "/p/")]'
-        ]
+    while posts_count < max_posts and scroll_attempts < max_stalls and known_count <= max_posts:
+        if wait_strategy == "event":
+            # Scroll and wait for the grid to grow in one round trip
+            grew = scroll_and_wait_for_growth(driver, max_wait=max_wait)
+            webdriver_calls += 1
+            if pacing:
+                tracing.sleep(random.uniform(*pacing))
+        else:
+            # Scroll down
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            webdriver_calls += 1
+            
+            # Wait for new posts to load
+            tracing.sleep(random.uniform(1.5, 3.5))
+            grew = None
         
-        for selector in post_selectors:
-            try:
-                found_posts = driver.find_elements(By.XPATH, selector)
-                if found_posts:
-                    posts = found_posts
-                    break
-            except:
-                continue
-                
-        posts_count = len(posts)
+        if fast_harvest:
+            # Links and scroll height in a single round trip; links that Instagram
+            # unloads from the virtualized grid stay in seen_posts
+            new_height = harvest_post_links(driver, seen_posts)
+            webdriver_calls += 1
+            posts_count = len(seen_posts)
+            
+            if post_filter:
+                for shortcode in seen_posts:
+                    if shortcode not in post_decisions:
+                        post_decisions[shortcode] = post_filter(shortcode)
+                posts_count = sum(post_decisions.values())
+                known_count = len(post_decisions) - posts_count
+        else:
+            # Calculate new scroll height and compare with last scroll height
+            new_height = driver.execute_script("return document.body.scrollHeight")
+            webdriver_calls += 1
+            
+            # Get current post count using multiple selectors to ensure we find posts
+            posts = []
+            post_selectors = get_registry().probe("post_links", GRID_SELECTORS["post_links"])
+            
+            for selector in post_selectors:
+                try:
+                    webdriver_calls += 1
+                    found_posts = driver.find_elements(By.XPATH, selector)
+                    if found_posts:
+                        post_selectors.hit()
+                        posts = found_posts
+                        break
+                except:
+                    continue
+                    
+            posts_count = len(posts)
         
         print(f"Found {posts_count} posts so far...")
         
         # Break if no more posts are loading
-        if new_height == last_height:
+        if grew is False or (grew is None and new_height == last_height):
             scroll_attempts += 1
         else:
             scroll_attempts = 0
             
         last_height = new_height
-      # Try different selectors to find posts based on page type
-    urls = []
-    
-    # Use a more reliable XPath to find post links (works for profiles, hashtags, and search)
-    selectors = [
-        '//a[contains(@href, "/p/")]',  # Standard post links
-        '//article//a[contains(@href, "/p/")]',  # Post links inside article elements
-        '//div[@role="presentation"]//a[contains(@href, "/p/")]'  # Another common pattern
-    ]
-    
-    # Try each selector until we find posts
-    for selector in selectors:
-        try:
-            posts = driver.find_elements(By.XPATH, selector)
-            if posts:
-                print(f"Found {len(posts)} posts using selector: {selector}")
-                break
-        except Exception as e:
-            print(f"Error with selector {selector}: {e}")
     
-    # Extract URLs from posts
-    for i, post in enumerate(posts[:max_posts]):
-        try:
-            href = post.get_attribute("href")
-            if href and "/p/" in href and href not in urls:
-                urls.append(href)
-                print(f"Found post URL #{len(urls)}: {href}")
-                
-                # If we have enough posts, stop
-                if len(urls) >= max_posts:
+    if fast_harvest:
+        urls = [url for shortcode, url in seen_posts.items()
+                if post_decisions.get(shortcode, True)][:max_posts]
+        for i, href in enumerate(urls):
+            print(f"Found post URL #{i+1}: {href}")
+    else:
+        # Try different selectors to find posts based on page type
+        urls = []
+        seen_urls = set()
+        
+        # Use a more reliable XPath to find post links (works for profiles, hashtags, and search)
+        selectors = get_registry().probe("post_links_final", GRID_SELECTORS["post_links_final"])
+        
+        # Try each selector until we find posts
+        posts = []
+        for selector in selectors:
+            try:
+                webdriver_calls += 1
+                posts = driver.find_elements(By.XPATH, selector)
+                if posts:
+                    selectors.hit()
+                    print(f"Found {len(posts)} posts using selector: {selector}")
                     break
-        except Exception as e:
-            print(f"Error extracting URL: {e}")
+            except Exception as e:
+                print(f"Error with selector {selector}: {e}")
+        
+        # Extract URLs from posts
+        for i, post in enumerate(posts[:max_posts]):
+            try:
+                webdriver_calls += 1
+                href = post.get_attribute("href")
+                if href and "/p/" in href and href not in seen_urls:
+                    seen_urls.add(href)
+                    shortcode = shortcode_from_url(href)
+                    if post_filter and shortcode not in post_decisions:
+                        post_decisions[shortcode] = post_filter(shortcode)
+                    if not post_decisions.get(shortcode, True):
+                        continue
+                    urls.append(href)
+                    print(f"Found post URL #{len(urls)}: {href}")
+                    
+                    # If we have enough posts, stop
+                    if len(urls) >= max_posts:
+                        break
+            except Exception as e:
+                print(f"Error extracting URL: {e}")
+    
+    harvest_stats = {
+        "mode": "fast" if fast_harvest else "xpath",
+        "wait_strategy": wait_strategy,
+        "seconds": round(time.time() - harvest_started, 2),
+        "webdriver_calls": webdriver_calls,
+        "posts": len(urls),
+        "skipped_known": sum(1 for wanted in post_decisions.values() if not wanted)
+    }
+    print(f"Collected {len(urls)} post URLs in {harvest_stats['seconds']}s "
+          f"using {webdriver_calls} WebDriver calls ({harvest_stats['mode']} harvesting)")
+    if harvest_stats["skipped_known"]:
+        print(f"Skipped {harvest_stats['skipped_known']} posts scraped in an earlier session")
     
     # Create data directory if it doesn't exist
     os.makedirs("data", exist_ok=True)
@@ -162,20 +323,198 @@ def scrape_instagram(driver, max_posts=15):
             "search_timestamp": timestamp,
             "search_url": driver.current_url,
             "post_count": len(urls),
+            "harvest_stats": harvest_stats,
             "post_urls": urls
         }
         json.dump(json_data, url_file, indent=4)
     
     print(f"Extracted {len(urls)} unique post URLs and saved to '{url_file_path}'")
+    
+    # Snapshot the grid for offline replay when recording
+    recorder = get_recorder()
+    if recorder:
+        recorder.record_grid(driver, urls)
     return urls
 
-def scrape_post_details(driver, url):
+def extract_hashtags_and_mentions(caption):
+    """
+    Extract unique hashtags and mentions from a caption, in order of appearance
+    
+    Args:
+        caption: Caption text
+        
+    Returns:
+        tuple: (hashtags, mentions) lists
+    """
+    hashtags = []
+    mentions = []
+    for word in caption.split():
+        if word.startswith('#'):
+            hashtag = word.strip('.,!?;:()')
+            if hashtag not in hashtags:
+                hashtags.append(hashtag)
+        elif word.startswith('@'):
+            mention = word.strip('.,!?;:()')
+            if mention not in mentions:
+                mentions.append(mention)
+    return hashtags, mentions
+
+def scrape_profile_data(driver, profile_url, profile_data, return_to=None):
+    """
+    Fill in bio, follower counts and verification from the profile cache,
+    visiting the profile page only when the author is not cached yet
+    
+    Args:
+        driver: Selenium WebDriver instance
+        profile_url: URL of the profile page to visit
+        profile_data: Profile dictionary to update in place
+        return_to: URL to navigate back to after a visit (optional)
+        
+    Returns:
+        dict: The updated profile_data
+    """
+    username = username_from_url(profile_url)
+    if not username:
+        return visit_profile_page(driver, profile_url, profile_data, return_to)
+    
+    profile_cache = get_profile_cache()
+    with profile_cache.lock_for(username):
+        if profile_cache.fill(username, profile_data):
+            print(f"Using cached profile data for {username}")
+            return profile_data
+        visit_profile_page(driver, profile_url, profile_data, return_to)
+        profile_cache.put(username, profile_data)
+    return profile_data
+
+@tracing.traced("profile_detour")
+def visit_profile_page(driver, profile_url, profile_data, return_to=None):
+    """
+    Visit a profile page and fill in bio, follower counts and verification
+    
+    Args:
+        driver: Selenium WebDriver instance
+        profile_url: URL of the profile page to visit
+        profile_data: Profile dictionary to update in place
+        return_to: URL to navigate back to afterwards (optional)
+        
+    Returns:
+        dict: The updated profile_data
+    """
+    try:
+        # Visit profile page
+        print(f"Visiting profile page: {profile_url}")
+        driver.get(profile_url)
+        tracing.sleep(random.uniform(2, 3))
+    
+        # Extract profile picture
+        try:
+            profile_pic_elements = driver.find_elements(By.XPATH, 
+                "//header//img[@alt and contains(@alt, 'profile picture')]")
+            if profile_pic_elements:
+                profile_pic_url = profile_pic_elements[0].get_attribute("src")
+                profile_data["profile_pic_url"] = profile_pic_url
+        except:
+            pass
+    
+        # Extract bio
+        try:
+            bio_elements = driver.find_elements(By.XPATH, 
+                "//div[contains(@class, 'biography')]//span | //div[@class='_aa_c']//span")
+            if bio_elements:
+                profile_data["bio"] = bio_elements[0].text.strip()
+        except:
+            pass
+    
+        # Extract follower/following counts
+        try:
+            stat_elements = driver.find_elements(By.XPATH, 
+                "//header//ul//li//span")
+            if len(stat_elements) >= 3:
+                # Parse posts count
+                profile_data["posts_count"] = stat_elements[0].text.strip()
+    
+                # Parse followers count with proper numeric handling
+                followers_text = stat_elements[1].text.strip()
+                profile_data["followers_count"] = followers_text
+    
+                # Add numeric version for analytics ("1.2M" -> 1200000)
+                profile_data["followers_numeric"] = parse_count(followers_text) or 0
+    
+                # Parse following count
+                profile_data["following_count"] = stat_elements[2].text.strip()
+        except:
+            pass
+    
+        # Extract website
+        try:
+            website_elements = driver.find_elements(By.XPATH, 
+                "//a[contains(@href, 'http') and not(contains(@href, 'instagram.com'))]")
+            if website_elements:
+                website_url = website_elements[0].get_attribute("href")
+                profile_data["website_url"] = website_url
+        except:
+            pass
+    
+        # Check if verified
+        try:
+            verified_elements = driver.find_elements(By.XPATH, 
+                "//span[contains(@aria-label, 'Verified') or contains(@class, 'verified')]")
+            profile_data["is_verified"] = len(verified_elements) > 0
+        except:
+            pass
+    
+        # Return to post page
+        if return_to:
+            driver.get(return_to)
+            tracing.sleep(random.uniform(1, 2))
+    
+    except JobTimeout:
+        raise
+    except Exception as profile_error:
+        print(f"Error fetching profile data: {profile_error}")
+        # Return to post page
+        if return_to:
+            driver.get(return_to)
+    
+    return profile_data
+
+def load_post_comments(driver, post_data, max_comments=10, comment_budget=10):
+    """
+    Collect a post's comments with the incremental loader into post_data
+    
+    Args:
+        driver: Selenium WebDriver instance on the post page
+        post_data: Post dictionary to update in place
+        max_comments: Maximum number of comments to collect
+        comment_budget: Seconds allowed for loading more comments
+    """
+    if max_comments <= 0:
+        return
+    comments, comment_stats = load_comments(driver, max_comments=max_comments, time_budget=comment_budget)
+    post_data["comment_stats"] = comment_stats
+    if comments:
+        post_data["comments"] = comments
+        print(f"Extracted {len(comments)} comments in {comment_stats['pages']} pages "
+              f"({comment_stats['stop_reason']})")
+
+@tracing.traced("post")
+def scrape_post_details(driver, url, use_bundle=True, max_comments=10, comment_budget=10, preloaded=False,
+                        before_extraction=None):
     """
     Scrape details from an individual Instagram post
     
     Args:
         driver: Selenium WebDriver instance
         url: URL of the Instagram post to scrape
+        use_bundle: Extract all fields with the in-page bundle (one script call)
+            instead of probing each selector from Python
+        max_comments: Maximum number of comments to collect (0 skips comments)
+        comment_budget: Seconds allowed for loading more comments, so posts
+            with thousands of comments take a predictable time
+        preloaded: The current tab already started loading url, so only wait
+            for it instead of navigating
+        before_extraction: Called once the post has loaded, before it is
+            extracted (used to start loading the next post in another tab)
         
     Returns:
         dict: Post details including caption, username, likes, comments, etc.
@@ -211,37 +550,108 @@ def scrape_post_details(driver, url):
         }
     }
 
+    # With network capture, the page's own API responses replace DOM probing
+    network_capture = getattr(driver, "network_capture", False)
+    if network_capture:
+        drain_performance_log(driver)  # Drop responses from earlier pages
+
     # Open the individual post page
-    print(f"Navigating to post: {url}")
+    print(f"{'Switching to preloaded' if preloaded else 'Navigating to'} post: {url}")
     try:
-        driver.get(url)
-        
-        # Wait for post to load
-        wait = WebDriverWait(driver, 10)
-        try:
-            wait.until(EC.presence_of_element_located((By.XPATH, "//time")))
-        except:
-            print("Warning: Timeout waiting for post elements - proceeding anyway")
+        with tracing.span("page_load"):
+            if not preloaded:
+                driver.get(url)
+            
+            # Wait for post to load
+            wait = WebDriverWait(driver, 10)
+            try:
+                wait.until(EC.presence_of_element_located((By.XPATH, "//time")))
+            except:
+                print("Warning: Timeout waiting for post elements - proceeding anyway")
             
         # Add a random delay to mimic human browsing behavior
-        time.sleep(random.uniform(1.5, 3))
+        tracing.sleep(random.uniform(1.5, 3))
+    except JobTimeout:
+        raise  # The job timed out; stop instead of moving on to the next post
     except Exception as e:
         print(f"Error loading post URL: {e}")
-        return post_data  # Return basic data structure with URL if page fails to load    # Extract username and profile data - Updated selector patterns for 2023-2024 Instagram
+        # Return basic data structure with URL if page fails to load; the
+        # error keeps it out of the post index so a later run retries it
+        post_data["error"] = f"Page failed to load: {e}"
+        return post_data
+    
+    if before_extraction:
+        before_extraction()
+    
+    # Snapshot the page for offline replay when recording
+    recorder = get_recorder()
+    snapshot = recorder.begin(driver, url) if recorder else None
+    
+    extraction_started = time.time()
+    if network_capture:
+        shortcode = shortcode_from_url(url)
+        media_item = None
+        for payload in collect_json_payloads(driver, raw_responses=snapshot["responses"] if snapshot else None):
+            media_item = find_media_item(payload, shortcode)
+            if media_item:
+                break
+        
+        if media_item:
+            media_item_to_post_data(media_item, post_data, extract_hashtags_and_mentions,
+                                    max_comments=max_comments)
+            # The media response embeds a few preview comments at most, so
+            # page through the rest the same way the DOM paths do
+            if len(post_data.get("comments", [])) < max_comments:
+                load_post_comments(driver, post_data, max_comments, comment_budget)
+            post_data["extraction_method"] = "api"
+            post_data["extraction_ms"] = int((time.time() - extraction_started) * 1000)
+            add_numeric_counts(post_data)
+            if snapshot:
+                recorder.save_post(snapshot, post_data)
+            print(f"Extracted post {shortcode} from captured API response in {post_data['extraction_ms']} ms")
+            
+            # Follower counts are not part of the media response
+            if post_data.get("profile_url") and post_data["profile_data"]["followers_count"] == "Not available":
+                scrape_profile_data(driver, post_data["profile_url"], post_data["profile_data"])
+            return post_data
+        
+        print("No API response found for this post, falling back to DOM probing")
+    
+    if use_bundle:
+        extraction_started = time.time()
+        # Comments are paged by load_post_comments below, so the bundle skips them
+        bundle_result = run_extraction_bundle(driver, max_comments=0, expand_comments=False)
+        if bundle_result:
+            normalize_bundle_result(bundle_result, post_data, extract_hashtags_and_mentions)
+            load_post_comments(driver, post_data, max_comments, comment_budget)
+            post_data["extraction_method"] = "bundle"
+            post_data["extraction_ms"] = int((time.time() - extraction_started) * 1000)
+            add_numeric_counts(post_data)
+            if snapshot:
+                recorder.save_post(snapshot, post_data)
+            print(f"Extracted post with bundle v{bundle_result['version']} in {post_data['extraction_ms']} ms")
+            
+            # Everything is extracted, so no need to come back from the profile page
+            if post_data.get("profile_url"):
+                scrape_profile_data(driver, post_data["profile_url"], post_data["profile_data"])
+            return post_data
+        print("Falling back to selector-by-selector DOM probing")
+    
+    post_data["extraction_method"] = "dom"
+    extraction_started = time.time()
+    profile_seconds = 0
+    
+    # Extract username and profile data - Updated selector patterns for 2023-2024 Instagram
     try:
         # Try multiple selector patterns
-        username_selectors = [
-            "//a[@role='link' and contains(@href, '/')]", 
-            "//header//a[@role='link']",
-            "//div[@role='presentation']//a[@role='link']",
-            "//article//header//a"
-        ]
+        username_selectors = get_registry().probe("username", POST_SELECTORS["username"])
         
         for selector in username_selectors:
             try:
                 username_element = driver.find_element(By.XPATH, selector)
                 username = username_element.text.strip()
                 if username and not username.startswith("Like") and len(username) > 0:
+                    username_selectors.hit()
                     post_data["username"] = username
                     post_data["profile_data"]["username"] = username
                     print(f"Found username: {username}")
@@ -252,129 +662,32 @@ def scrape_post_details(driver, url):
                         post_data["profile_url"] = profile_url
                         
                         # Try to get more profile data by visiting profile page
-                        try:
-                            # Save current URL to return afterward
-                            current_url = driver.current_url
-                            
-                            # Visit profile page
-                            print(f"Visiting profile page: {profile_url}")
-                            driver.get(profile_url)
-                            time.sleep(random.uniform(2, 3))
-                            
-                            # Extract profile picture
-                            try:
-                                profile_pic_elements = driver.find_elements(By.XPATH, 
-                                    "//header//img[@alt and contains(@alt, 'profile picture')]")
-                                if profile_pic_elements:
-                                    profile_pic_url = profile_pic_elements[0].get_attribute("src")
-                                    post_data["profile_data"]["profile_pic_url"] = profile_pic_url
-                            except:
-                                pass
-                            
-                            # Extract bio
-                            try:
-                                bio_elements = driver.find_elements(By.XPATH, 
-                                    "//div[contains(@class, 'biography')]//span | //div[@class='_aa_c']//span")
-                                if bio_elements:
-                                    post_data["profile_data"]["bio"] = bio_elements[0].text.strip()
-                            except:
-                                pass
-                                  # Extract follower/following counts
-                            try:
-                                stat_elements = driver.find_elements(By.XPATH, 
-                                    "//header//ul//li//span")
-                                if len(stat_elements) >= 3:
-                                    # Parse posts count
-                                    post_data["profile_data"]["posts_count"] = stat_elements[0].text.strip()
-                                    
-                                    # Parse followers count with proper numeric handling
-                                    followers_text = stat_elements[1].text.strip()
-                                    post_data["profile_data"]["followers_count"] = followers_text
-                                    
-                                    # Add numeric version for analytics
-                                    try:
-                                        # Parse values like "1.2M" or "4.5K" to proper numbers
-                                        followers_numeric = followers_text.replace(',', '')
-                                        if 'K' in followers_numeric or 'k' in followers_numeric:
-                                            followers_numeric = float(followers_numeric.replace('K', '').replace('k', '')) * 1000
-                                        elif 'M' in followers_numeric or 'm' in followers_numeric:
-                                            followers_numeric = float(followers_numeric.replace('M', '').replace('m', '')) * 1000000
-                                        elif 'B' in followers_numeric or 'b' in followers_numeric:
-                                            followers_numeric = float(followers_numeric.replace('B', '').replace('b', '')) * 1000000000
-                                        else:
-                                            followers_numeric = float(''.join(c for c in followers_numeric if c.isdigit() or c == '.'))
-                                        
-                                        post_data["profile_data"]["followers_numeric"] = int(followers_numeric)
-                                    except:
-                                        post_data["profile_data"]["followers_numeric"] = 0
-                                    
-                                    # Parse following count
-                                    post_data["profile_data"]["following_count"] = stat_elements[2].text.strip()
-                            except:
-                                pass
-                                
-                            # Extract website
-                            try:
-                                website_elements = driver.find_elements(By.XPATH, 
-                                    "//a[contains(@href, 'http') and not(contains(@href, 'instagram.com'))]")
-                                if website_elements:
-                                    website_url = website_elements[0].get_attribute("href")
-                                    post_data["profile_data"]["website_url"] = website_url
-                            except:
-                                pass
-                                
-                            # Check if verified
-                            try:
-                                verified_elements = driver.find_elements(By.XPATH, 
-                                    "//span[contains(@aria-label, 'Verified') or contains(@class, 'verified')]")
-                                post_data["profile_data"]["is_verified"] = len(verified_elements) > 0
-                            except:
-                                pass
-                                
-                            # Return to post page
-                            driver.get(current_url)
-                            time.sleep(random.uniform(1, 2))
-                            
-                        except Exception as profile_error:
-                            print(f"Error fetching profile data: {profile_error}")
-                            # Return to post page
-                            driver.get(current_url)
+                        profile_started = time.time()
+                        scrape_profile_data(driver, profile_url, post_data["profile_data"],
+                                            return_to=driver.current_url)
+                        profile_seconds += time.time() - profile_started
                             
                     break
             except NoSuchElementException:
                 continue
+    except JobTimeout:
+        raise
     except Exception as e:
         print(f"Error getting username: {e}")# Extract caption
     try:
         # Try multiple caption selector patterns
-        caption_selectors = [
-            "//div[contains(@class, 'caption')]/span", 
-            "//div[@role='button']/span",
-            "//div[contains(@class, '_a9zs')]", 
-            "//h1[@role='link']/following-sibling::span",
-            "//article//span[contains(text(), ' ')]"  # Any span with text in article
-        ]
+        caption_selectors = get_registry().probe("caption", POST_SELECTORS["caption"])
         
         for selector in caption_selectors:
             try:
                 caption_element = driver.find_element(By.XPATH, selector)
                 caption = caption_element.text.strip()
                 if caption and len(caption) > 5:  # Ensure it's not just a short text
+                    caption_selectors.hit()
                     post_data["caption"] = caption
                     print(f"Found caption: {caption[:50]}...")
-                                  # Extract hashtags and mentions from caption
-                    hashtags = []
-                    mentions = []
-                    words = caption.split()
-                    for word in words:
-                        if word.startswith('#'):
-                            hashtag = word.strip('.,!?;:()')
-                            if hashtag not in hashtags:
-                                hashtags.append(hashtag)
-                        elif word.startswith('@'):
-                            mention = word.strip('.,!?;:()')
-                            if mention not in mentions:
-                                mentions.append(mention)
+                    # Extract hashtags and mentions from caption
+                    hashtags, mentions = extract_hashtags_and_mentions(caption)
                     
                     if hashtags:
                         post_data["hashtags"] = hashtags
@@ -385,18 +698,14 @@ def scrape_post_details(driver, url):
                         print(f"Found {len(mentions)} mentions")
                     
                     # Try to find post shares count
-                    shares_selectors = [
-                        "//span[contains(text(), 'shares')]/parent::div", 
-                        "//span[contains(text(), 'shares')]",
-                        "//a[contains(text(), 'shares')]/span",
-                        "//div[@role='button' and contains(@aria-label, 'shares')]"
-                    ]
+                    shares_selectors = get_registry().probe("shares", POST_SELECTORS["shares"])
                     
                     for selector in shares_selectors:
                         try:
                             shares_element = driver.find_element(By.XPATH, selector)
                             shares_text = shares_element.text.strip()
                             if shares_text and any(c.isdigit() for c in shares_text):
+                                shares_selectors.hit()
                                 post_data["shares_count"] = shares_text
                                 print(f"Found shares count: {shares_text}")
                                 break
@@ -409,16 +718,14 @@ def scrape_post_details(driver, url):
         print(f"Error getting caption: {e}")
       # Try to extract post date
     try:
-        date_selectors = [
-            "//time",
-            "//time[@datetime]"
-        ]
+        date_selectors = get_registry().probe("date", POST_SELECTORS["date"])
         
         for selector in date_selectors:
             try:
                 time_element = driver.find_element(By.XPATH, selector)
                 datetime_attr = time_element.get_attribute("datetime")
                 if datetime_attr:
+                    date_selectors.hit()
                     post_data["post_date"] = datetime_attr
                     print(f"Found post date: {datetime_attr}")
                     break
@@ -426,6 +733,7 @@ def scrape_post_details(driver, url):
                     # If no datetime attribute, try the displayed text
                     time_text = time_element.text
                     if time_text:
+                        date_selectors.hit()
                         post_data["post_date"] = time_text
                         print(f"Found post date text: {time_text}")
                         break
@@ -437,20 +745,16 @@ def scrape_post_details(driver, url):
     # Try to extract tagged users
     try:
         # First, check if there's a "tagged people" button/link and click it
-        tagged_people_selectors = [
-            "//span[contains(text(), 'tagged')]/parent::div", 
-            "//span[contains(text(), 'tagged')]",
-            "//button[contains(text(), 'tagged')]",
-            "//a[contains(@href, 'tagged')]"
-        ]
+        tagged_people_selectors = get_registry().probe("tagged_button", POST_SELECTORS["tagged_button"])
         
         tagged_found = False
         for selector in tagged_people_selectors:
             try:
                 tagged_button = driver.find_element(By.XPATH, selector)
                 if tagged_button:
+                    tagged_people_selectors.hit()
                     tagged_button.click()
-                    time.sleep(1)  # Wait for tagged dialog
+                    tracing.sleep(1)  # Wait for tagged dialog
                     tagged_found = True
                     print("Clicked on tagged users button")
                     break
@@ -458,11 +762,7 @@ def scrape_post_details(driver, url):
                 continue
                 
         # Now try extracting tagged users (with or without clicking the button)
-        tagged_user_selectors = [
-            "//div[@role='dialog']//a[@role='link' and contains(@href, '/')]",
-            "//div[contains(@aria-label, 'tagged')]//a[@role='link']",
-            "//button[contains(text(), 'tagged')]/following::a"
-        ]
+        tagged_user_selectors = get_registry().probe("tagged_users", POST_SELECTORS["tagged_users"])
         
         for selector in tagged_user_selectors:
             try:
@@ -479,6 +779,7 @@ def scrape_post_details(driver, url):
                             tagged_users.append(username)
                 
                 if tagged_users:
+                    tagged_user_selectors.hit()
                     post_data["tagged_users"] = tagged_users
                     print(f"Found {len(tagged_users)} tagged users")
                     break
@@ -491,7 +792,7 @@ def scrape_post_details(driver, url):
                 close_buttons = driver.find_elements(By.XPATH, "//button[contains(@aria-label, 'Close')]")
                 if close_buttons:
                     close_buttons[0].click()
-                    time.sleep(0.5)
+                    tracing.sleep(0.5)
             except:
                 pass
     except Exception as e:
@@ -499,17 +800,14 @@ def scrape_post_details(driver, url):
         
     # Try to extract location
     try:
-        location_selectors = [
-            "//a[contains(@href, '/explore/locations/')]",
-            "//div[contains(@class, 'location')]//a",
-            "//header//div[@role='button']"
-        ]
+        location_selectors = get_registry().probe("location", POST_SELECTORS["location"])
         
         for selector in location_selectors:
             try:
                 location_element = driver.find_element(By.XPATH, selector)
                 location_text = location_element.text.strip()
                 if location_text and len(location_text) > 0 and location_text != post_data["username"]:
+                    location_selectors.hit()
                     post_data["location"] = location_text
                     print(f"Found location: {location_text}")
                     
@@ -525,25 +823,13 @@ def scrape_post_details(driver, url):
         # Try to extract media URLs and determine post type
     try:
         # Check for video elements
-        video_selectors = [
-            "//video",
-            "//video[@src]",
-            "//div[@role='button']//video"
-        ]
+        video_selectors = POST_SELECTORS["video"]
         
         # Check for carousel indicators
-        carousel_selectors = [
-            "//div[@role='tablist']", 
-            "//div[contains(@class, 'carousel')]",
-            "//button[contains(@aria-label, 'Next')]"
-        ]
+        carousel_selectors = get_registry().probe("carousel", POST_SELECTORS["carousel"])
         
         # Check for images
-        img_selectors = [
-            "//article//img[@sizes]",
-            "//div[@role='button']//img",
-            "//div[@role='dialog']//img"
-        ]
+        img_selectors = POST_SELECTORS["image"]
         
         # First check if it's a video
         is_video = False
@@ -572,6 +858,7 @@ def scrape_post_details(driver, url):
             try:
                 carousel_elements = driver.find_elements(By.XPATH, selector)
                 if carousel_elements:
+                    carousel_selectors.hit()
                     post_data["post_type"] = "Carousel"
                     is_carousel = True
                     print(f"Detected carousel post")
@@ -604,26 +891,21 @@ def scrape_post_details(driver, url):
               # Try to get engagement metrics and comments
     try:
         # Latest Instagram selectors for like counts
-        like_selectors = [
-            "//section//span[@class]/span",
-            "//section//div[@role='button']/span",
-            "//*[contains(text(), 'likes')]/span",
-            "//span[contains(text(), 'likes')]",
-            "//div[@role='button' and contains(@aria-label, 'like')]",
-            "//article//section//div[@role='button']"
-        ]
+        like_selectors = get_registry().probe("likes", POST_SELECTORS["likes"])
         
         for selector in like_selectors:
             try:
                 likes_element = driver.find_element(By.XPATH, selector)
                 likes_text = likes_element.text.strip()
                 if likes_text and any(c.isdigit() for c in likes_text):
+                    like_selectors.hit()
                     post_data["likes_count"] = likes_text
                     print(f"Found likes count: {likes_text}")
                     break
                 # Try checking aria-label attribute for likes
                 likes_aria = likes_element.get_attribute("aria-label")
                 if likes_aria and 'like' in likes_aria.lower() and any(c.isdigit() for c in likes_aria):
+                    like_selectors.hit()
                     post_data["likes_count"] = likes_aria
                     print(f"Found likes from aria-label: {likes_aria}")
                     break
@@ -631,117 +913,43 @@ def scrape_post_details(driver, url):
                 continue
                 
         # Try to get comments count
-        comment_selectors = [
-            "//span[contains(text(), 'comment')]/parent::div",
-            "//span[contains(text(), 'comment')]",
-            "//a[contains(text(), 'comment')]/span",
-            "//div[@role='button' and contains(@aria-label, 'comment')]",
-            "//a[@role='link' and contains(@href, '/comments/')]"
-        ]
+        comment_selectors = get_registry().probe("comments_count", POST_SELECTORS["comments_count"])
         
         for selector in comment_selectors:
             try:
                 comments_element = driver.find_element(By.XPATH, selector)
                 comments_text = comments_element.text.strip()
                 if comments_text and any(c.isdigit() for c in comments_text):
+                    comment_selectors.hit()
                     post_data["comments_count"] = comments_text
                     print(f"Found comments count: {comments_text}")
                     break
                 # Try checking aria-label attribute for comments
                 comments_aria = comments_element.get_attribute("aria-label")
                 if comments_aria and 'comment' in comments_aria.lower() and any(c.isdigit() for c in comments_aria):
+                    comment_selectors.hit()
                     post_data["comments_count"] = comments_aria
                     print(f"Found comments from aria-label: {comments_aria}")
                     break
             except NoSuchElementException:
                 continue
                 
-        # Try to extract actual comments
+        # Page through comments until the target count or time budget
         try:
-            # Click "View all comments" if available
-            view_comments_selectors = [
-                "//a[contains(text(), 'View all')]",
-                "//a[contains(text(), 'comments')]",
-                "//span[contains(text(), 'View all')]"
-            ]
-            
-            for selector in view_comments_selectors:
-                try:
-                    view_comments = driver.find_elements(By.XPATH, selector)
-                    if view_comments:
-                        view_comments[0].click()
-                        print("Clicked 'View all comments'")
-                        time.sleep(2)
-                        break
-                except:
-                    continue
-            
-            # Extract comments
-            comment_container_selectors = [
-                "//ul[@class]/ul/li",
-                "//div[@role='dialog']//ul/li",
-                "//div[contains(@aria-label, 'comments')]//ul/li"
-            ]
-            
-            for container_selector in comment_container_selectors:
-                comment_elements = driver.find_elements(By.XPATH, container_selector)
-                if comment_elements:
-                    # Extract up to 10 most recent comments
-                    max_comments = min(10, len(comment_elements))
-                    comments_data = []
-                    
-                    for i, comment_el in enumerate(comment_elements[:max_comments]):
-                        try:
-                            comment_text = comment_el.text.strip()
-                            if comment_text and len(comment_text) > 0:
-                                # Split username and comment text
-                                parts = comment_text.split("\n")
-                                if len(parts) >= 2:
-                                    username = parts[0]
-                                    comment = parts[1]
-                                    
-                                    # Check for verification badge
-                                    is_verified = False
-                                    try:
-                                        verified_spans = comment_el.find_elements(By.XPATH, ".//span[contains(@aria-label, 'Verified')]")
-                                        is_verified = len(verified_spans) > 0
-                                    except:
-                                        pass
-                                    
-                                    # Check for like count on comment
-                                    like_count = "0"
-                                    try:
-                                        like_spans = comment_el.find_elements(By.XPATH, ".//div[@role='button']/span")
-                                        if like_spans:
-                                            like_text = like_spans[0].text.strip()
-                                            if like_text and like_text.isdigit():
-                                                like_count = like_text
-                                    except:
-                                        pass
-                                    
-                                    comment_data = {
-                                        "username": username,
-                                        "text": comment,
-                                        "is_verified": is_verified,
-                                        "likes": like_count
-                                    }
-                                    
-                                    comments_data.append(comment_data)
-                        except Exception as ce:
-                            print(f"Error extracting comment: {ce}")
-                    
-                    # Add comments to post data
-                    if comments_data:
-                        post_data["comments"] = comments_data
-                        print(f"Extracted {len(comments_data)} comments")
-                    break
+            load_post_comments(driver, post_data, max_comments, comment_budget)
         except Exception as comment_err:
             print(f"Error extracting comments: {comment_err}")
     except Exception as e:
         print(f"Error getting engagement metrics: {e}")
 
+    # Extraction latency, excluding the profile page detour
+    post_data["extraction_ms"] = int((time.time() - extraction_started - profile_seconds) * 1000)
+    add_numeric_counts(post_data)
+    if snapshot:
+        recorder.save_post(snapshot, post_data)
+    
     # Print summary of what we found
-    print(f"Extracted data for post {url}:")
+    print(f"Extracted data for post {url} in {post_data['extraction_ms']} ms:")
     print(f"- Username: {post_data['username']}")
     print(f"- Caption: {post_data['caption'][:50]}..." if len(post_data['caption']) > 50 else f"- Caption: {post_data['caption']}")
     print(f"- Hashtags: {len(post_data['hashtags'])} found")
@@ -0,0 +1,106 @@
+# XPath selector lists used to find post links on profile, hashtag and search
+# result grids (scrape_instagram)
+GRID_SELECTORS = {
+    "post_links": [
+        '//a[contains(@href, "/p/")]',
+        '//article//a[contains(@href, "/p/")]',
+        '//div[contains(@role, "presentation")]//a[contains(@href, "/p/")]',
+        '//article//div//a[contains(@href, "/p/")]'
+    ],
+    "post_links_final": [
+        '//a[contains(@href, "/p/")]',  # Standard post links
+        '//article//a[contains(@href, "/p/")]',  # Post links inside article elements
+        '//div[@role="presentation"]//a[contains(@href, "/p/")]'  # Another common pattern
+    ]
+}
+
+# XPath selector lists used to extract data from an Instagram post page.
+# Each list is tried in order and the first selector that yields usable data
+# wins. They are shared by the DOM probing in scraper.py and the in-page
+# extraction bundle (extract_post.js), so keep both in mind when editing.
+POST_SELECTORS = {
+    "username": [
+        "//a[@role='link' and contains(@href, '/')]",
+        "//header//a[@role='link']",
+        "//div[@role='presentation']//a[@role='link']",
+        "//article//header//a"
+    ],
+    "caption": [
+        "//div[contains(@class, 'caption')]/span",
+        "//div[@role='button']/span",
+        "//div[contains(@class, '_a9zs')]",
+        "//h1[@role='link']/following-sibling::span",
+        "//article//span[contains(text(), ' ')]"  # Any span with text in article
+    ],
+    "shares": [
+        "//span[contains(text(), 'shares')]/parent::div",
+        "//span[contains(text(), 'shares')]",
+        "//a[contains(text(), 'shares')]/span",
+        "//div[@role='button' and contains(@aria-label, 'shares')]"
+    ],
+    "date": [
+        "//time",
+        "//time[@datetime]"
+    ],
+    "tagged_button": [
+        "//span[contains(text(), 'tagged')]/parent::div",
+        "//span[contains(text(), 'tagged')]",
+        "//button[contains(text(), 'tagged')]",
+        "//a[contains(@href, 'tagged')]"
+    ],
+    "tagged_users": [
+        "//div[@role='dialog']//a[@role='link' and contains(@href, '/')]",
+        "//div[contains(@aria-label, 'tagged')]//a[@role='link']",
+        "//button[contains(text(), 'tagged')]/following::a"
+    ],
+    "location": [
+        "//a[contains(@href, '/explore/locations/')]",
+        "//div[contains(@class, 'location')]//a",
+        "//header//div[@role='button']"
+    ],
+    "video": [
+        "//video",
+        "//video[@src]",
+        "//div[@role='button']//video"
+    ],
+    "carousel": [
+        "//div[@role='tablist']",
+        "//div[contains(@class, 'carousel')]",
+        "//button[contains(@aria-label, 'Next')]"
+    ],
+    "image": [
+        "//article//img[@sizes]",
+        "//div[@role='button']//img",
+        "//div[@role='dialog']//img"
+    ],
+    "likes": [
+        "//section//span[@class]/span",
+        "//section//div[@role='button']/span",
+        "//*[contains(text(), 'likes')]/span",
+        "//span[contains(text(), 'likes')]",
+        "//div[@role='button' and contains(@aria-label, 'like')]",
+        "//article//section//div[@role='button']"
+    ],
+    "comments_count": [
+        "//span[contains(text(), 'comment')]/parent::div",
+        "//span[contains(text(), 'comment')]",
+        "//a[contains(text(), 'comment')]/span",
+        "//div[@role='button' and contains(@aria-label, 'comment')]",
+        "//a[@role='link' and contains(@href, '/comments/')]"
+    ],
+    "view_comments": [
+        "//a[contains(text(), 'View all')]",
+        "//a[contains(text(), 'comments')]",
+        "//span[contains(text(), 'View all')]"
+    ],
+    "load_more_comments": [
+        "//*[name()='svg' and @aria-label='Load more comments']/ancestor::*[@role='button'][1]",
+        "//button[contains(., 'Load more comments')]",
+        "//span[contains(text(), 'View more comments')]"
+    ],
+    "comment_container": [
+        "//ul[@class]/ul/li",
+        "//div[@role='dialog']//ul/li",
+        "//div[contains(@aria-label, 'comments')]//ul/li"
+    ]
+}
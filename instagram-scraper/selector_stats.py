@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import threading
+
+DEFAULT_STATS_PATH = "data/selector_stats.json"
+
+class SelectorRegistry:
+    """
+    Track hit/miss counts and latency per selector and order lists by them.
+
+    Every selector list is tried in order until one matches, so a stale
+    fallback placed early costs a wasted query on every post. The registry
+    remembers which selectors actually match, tries the historical winner
+    first and pushes selectors that keep missing to the end of the list.
+    Statistics are saved to disk so the ordering carries over between runs.
+    """
+
+    def __init__(self, path=DEFAULT_STATS_PATH, dead_after=10):
+        """
+        Initialize the registry, loading saved statistics if present
+
+        Args:
+            path: JSON file used to persist statistics
+            dead_after: Consecutive misses after which a selector is demoted
+        """
+        self.path = path
+        self.dead_after = dead_after
+        self.stats = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load statistics saved by a previous run"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as stats_file:
+                self.stats = json.load(stats_file).get("selectors", {})
+        except Exception as e:
+            print(f"Could not load selector statistics: {e}")
+
+    def save(self):
+        """Persist statistics for the next run"""
+        with self._lock:
+            data = {"updated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "selectors": self.stats}
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as stats_file:
+                    json.dump(data, stats_file, indent=4)
+            except Exception as e:
+                print(f"Could not save selector statistics: {e}")
+
+    def _entry(self, key, selector):
+        """Statistics for one selector (caller holds the lock)"""
+        selectors = self.stats.setdefault(key, {})
+        return selectors.setdefault(selector, {"hits": 0, "misses": 0, "streak_misses": 0,
+                                               "hit_ms": 0.0, "miss_ms": 0.0})
+
+    def record(self, key, selector, hit, seconds=0.0):
+        """
+        Record the outcome of trying one selector
+
+        Args:
+            key: Name of the selector list (e.g. "likes")
+            selector: The selector that was tried
+            hit (bool): Whether it produced usable data
+            seconds: Time spent on the attempt
+        """
+        with self._lock:
+            entry = self._entry(key, selector)
+            if hit:
+                entry["hits"] += 1
+                entry["streak_misses"] = 0
+                entry["hit_ms"] += seconds * 1000
+            else:
+                entry["misses"] += 1
+                entry["streak_misses"] += 1
+                entry["miss_ms"] += seconds * 1000
+
+    def is_dead(self, key, selector):
+        """A selector is dead once it misses dead_after times in a row"""
+        entry = self.stats.get(key, {}).get(selector)
+        return bool(entry) and entry["streak_misses"] >= self.dead_after
+
+    def ordered(self, key, selectors):
+        """
+        Order a selector list so historical winners are tried first
+
+        Args:
+            key: Name of the selector list
+            selectors: Selectors in their default priority order
+
+        Returns:
+            list: The same selectors, best first and dead ones last
+        """
+        with self._lock:
+            known = dict(self.stats.get(key, {}))
+
+        def rank(item):
+            index, selector = item
+            entry = known.get(selector)
+            if not entry:
+                # Untried selectors keep their default position among equals
+                return (False, -0.5, 0, index)
+            attempts = entry["hits"] + entry["misses"]
+            hit_rate = (entry["hits"] + 1) / (attempts + 2)
+            avg_ms = (entry["hit_ms"] + entry["miss_ms"]) / attempts if attempts else 0
+            dead = entry["streak_misses"] >= self.dead_after
+            return (dead, -round(hit_rate, 2), round(avg_ms), index)
+
+        return [selector for index, selector in sorted(enumerate(selectors), key=rank)]
+
+    def probe(self, key, selectors):
+        """
+        Iterate a selector list in adaptive order while timing each attempt
+
+        Call hit() on the returned probe when the current selector matches;
+        selectors left without a hit are recorded as misses.
+        """
+        return SelectorProbe(self, key, self.ordered(key, selectors))
+
+    def record_bundle(self, probes):
+        """
+        Record per-selector outcomes reported by the in-page extraction bundle
+
+        Args:
+            probes: List of {"key", "selector", "hit", "ms"} dictionaries
+        """
+        for probe in probes or []:
+            self.record(probe["key"], probe["selector"], probe["hit"], probe.get("ms", 0) / 1000)
+
+    def report(self, limit=10):
+        """
+        Selectors ranked by the time they waste on misses
+
+        Args:
+            limit: Maximum number of rows to return
+
+        Returns:
+            list: One dictionary per selector, worst first
+        """
+        rows = []
+        with self._lock:
+            for key, selectors in self.stats.items():
+                for selector, entry in selectors.items():
+                    attempts = entry["hits"] + entry["misses"]
+                    rows.append({
+                        "list": key,
+                        "selector": selector,
+                        "hits": entry["hits"],
+                        "misses": entry["misses"],
+                        "hit_rate": round(entry["hits"] / attempts, 2) if attempts else 0,
+                        "wasted_ms": round(entry["miss_ms"]),
+                        "dead": entry["streak_misses"] >= self.dead_after
+                    })
+        rows.sort(key=lambda row: row["wasted_ms"], reverse=True)
+        return rows[:limit]
+
+    def print_report(self, limit=10):
+        """Print the selectors burning the most time"""
+        rows = self.report(limit)
+        if not rows:
+            return
+        print("\nSelectors wasting the most time:")
+        for row in rows:
+            status = " (demoted)" if row["dead"] else ""
+            print(f"- [{row['list']}] {row['wasted_ms']} ms wasted, "
+                  f"{row['hits']}/{row['hits'] + row['misses']} hits{status}: {row['selector']}")
+
+class SelectorProbe:
+    """Iterator over an ordered selector list that records hits and misses"""
+
+    def __init__(self, registry, key, selectors):
+        self.registry = registry
+        self.key = key
+        self.selectors = selectors
+        self._current = None
+        self._started = 0
+        self._hit = False
+
+    def __iter__(self):
+        for selector in self.selectors:
+            self._current = selector
+            self._hit = False
+            self._started = time.perf_counter()
+            yield selector
+            if not self._hit:
+                self.registry.record(self.key, selector, False, time.perf_counter() - self._started)
+
+    def hit(self):
+        """Mark the current selector as the one that matched"""
+        if self._current is not None and not self._hit:
+            self._hit = True
+            self.registry.record(self.key, self._current, True, time.perf_counter() - self._started)
+
+_registry = None
+
+def get_registry():
+    """Shared registry for the whole run, loaded on first use"""
+    global _registry
+    if _registry is None:
+        _registry = SelectorRegistry()
+    return _registry
+
+if __name__ == "__main__":
+    get_registry().print_report(limit=50)
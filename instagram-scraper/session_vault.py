@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import base64
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    cryptography_available = True
+except ImportError:
+    cryptography_available = False
+
+VAULT_VERSION = 1
+DEFAULT_VAULT_PATH = os.getenv("INSTAGRAM_SESSION_VAULT", ".session/instagram_session.vault")
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # Re-login at least once a week
+KDF_ITERATIONS = 390000
+
+def _vault_passphrase():
+    """Passphrase used to encrypt the vault (falls back to the account password)"""
+    return os.getenv("INSTAGRAM_VAULT_KEY") or os.getenv("INSTAGRAM_PASSWORD")
+
+def _fernet(salt):
+    """Build a Fernet cipher from the vault passphrase and salt"""
+    passphrase = _vault_passphrase()
+    if not passphrase:
+        raise ValueError("No INSTAGRAM_VAULT_KEY or INSTAGRAM_PASSWORD set to encrypt the session vault")
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(passphrase.encode("utf-8"))))
+
+def save_session(driver, username, path=DEFAULT_VAULT_PATH):
+    """
+    Save the cookies and localStorage of a logged-in driver to the encrypted vault
+
+    Args:
+        driver: Selenium WebDriver instance logged in to Instagram
+        username: Instagram account the session belongs to
+        path: Location of the vault file
+
+    Returns:
+        bool: True if the session was saved
+    """
+    if not cryptography_available:
+        print("Session vault disabled: install 'cryptography' to persist logins")
+        return False
+
+    try:
+        session = {
+            "username": username,
+            "saved_at": time.time(),
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script(
+                "var items = {};"
+                "for (var i = 0; i < window.localStorage.length; i++) {"
+                "  var key = window.localStorage.key(i);"
+                "  items[key] = window.localStorage.getItem(key);"
+                "}"
+                "return items;"
+            ) or {}
+        }
+
+        salt = os.urandom(16)
+        token = _fernet(salt).encrypt(json.dumps(session).encode("utf-8"))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file first so a crash never leaves a half-written vault
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as vault_file:
+            json.dump({
+                "version": VAULT_VERSION,
+                "salt": base64.b64encode(salt).decode("ascii"),
+                "token": token.decode("ascii")
+            }, vault_file)
+        os.replace(temp_path, path)
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+        print(f"Saved Instagram session to vault '{path}'")
+        return True
+    except Exception as e:
+        print(f"Could not save session to vault: {e}")
+        return False
+
+def load_session(username, path=DEFAULT_VAULT_PATH, max_age=DEFAULT_MAX_AGE):
+    """
+    Load and decrypt a saved session, checking that it has not expired
+
+    Args:
+        username: Instagram account the session must belong to
+        path: Location of the vault file
+        max_age: Maximum age of the saved session in seconds
+
+    Returns:
+        dict: Session data, or None if missing, unreadable or expired
+    """
+    if not cryptography_available or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as vault_file:
+            vault = json.load(vault_file)
+
+        if vault.get("version") != VAULT_VERSION:
+            print("Session vault has an unknown format, ignoring it")
+            return None
+
+        salt = base64.b64decode(vault["salt"])
+        session = json.loads(_fernet(salt).decrypt(vault["token"].encode("ascii")))
+    except InvalidToken:
+        print("Session vault could not be decrypted (key changed?), ignoring it")
+        return None
+    except Exception as e:
+        print(f"Could not read session vault: {e}")
+        return None
+
+    if session.get("username") != username:
+        print("Session vault belongs to a different account, ignoring it")
+        return None
+
+    now = time.time()
+    if now - session.get("saved_at", 0) > max_age:
+        print("Saved session is too old, a fresh login is required")
+        return None
+
+    # The sessionid cookie carries the server-side expiry of the login
+    session_cookie = next((c for c in session.get("cookies", []) if c.get("name") == "sessionid"), None)
+    if not session_cookie:
+        print("Saved session has no sessionid cookie, a fresh login is required")
+        return None
+    if session_cookie.get("expiry") and session_cookie["expiry"] <= now:
+        print("Saved session cookie has expired, a fresh login is required")
+        return None
+
+    return session
+
+def restore_session(driver, username, path=DEFAULT_VAULT_PATH, max_age=DEFAULT_MAX_AGE):
+    """
+    Restore a saved session into the driver and verify Instagram accepts it
+
+    The vault is deleted only when Instagram positively rejects the session
+    (redirects to the login or challenge page). Errors such as a network
+    failure or a slow page keep it, so the next login can try it again.
+
+    Args:
+        driver: Selenium WebDriver instance
+        username: Instagram account to restore
+        path: Location of the vault file
+        max_age: Maximum age of the saved session in seconds
+
+    Returns:
+        bool: True if the driver is logged in using the restored session
+    """
+    session = load_session(username, path=path, max_age=max_age)
+    if not session:
+        return False
+
+    try:
+        # Cookies can only be set for the domain that is currently loaded
+        driver.get("https://www.instagram.com/")
+        driver.delete_all_cookies()
+
+        for cookie in session["cookies"]:
+            cookie = {k: v for k, v in cookie.items() if k in
+                      ("name", "value", "domain", "path", "expiry", "secure", "httpOnly", "sameSite")}
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                # Skip cookies the browser refuses (e.g. for other domains)
+                pass
+
+        if session.get("local_storage"):
+            driver.execute_script(
+                "var items = arguments[0];"
+                "for (var key in items) { window.localStorage.setItem(key, items[key]); }",
+                session["local_storage"]
+            )
+
+        driver.get("https://www.instagram.com/")
+
+        # Same markers the regular login waits for
+        WebDriverWait(driver, 10).until(
+            EC.any_of(
+                EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/direct/inbox/')]")),
+                EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/explore/')]")),
+                EC.presence_of_element_located((By.XPATH, "//span[text()='Search']"))
+            )
+        )
+
+        if _session_rejected(driver):
+            print("Instagram rejected the saved session")
+            clear_session(path)
+            return False
+
+        print("Restored Instagram session from vault (skipped login)")
+        return True
+    except Exception as e:
+        if _session_rejected(driver):
+            print(f"Instagram rejected the saved session: {e}")
+            clear_session(path)
+        else:
+            print(f"Could not restore the saved session, keeping it for the next login: {e}")
+        return False
+
+def _session_rejected(driver):
+    """Check whether Instagram sent the browser to the login or challenge page"""
+    try:
+        current_url = driver.current_url
+    except Exception:
+        return False
+    return "/accounts/login" in current_url or "/challenge/" in current_url
+
+def clear_session(path=DEFAULT_VAULT_PATH):
+    """Delete the saved session so the next run performs a full login"""
+    try:
+        os.remove(path)
+        print(f"Removed session vault '{path}'")
+    except FileNotFoundError:
+        pass  # Already removed, e.g. by another pooled login
+    except OSError as e:
+        print(f"Could not remove session vault '{path}': {e}")
@@ -0,0 +1,42 @@
+import os
+
+from conftest import FIXTURES
+
+POST_PAGE = os.path.join(FIXTURES, "post_page.html")
+
+def _empty_post():
+    return {"username": "Not found", "caption": "No caption available", "likes_count": "Not available",
+            "comments_count": "Not available", "post_date": "Unknown", "hashtags": [], "mentions": [],
+            "tagged_users": [], "location": "Not specified", "post_type": "Unknown", "media_urls": [],
+            "comments": [], "profile_data": {"username": "Not found"}}
+
+def test_bundle_extracts_saved_post_page(chrome_driver):
+    from dom_extractor import extract_from_html, normalize_bundle_result
+    from scraper import extract_hashtags_and_mentions
+
+    result = extract_from_html(chrome_driver, POST_PAGE, expand_comments=False)
+    assert result is not None
+
+    post_data = normalize_bundle_result(result, _empty_post(), extract_hashtags_and_mentions)
+    assert post_data["username"] == "natgeo"
+    assert post_data["profile_data"]["username"] == "natgeo"
+    assert post_data["profile_url"] == "https://www.instagram.com/natgeo/"
+    assert post_data["caption"] == "Sunrise over Machu Picchu, photographed by @alice #travel #peru"
+    assert post_data["hashtags"] == ["#travel", "#peru"]
+    assert post_data["mentions"] == ["@alice"]
+    assert post_data["likes_count"] == "12,345"
+    assert post_data["comments_count"] == "87 comments"
+    assert post_data["post_date"] == "2025-06-11T14:52:04.000Z"
+    assert post_data["location"] == "Machu Picchu"
+    assert post_data["post_type"] == "Photo"
+    assert post_data["media_urls"] == [
+        {"type": "image", "url": "https://scontent.cdninstagram.com/v/t51.2885-15/natgeo_machu_picchu.jpg"}
+    ]
+    assert [comment["username"] for comment in post_data["comments"]] == ["alice", "bob"]
+
+def test_bundle_reads_no_comments_when_max_comments_is_zero(chrome_driver):
+    from dom_extractor import extract_from_html
+
+    result = extract_from_html(chrome_driver, POST_PAGE, expand_comments=False, max_comments=0)
+    assert result is not None
+    assert result["comments"] == []
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip("requests")
+
+from media_downloader import download_post_media, partial_path, STORE_INDEX_NAME
+
+PHOTO = bytes(range(256)) * 400
+OTHER = b"another image" * 1000
+FILES = {"/photo.jpg": PHOTO, "/photo-copy.jpg": PHOTO, "/other.jpg": OTHER}
+
+@pytest.fixture
+def media_server():
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = FILES.get(self.path)
+            requests_seen.append((self.path, self.headers.get("Range")))
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            start = 0
+            if self.headers.get("Range"):
+                start = int(self.headers["Range"].split("=")[1].split("-")[0])
+                if start >= len(body):
+                    self.send_response(416)
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body) - start))
+            self.end_headers()
+            self.wfile.write(body[start:])
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", requests_seen
+    server.shutdown()
+    server.server_close()
+
+def _manifest(path):
+    with open(path, "r", encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
+
+def test_resume_and_dedup_across_runs(media_server, tmp_path):
+    base_url, requests_seen = media_server
+    store = str(tmp_path / "store")
+    posts = [
+        {"url": "https://www.instagram.com/p/A/", "media_urls": [{"url": base_url + "/photo.jpg", "type": "image"}]},
+        {"url": "https://www.instagram.com/p/B/", "media_urls": [base_url + "/photo-copy.jpg", base_url + "/other.jpg"]}
+    ]
+
+    # An earlier run was interrupted after the first 40,000 bytes of the photo
+    part = partial_path(base_url + "/photo.jpg", store)
+    os.makedirs(os.path.dirname(part))
+    with open(part, "wb") as part_file:
+        part_file.write(PHOTO[:40000])
+
+    first = _manifest(download_post_media(posts, str(tmp_path / "run1"), workers=2, store_folder=store))
+    assert ("/photo.jpg", "bytes=40000-") in requests_seen
+    photo = first["posts"]["https://www.instagram.com/p/A/"][0]
+    assert photo["resumed"]
+    copy, other = first["posts"]["https://www.instagram.com/p/B/"]
+    assert copy["file"] == photo["file"]
+    assert other["file"] != photo["file"]
+
+    # One stored file per distinct content, linked into the session
+    stored = sorted(name for name in os.listdir(store) if not name.startswith(".") and name != STORE_INDEX_NAME)
+    assert stored == sorted({photo["file"], other["file"]})
+    with open(tmp_path / "run1" / "media" / photo["file"], "rb") as media_file:
+        assert media_file.read() == PHOTO
+    assert not os.listdir(os.path.join(store, ".partial"))
+
+    # A later run finds everything in the store and downloads nothing
+    requests_before = len(requests_seen)
+    second = _manifest(download_post_media(posts, str(tmp_path / "run2"), workers=2, store_folder=store))
+    assert len(requests_seen) == requests_before
+    assert second["summary"]["already_stored"] == 3
+    assert second["summary"]["failed"] == 0
+    with open(tmp_path / "run2" / "media" / other["file"], "rb") as media_file:
+        assert media_file.read() == OTHER
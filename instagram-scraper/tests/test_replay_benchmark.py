@@ -0,0 +1,34 @@
+import json
+import os
+import urllib.request
+
+import pytest
+
+from conftest import FIXTURES
+from replay import ReplayServer
+
+REPLAY_FIXTURES = os.path.join(FIXTURES, "replay")
+
+with open(os.path.join(REPLAY_FIXTURES, "thresholds.json"), "r", encoding="utf-8") as thresholds_file:
+    THRESHOLDS = json.load(thresholds_file)
+
+def test_replay_server_keeps_navigation_local():
+    with ReplayServer(REPLAY_FIXTURES) as server:
+        assert {meta["id"] for meta in server.snapshots} == {"profile/natgeo", "post/p_C0000000001"}
+        with urllib.request.urlopen(server.url("/natgeo/")) as response:
+            html = response.read().decode("utf-8")
+    assert 'href="/p/C0000000001/"' in html
+    assert "www.instagram.com" not in html
+
+@pytest.fixture(scope="module")
+def replay_results(chrome_driver):
+    from replay_benchmark import run_benchmark
+    return run_benchmark(REPLAY_FIXTURES, page_types=tuple(THRESHOLDS), driver=chrome_driver)
+
+@pytest.mark.parametrize("page_type", sorted(THRESHOLDS))
+def test_replay_meets_recorded_thresholds(replay_results, page_type):
+    result = replay_results[page_type]
+    thresholds = THRESHOLDS[page_type]
+    assert result["success_rate"] >= thresholds["min_success_rate"]
+    assert result["posts_per_sec"] >= thresholds["min_posts_per_sec"]
+    assert result["webdriver_calls_per_post"] <= thresholds["max_webdriver_calls_per_post"]
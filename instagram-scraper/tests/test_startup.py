@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import run
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _heavy(imported):
+    return sorted(name for name in imported if name.split(".")[0] in run.HEAVY_MODULES)
+
+def test_help_imports_no_scraping_modules():
+    result = subprocess.run([sys.executable, "-X", "importtime", "run.py", "--help"], capture_output=True,
+                            text=True, cwd=PROJECT_DIR)
+    assert result.returncode == 0, result.stderr
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines()
+                if line.startswith("import time:") and "|" in line}
+    assert not _heavy(imported)
+
+@pytest.mark.parametrize("command", sorted(run.COMMAND_MODULES))
+def test_offline_command_imports_no_scraping_modules(command):
+    _, imported = run._import_times(("run",) + run.COMMAND_MODULES[command])
+    assert not _heavy(imported)
@@ -0,0 +1,135 @@
+import heapq
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch for approximate top-k counting.
+
+    Keeps at most `capacity` counters no matter how many distinct items are
+    added. Every reported count overestimates the true count by at most the
+    item's recorded error, which is never more than total / capacity, so any
+    item occurring more than total / capacity times is guaranteed to be
+    tracked. Sketches can be merged, and serialized with to_dict so sessions
+    counted on different machines can be combined later.
+    """
+
+    def __init__(self, capacity=1000):
+        """
+        Initialize an empty sketch
+
+        Args:
+            capacity: Maximum number of counters kept (the memory budget)
+        """
+        self.capacity = max(1, int(capacity))
+        self.total = 0
+        self.counters = {}  # item -> [count, error]
+        self._heap = []     # (count, item) entries, possibly stale
+
+    def __len__(self):
+        return len(self.counters)
+
+    def _min_item(self):
+        """Tracked item with the smallest count, skipping stale heap entries"""
+        while True:
+            count, item = self._heap[0]
+            counter = self.counters.get(item)
+            if counter is not None and counter[0] == count:
+                return item
+            heapq.heappop(self._heap)
+
+    def _push(self, item, count):
+        heapq.heappush(self._heap, (count, item))
+        # Drop stale entries before the heap outgrows the counters too much
+        if len(self._heap) > 4 * self.capacity + 16:
+            self._heap = [(counter[0], key) for key, counter in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def min_count(self):
+        """Smallest tracked count, the most an untracked item can have occurred"""
+        if len(self.counters) < self.capacity:
+            return 0
+        return self.counters[self._min_item()][0]
+
+    def add(self, item, count=1):
+        """Count `count` occurrences of item"""
+        self.total += count
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[item] = [count, 0]
+        else:
+            # Replace the smallest counter; the new item inherits its count as error
+            evicted = self._min_item()
+            floor = self.counters.pop(evicted)[0]
+            heapq.heappop(self._heap)
+            counter = self.counters[item] = [floor + count, floor]
+        self._push(item, counter[0])
+
+    def update(self, items):
+        """Count every item of an iterable (like Counter.update)"""
+        for item in items:
+            self.add(item)
+
+    def merge(self, other):
+        """
+        Merge another sketch into this one
+
+        Items missing from one sketch are assumed to have occurred as often as
+        that sketch's smallest counter, so the merged error stays within
+        (total of both) / capacity.
+        """
+        self_floor = self.min_count()
+        other_floor = other.min_count()
+        merged = {}
+        for item in list(self.counters) + [key for key in other.counters if key not in self.counters]:
+            count, error = self.counters.get(item, (self_floor, self_floor))
+            other_count, other_error = other.counters.get(item, (other_floor, other_floor))
+            merged[item] = [count + other_count, error + other_error]
+
+        self.total += other.total
+        if len(merged) > self.capacity:
+            kept = set(heapq.nlargest(self.capacity, merged, key=lambda item: merged[item][0]))
+            merged = {item: counter for item, counter in merged.items() if item in kept}
+        self.counters = merged
+        self._heap = [(counter[0], item) for item, counter in self.counters.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def error_bound(self):
+        """Maximum overestimate of any reported count"""
+        return self.total // self.capacity if len(self.counters) >= self.capacity else 0
+
+    def most_common(self, n=None):
+        """
+        Items with the highest estimated counts
+
+        Returns:
+            list: (item, count) tuples, highest count first
+        """
+        ranked = sorted(self.counters.items(), key=lambda entry: entry[1][0], reverse=True)
+        if n is not None:
+            ranked = ranked[:n]
+        return [(item, counter[0]) for item, counter in ranked]
+
+    def error(self, item):
+        """Maximum overestimate of the count reported for item"""
+        counter = self.counters.get(item)
+        return counter[1] if counter else self.min_count()
+
+    def to_dict(self):
+        """Serializable form of the sketch"""
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": [[item, counter[0], counter[1]] for item, counter in self.counters.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch saved with to_dict"""
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        sketch.counters = {item: [count, error] for item, count, error in data["counters"]}
+        sketch._heap = [(counter[0], item) for item, counter in sketch.counters.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
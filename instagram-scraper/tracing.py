@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import threading
+from functools import wraps
+
+_local = threading.local()
+
+class Tracer:
+    """
+    Records timing spans for one scraper run.
+
+    Spans are plain lists appended to one list, so leaving tracing on costs
+    about a microsecond per span. Sleeps are recorded as their own "sleep"
+    spans, and their duration is also added to every span open at the time,
+    so each stage reports its work time separately from its sleep time.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.events = []  # [name, category, start, duration, sleep, thread id]
+        self.thread_names = {}
+
+    def _stack(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None or getattr(_local, "stack_owner", None) is not self:
+            stack = _local.stack = []
+            _local.stack_owner = self
+            thread = threading.current_thread()
+            self.thread_names[thread.ident] = thread.name
+        return stack
+
+    def begin(self, name, category="work"):
+        """Open a span; close it with end()"""
+        span = [name, category, time.perf_counter(), 0.0, 0.0, threading.get_ident()]
+        self._stack().append(span)
+        return span
+
+    def end(self, span):
+        """Close a span (and any span opened inside it that was left open)"""
+        span[3] = time.perf_counter() - span[2]
+        stack = self._stack()
+        if span in stack:
+            del stack[stack.index(span):]
+        self.events.append(span)
+
+    def sleep(self, seconds, name="sleep"):
+        """Sleep and record it, charging the time to every open span as sleep"""
+        started = time.perf_counter()
+        time.sleep(seconds)
+        duration = time.perf_counter() - started
+        for span in self._stack():
+            span[4] += duration
+        self.events.append([name, "sleep", started, duration, duration, threading.get_ident()])
+
+    def summary(self):
+        """
+        Aggregate spans by name
+
+        Returns:
+            list: Rows with stage, category, calls, total_s, work_s, sleep_s,
+                avg_ms and max_ms, slowest stage first
+        """
+        stages = {}
+        for name, category, start, duration, sleep, thread_id in self.events:
+            stage = stages.setdefault((name, category), [0, 0.0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += duration
+            stage[2] += sleep
+            stage[3] = max(stage[3], duration)
+
+        rows = [{
+            "stage": name,
+            "category": category,
+            "calls": calls,
+            "total_s": round(total, 3),
+            "work_s": round(total - sleep, 3),
+            "sleep_s": round(sleep, 3),
+            "avg_ms": round(total * 1000 / calls, 1),
+            "max_ms": round(longest * 1000, 1)
+        } for (name, category), (calls, total, sleep, longest) in stages.items()]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def format_summary(self):
+        """Summary as a text table, with the run's wall time and total sleep"""
+        wall = time.perf_counter() - self.started
+        sleep = sum(event[3] for event in self.events if event[1] == "sleep")
+        lines = [
+            f"Run time: {wall:.1f}s ({sleep:.1f}s sleeping across all threads)",
+            "",
+            f"{'Stage':<22} {'Calls':>6} {'Total s':>9} {'Work s':>9} {'Sleep s':>9} {'Avg ms':>9} {'Max ms':>9}"
+        ]
+        for row in self.summary():
+            lines.append(f"{row['stage']:<22} {row['calls']:>6} {row['total_s']:>9.2f} {row['work_s']:>9.2f} "
+                         f"{row['sleep_s']:>9.2f} {row['avg_ms']:>9.1f} {row['max_ms']:>9.1f}")
+        return "\n".join(lines)
+
+    def write_summary(self, path):
+        """Write the summary table to a text file"""
+        with open(path, "w", encoding="utf-8") as summary_file:
+            summary_file.write(self.format_summary() + "\n")
+        return path
+
+    def write_chrome_trace(self, path):
+        """
+        Export the spans as Chrome trace-event JSON
+
+        Open the file in chrome://tracing or https://ui.perfetto.dev
+        """
+        pid = os.getpid()
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}}
+            for thread_id, thread_name in self.thread_names.items()
+        ]
+        for name, category, start, duration, sleep, thread_id in self.events:
+            trace_events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self.started) * 1_000_000),
+                "dur": round(duration * 1_000_000),
+                "pid": pid,
+                "tid": thread_id,
+                "args": {"sleep_ms": round(sleep * 1000, 1)}
+            })
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, trace_file)
+        return path
+
+class _Span:
+    __slots__ = ("name", "category", "tracer", "span")
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.tracer = getattr(_local, "tracer", None)
+        if self.tracer:
+            self.span = self.tracer.begin(self.name, self.category)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.tracer:
+            self.tracer.end(self.span)
+
+def start_trace():
+    """Start tracing on this thread"""
+    tracer = Tracer()
+    attach(tracer)
+    return tracer
+
+def attach(tracer):
+    """Record spans of the current thread into tracer (e.g. in a worker thread)"""
+    _local.tracer = tracer
+
+def stop_trace():
+    """Stop tracing on this thread"""
+    _local.tracer = None
+
+def get_tracer():
+    """Tracer of the current thread, or None when not tracing"""
+    return getattr(_local, "tracer", None)
+
+def span(name, category="work"):
+    """Context manager timing a stage (no-op when not tracing)"""
+    return _Span(name, category)
+
+def begin(name, category="work"):
+    """Open a span for a stage that does not fit in a with block"""
+    tracer = getattr(_local, "tracer", None)
+    return (tracer, tracer.begin(name, category)) if tracer else None
+
+def end(token):
+    """Close a span opened with begin()"""
+    if token:
+        token[0].end(token[1])
+
+def traced(name, category="work"):
+    """Decorator timing every call of a function"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with _Span(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def sleep(seconds, name="sleep"):
+    """time.sleep that is recorded as sleep time when tracing"""
+    tracer = getattr(_local, "tracer", None)
+    if tracer:
+        tracer.sleep(seconds, name)
+    else:
+        time.sleep(seconds)
@@ -3,10 +3,11 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
+import tracing
 import random
 from dotenv import load_dotenv
 import os
+from session_vault import restore_session, save_session
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,13 +23,15 @@ def get_random_user_agent():
     ]
     return random.choice(user_agents)
 
-def login_instagram(driver, retry_count=2):
+def login_instagram(driver, retry_count=2, use_vault=True):
     """
     Login to Instagram with error handling and retry logic
     
     Args:
         driver: Selenium WebDriver instance
         retry_count: Number of login retries if it fails
+        use_vault: Restore a saved session from the encrypted vault when possible
+            and save the session after a successful login
     """
     # Get username and password from environment variables
     username = os.getenv('INSTAGRAM_USERNAME')
@@ -37,8 +40,19 @@ def login_instagram(driver, retry_count=2):
     if not username or not password:
         raise ValueError("Instagram username or password not set in .env file!")
     
+    # Skip the typed login entirely if a saved session is still accepted
+    if use_vault:
+        # A rejected session is removed from the vault by restore_session
+        if restore_session(driver, username):
+            return driver
+        # Drop the restored cookies so the typed login starts from a clean browser
+        try:
+            driver.delete_all_cookies()
+        except Exception as e:
+            print(f"Could not clear restored cookies: {e}")
+    
     # Add a random delay to appear more human-like
-    time.sleep(random.uniform(1.5, 3))
+    tracing.sleep(random.uniform(1.5, 3))
     
     for attempt in range(retry_count + 1):
         try:
@@ -51,24 +65,24 @@ def login_instagram(driver, retry_count=2):
             )
             
             # Add a small delay before typing to mimic human behavior
-            time.sleep(random.uniform(0.5, 1.5))
+            tracing.sleep(random.uniform(0.5, 1.5))
 
             # Input username with random typing speed
             username_field = driver.find_element(By.NAME, "username")
             username_field.clear()
             for char in username:
                 username_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.15))  # Random delay between keystrokes
+                tracing.sleep(random.uniform(0.05, 0.15))  # Random delay between keystrokes
             
             # Add a brief pause between username and password entry
-            time.sleep(random.uniform(0.5, 1))
+            tracing.sleep(random.uniform(0.5, 1))
             
             # Input password with random typing speed
             password_field = driver.find_element(By.NAME, "password")
             password_field.clear()
             for char in password:
                 password_field.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.15))  # Random delay between keystrokes
+                tracing.sleep(random.uniform(0.05, 0.15))  # Random delay between keystrokes
             
             # Click the login button instead of pressing Enter
             try:
@@ -95,7 +109,7 @@ def login_instagram(driver, retry_count=2):
         except Exception as e:
             if attempt < retry_count:
                 print(f"Login attempt {attempt+1} failed: {str(e)}. Retrying...")
-                time.sleep(random.uniform(3, 5))  # Wait before retrying
+                tracing.sleep(random.uniform(3, 5))  # Wait before retrying
             else:
                 print(f"Failed to login after {retry_count+1} attempts: {str(e)}")
                 raise
@@ -103,6 +117,10 @@ def login_instagram(driver, retry_count=2):
     # Handle potential popups with better error handling
     handle_post_login_popups(driver)
     
+    # Persist the session so the next run can skip this login
+    if use_vault:
+        save_session(driver, username)
+    
     return driver
 
 def handle_post_login_popups(driver):
@@ -124,7 +142,7 @@ def handle_post_login_popups(driver):
             )
             print(f"Clicked '{popup['text']}' popup")
             button.click()
-            time.sleep(1)  # Short wait after clicking
+            tracing.sleep(1)  # Short wait after clicking
         except (TimeoutException, NoSuchElementException):
             # This popup was not found, which is fine
             pass